@@ -0,0 +1,155 @@
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+
+def commit_remoto(url, timeout=60):
+    """Retorna o SHA do HEAD remoto (`git ls-remote <url> HEAD`) sem clonar, ou None se falhar."""
+    try:
+        saida = subprocess.run(["git", "ls-remote", url, "HEAD"], check=True, capture_output=True,
+                               text=True, timeout=timeout).stdout
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+        return None
+    return saida.split()[0] if saida.strip() else None
+
+
+def commit_local(repo_dir, timeout=60):
+    """Retorna o SHA do HEAD de um checkout, ou None se não for um repositório git."""
+    try:
+        return subprocess.run(["git", "-C", str(repo_dir), "rev-parse", "HEAD"], check=True,
+                              capture_output=True, text=True, timeout=timeout).stdout.strip()
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+        return None
+
+
+def blobs_java(repo_dir, timeout=300):
+    """Mapeia cada arquivo .java do checkout (caminho real absoluto) para o hash do seu blob no git.
+
+    Os hashes vêm do índice (`git ls-files -s`), sem ler os arquivos. Retorna None se repo_dir
+    não for um repositório git.
+    """
+    raiz = os.path.realpath(repo_dir)
+    try:
+        saida = subprocess.run(["git", "-C", raiz, "ls-files", "-s", "-z", "--", "*.java"], check=True,
+                               capture_output=True, timeout=timeout).stdout
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+        return None
+    blobs = {}
+    for entrada in saida.split(b"\0"):
+        if not entrada:
+            continue
+        # "<modo> <hash> <estágio>\t<caminho>"
+        metadados, caminho = entrada.split(b"\t", 1)
+        blobs[os.path.join(raiz, os.fsdecode(caminho))] = metadados.split()[1].decode("ascii")
+    return blobs
+
+
+class AnaliseCache:
+    """Cache persistente (SQLite) que torna a reanálise incremental.
+
+    Parâmetros:
+    - caminho (Path | str): arquivo SQLite do cache.
+
+    Observações:
+    - Por repositório, guarda o SHA do commit analisado e a linha de totais gerada para ele: se o
+      HEAD não mudou, o repositório não precisa ser clonado nem analisado de novo.
+    - Por blob do git, guarda as linhas de cada CSV do CK (classes, métodos, campos e variáveis, sem
+      a coluna file): na análise por arquivo, apenas os blobs novos passam pelo CK. Um blob só conta
+      como analisado quando tem linhas registradas para todos os tipos pedidos.
+    - É seguro compartilhar uma instância entre threads.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS repositorios (
+                    full_name TEXT PRIMARY KEY,
+                    commit_sha TEXT NOT NULL,
+                    totais TEXT NOT NULL,
+                    atualizado_em REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS linhas_ck (
+                    blob TEXT NOT NULL,
+                    tipo TEXT NOT NULL,
+                    linhas TEXT NOT NULL,
+                    PRIMARY KEY (blob, tipo)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS colunas_ck (
+                    tipo TEXT PRIMARY KEY,
+                    colunas TEXT NOT NULL
+                )
+            """)
+
+    def analise_anterior(self, full_name):
+        """Retorna (commit_sha, totais) da última análise concluída do repositório, ou None."""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT commit_sha, totais FROM repositorios WHERE full_name = ?", (full_name,)
+            ).fetchone()
+        return (linha[0], json.loads(linha[1])) if linha else None
+
+    def registrar_analise(self, full_name, commit_sha, totais):
+        """Registra o commit analisado e a linha de totais do repositório."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO repositorios (full_name, commit_sha, totais, atualizado_em) "
+                "VALUES (?, ?, ?, ?)",
+                (full_name, commit_sha, json.dumps(totais), time.time()),
+            )
+
+    def _consultar_blobs(self, blobs, consulta, parametros=()):
+        blobs = list(set(blobs))
+        with self._lock:
+            # Consultas em lotes para respeitar o limite de parâmetros do SQLite
+            for inicio in range(0, len(blobs), 500):
+                lote = blobs[inicio:inicio + 500]
+                marcadores = ",".join("?" * len(lote))
+                yield from self._conn.execute(consulta.format(marcadores=marcadores), (*parametros, *lote)).fetchall()
+
+    def blobs_analisados(self, blobs, tipos):
+        """Retorna o conjunto dos blobs que já têm linhas registradas para todos os tipos de CSV."""
+        tipos = list(tipos)
+        return {blob for blob, em_cache in self._consultar_blobs(
+            blobs,
+            f"SELECT blob, COUNT(*) FROM linhas_ck WHERE tipo IN ({','.join('?' * len(tipos))}) "
+            f"AND blob IN ({{marcadores}}) GROUP BY blob",
+            tipos,
+        ) if em_cache == len(tipos)}
+
+    def linhas_por_blob(self, blobs, tipo):
+        """Retorna {blob: [linhas do CSV do tipo]} para os blobs já analisados."""
+        return {blob: json.loads(linhas) for blob, linhas in self._consultar_blobs(
+            blobs, "SELECT blob, linhas FROM linhas_ck WHERE tipo = ? AND blob IN ({marcadores})", (tipo,)
+        )}
+
+    def colunas(self, tipo):
+        """Retorna as colunas (sem file) do último CSV do tipo registrado, ou None."""
+        with self._lock:
+            linha = self._conn.execute("SELECT colunas FROM colunas_ck WHERE tipo = ?", (tipo,)).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def salvar_linhas(self, tipo, linhas_por_blob, colunas):
+        """Armazena {blob: [linhas do CSV do tipo]}; a lista vazia marca um arquivo sem linhas desse tipo.
+
+        colunas (lista sem file, ou None para manter as atuais) é o cabeçalho usado ao remontar o CSV.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO linhas_ck (blob, tipo, linhas) VALUES (?, ?, ?)",
+                [(blob, tipo, json.dumps(linhas)) for blob, linhas in linhas_por_blob.items()],
+            )
+            if colunas is not None:
+                self._conn.execute("INSERT OR REPLACE INTO colunas_ck (tipo, colunas) VALUES (?, ?)",
+                                   (tipo, json.dumps(colunas)))
@@ -0,0 +1,212 @@
+"""Benchmark reprodutível dos estágios de métricas com corpora Java sintéticos e um CK substituto.
+
+Para cada escala (número de classes), gera uma árvore Java e os CSVs do CK correspondentes e mede,
+isoladamente e de ponta a ponta:
+- comentarios: contar_comentarios_repo sobre todos os arquivos (sem cache);
+- comentarios_cache: a mesma contagem com o ComentariosCache já preenchido;
+- agregacao: agregar_metricas_por_arquivo do CSV de classes (leitura completa);
+- agregacao_chunks: o mesmo em blocos de LINHAS_POR_CHUNK linhas;
+- metodos: estatisticas_metodos_repo sobre os CSVs de métodos e variáveis, com o teto MEMORIA_METODOS;
+- processar: processar_ck_results_repo (agregação + comentários + linha do total_metrics_per_repo);
+- totais_finais: gerar_metrics_totais_finais com min(escala, 1000) repositórios;
+- ck_stub: run_ck_on_repo com benchmarks/stub_ck.py no lugar do java;
+- ck_stub_shards: o mesmo com o repositório dividido em 4 shards;
+- ponta_a_ponta: ck_stub + processar + totais_finais.
+
+Os resultados são gravados em benchmarks/resultados/ com o commit atual, para comparação
+entre commits com --comparar. Nada acessa a rede.
+
+Uso:
+- python benchmarks/bench_pipeline.py --escalas 10,1000,20000
+- python benchmarks/bench_pipeline.py --escalas 200000 --estagios comentarios,agregacao
+- python benchmarks/bench_pipeline.py --comparar benchmarks/resultados/bench-<commit>-<data>.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from ck_runner import run_ck_on_repo  # noqa: E402
+from comment_cache import ComentariosCache  # noqa: E402
+from extract_metrics import (LINHAS_POR_CHUNK, agregar_metricas_por_arquivo, contar_comentarios_repo,  # noqa: E402
+                             estatisticas_metodos_repo, gerar_metrics_totais_finais, processar_ck_results_repo)
+from sintetico import gerar_arvore_java, gerar_csvs_ck, gerar_metricas_por_repo  # noqa: E402
+
+STUB_CK = Path(__file__).resolve().parent / "stub_ck.py"
+RESULTADOS = Path(__file__).resolve().parent / "resultados"
+ESTAGIOS = ["comentarios", "comentarios_cache", "agregacao", "agregacao_chunks", "metodos", "processar",
+            "totais_finais", "ck_stub", "ck_stub_shards", "ponta_a_ponta"]
+
+
+def commit_atual():
+    try:
+        return subprocess.run(["git", "-C", str(RAIZ), "rev-parse", "--short", "HEAD"], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (subprocess.CalledProcessError, OSError):
+        return "desconhecido"
+
+
+def cronometrar(funcao, repeticoes, preparar=None):
+    """Executa funcao repeticoes vezes (preparar antes de cada uma, fora da medição) e retorna os tempos."""
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def medir_escala(base, classes, estagios, repeticoes, workers):
+    """Gera o corpus de uma escala e mede os estágios pedidos; retorna a lista de resultados."""
+    repo = base / "repo"
+    ck_dir = base / "ck"
+    saida = base / "saida"
+    inicio = time.perf_counter()
+    arquivos = gerar_arvore_java(repo, classes)
+    gerar_csvs_ck(arquivos, ck_dir, tipos=("class", "method", "variable"))
+    caminhos = [str(caminho) for caminho, _, _ in arquivos]
+    bytes_fonte = sum(Path(caminho).stat().st_size for caminho in caminhos)
+    print(f"escala {classes:,}: corpus gerado em {time.perf_counter() - inicio:.1f}s "
+          f"({len(caminhos):,} arquivos, {bytes_fonte / (1024 * 1024):.1f} MB)")
+
+    def limpar_saida():
+        shutil.rmtree(saida, ignore_errors=True)
+        saida.mkdir(parents=True)
+
+    def preparar_totais():
+        limpar_saida()
+        gerar_metricas_por_repo(saida, min(classes, 1000))
+
+    java = str(STUB_CK)
+
+    def ponta_a_ponta():
+        run_ck_on_repo(STUB_CK, repo, base / "ck_e2e", java)
+        processar_ck_results_repo("bench", base / "ck_e2e", saida)
+        gerar_metrics_totais_finais(saida)
+
+    cache = ComentariosCache(base / "comentarios_cache.sqlite")
+    if "comentarios_cache" in estagios:
+        contar_comentarios_repo(caminhos, cache, workers=workers)
+    medidas = {
+        "comentarios": (lambda: contar_comentarios_repo(caminhos, workers=workers), None),
+        "comentarios_cache": (lambda: contar_comentarios_repo(caminhos, cache, workers=workers), None),
+        "agregacao": (lambda: agregar_metricas_por_arquivo(ck_dir / "class.csv"), None),
+        "agregacao_chunks": (lambda: agregar_metricas_por_arquivo(ck_dir / "class.csv", LINHAS_POR_CHUNK), None),
+        "metodos": (lambda: estatisticas_metodos_repo(ck_dir), None),
+        "processar": (lambda: processar_ck_results_repo("bench", ck_dir, saida), limpar_saida),
+        "totais_finais": (lambda: gerar_metrics_totais_finais(saida), preparar_totais),
+        "ck_stub": (lambda: run_ck_on_repo(STUB_CK, repo, base / "ck_stub", java), None),
+        "ck_stub_shards": (lambda: run_ck_on_repo(STUB_CK, repo, base / "ck_stub_shards", java,
+                                                  shard_max_arquivos=max(1, -(-classes // 4)), shard_workers=4),
+                           None),
+        "ponta_a_ponta": (ponta_a_ponta, limpar_saida),
+    }
+
+    resultados = []
+    for estagio in estagios:
+        funcao, preparar = medidas[estagio]
+        tempos = cronometrar(funcao, repeticoes, preparar)
+        resultado = {
+            "escala": classes,
+            "estagio": estagio,
+            "arquivos": len(caminhos),
+            "bytes": bytes_fonte,
+            "melhor_s": round(min(tempos), 4),
+            "media_s": round(sum(tempos) / len(tempos), 4),
+            "repeticoes": repeticoes,
+        }
+        resultados.append(resultado)
+        print(f"  {estagio:<18} melhor {resultado['melhor_s']:.3f}s  média {resultado['media_s']:.3f}s  "
+              f"({len(caminhos) / max(resultado['melhor_s'], 1e-9):,.0f} arquivos/s)")
+    return resultados
+
+
+def comparar(atual, anterior, tolerancia):
+    """Mostra a razão entre os tempos atuais e os de um resultado anterior; retorna as regressões."""
+    referencia = {(r["escala"], r["estagio"]): r for r in anterior["resultados"]}
+    regressoes = []
+    print(f"\nComparação com {anterior['commit']} ({anterior['data']}):")
+    for resultado in atual["resultados"]:
+        antes = referencia.get((resultado["escala"], resultado["estagio"]))
+        if antes is None:
+            continue
+        razao = resultado["melhor_s"] / max(antes["melhor_s"], 1e-9)
+        marcador = "REGRESSÃO" if razao > tolerancia else ""
+        print(f"  {resultado['escala']:>8,} {resultado['estagio']:<18} {antes['melhor_s']:.3f}s -> "
+              f"{resultado['melhor_s']:.3f}s ({razao:.2f}x) {marcador}")
+        if razao > tolerancia:
+            regressoes.append(resultado)
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", default="10,1000,20000",
+                        help="números de classes separados por vírgula (padrão: 10,1000,20000; até 200000)")
+    parser.add_argument("--estagios", default=",".join(ESTAGIOS), help="estágios a medir, separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções por estágio (padrão: 3)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos da contagem de comentários")
+    parser.add_argument("--diretorio", help="pasta de trabalho (padrão: temporária, removida ao final)")
+    parser.add_argument("--saida", default=str(RESULTADOS), help="pasta onde o resultado JSON é gravado")
+    parser.add_argument("--comparar", help="resultado JSON anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=1.2,
+                        help="razão de tempo acima da qual a comparação acusa regressão (padrão: 1.2)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    escalas = [int(escala) for escala in args.escalas.split(",")]
+    estagios = [estagio for estagio in args.estagios.split(",") if estagio]
+    desconhecidos = set(estagios) - set(ESTAGIOS)
+    if desconhecidos:
+        parser.error(f"estágios desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    resultado = {
+        "commit": commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "workers": args.workers,
+        "resultados": [],
+    }
+    trabalho = Path(args.diretorio) if args.diretorio else Path(tempfile.mkdtemp(prefix="bench_pipeline_"))
+    try:
+        for classes in escalas:
+            base = trabalho / f"escala-{classes}"
+            shutil.rmtree(base, ignore_errors=True)
+            base.mkdir(parents=True)
+            resultado["resultados"] += medir_escala(base, classes, estagios, args.repeticoes, args.workers)
+            if not args.diretorio:
+                shutil.rmtree(base, ignore_errors=True)
+    finally:
+        if not args.diretorio:
+            shutil.rmtree(trabalho, ignore_errors=True)
+
+    destino = Path(args.saida)
+    destino.mkdir(parents=True, exist_ok=True)
+    arquivo = destino / f"bench-{resultado['commit']}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    arquivo.write_text(json.dumps(resultado, indent=1), encoding="utf-8")
+    print(f"\nResultados gravados em {arquivo}")
+
+    if args.comparar:
+        anterior = json.loads(Path(args.comparar).read_text(encoding="utf-8"))
+        if comparar(resultado, anterior, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark de throughput e verificação de corretude do java_scanner.
+
+Uso:
+- python benchmarks/bench_scanner.py --verificar
+- python benchmarks/bench_scanner.py --arquivos 5000 --workers 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from java_scanner import analisar_arquivo_java, escanear_arquivos  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "java"
+
+
+def verificar_fixtures():
+    """Compara as contagens do scanner com fixtures/java/esperado.json; retorna o número de divergências."""
+    esperado = json.loads((FIXTURES / "esperado.json").read_text(encoding="utf-8"))
+    divergencias = 0
+    for nome, contagens in sorted(esperado.items()):
+        resultado = analisar_arquivo_java(FIXTURES / nome)
+        obtido = {chave: resultado[chave] for chave in contagens}
+        if obtido != contagens:
+            divergencias += 1
+            print(f"DIVERGÊNCIA em {nome}: esperado {contagens}, obtido {obtido}")
+        else:
+            print(f"OK {nome}")
+    return divergencias
+
+
+def gerar_corpus(destino, arquivos, linhas_por_arquivo=200, semente=42):
+    """Gera arquivos .java sintéticos com mistura de código, comentários, strings e linhas em branco."""
+    rng = random.Random(semente)
+    trechos = [
+        "    int campo{i} = {i};",
+        "    // comentário de linha {i}",
+        "    /* bloco {i} */ int x{i} = 0;",
+        "    /**\n     * Javadoc {i}\n     */",
+        '    String s{i} = "http://exemplo/{i}/*nao*/";',
+        "",
+        "    void metodo{i}() {{ return; }}",
+    ]
+    caminhos = []
+    for n in range(arquivos):
+        corpo = [f"class Gerada{n} {{"]
+        for i in range(linhas_por_arquivo):
+            corpo.append(rng.choice(trechos).format(i=i))
+        corpo.append("}")
+        caminho = destino / f"Gerada{n}.java"
+        caminho.write_text("\n".join(corpo) + "\n", encoding="utf-8")
+        caminhos.append(caminho)
+    return caminhos
+
+
+def medir(caminhos, workers):
+    inicio = time.perf_counter()
+    escanear_arquivos(caminhos, workers=workers)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verificar", action="store_true", help="apenas verifica as fixtures de corretude")
+    parser.add_argument("--arquivos", type=int, default=2000, help="arquivos sintéticos gerados (padrão: 2000)")
+    parser.add_argument("--linhas", type=int, default=200, help="linhas por arquivo sintético (padrão: 200)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos na execução paralela")
+    args = parser.parse_args()
+
+    divergencias = verificar_fixtures()
+    if divergencias or args.verificar:
+        sys.exit(1 if divergencias else 0)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        caminhos = gerar_corpus(Path(temp_dir), args.arquivos, args.linhas)
+        megabytes = sum(caminho.stat().st_size for caminho in caminhos) / (1024 * 1024)
+        for workers in (1, args.workers):
+            segundos = medir(caminhos, workers)
+            print(f"workers={workers}: {len(caminhos)} arquivos, {megabytes:.1f} MB em {segundos:.2f}s "
+                  f"({len(caminhos) / segundos:,.0f} arquivos/s, {megabytes / segundos:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+package exemplo;
+
+// Comentário de linha
+import java.util.List;
+
+/**
+ * Javadoc da classe.
+ *
+ */
+public class Basico {
+    private int valor; // comentário no fim da linha
+
+    public int getValor() {
+        return valor;
+    }
+}
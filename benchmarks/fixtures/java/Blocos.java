@@ -0,0 +1,11 @@
+/* abertura */ class Blocos {
+
+    /*
+       comentário com linha em branco
+
+    */
+    void metodo() { /* inicio
+        continua
+    fim */ int z = 0; }
+
+}
@@ -0,0 +1,5 @@
+class Crlf {
+    // windows
+
+    int a;
+}
\ No newline at end of file
@@ -0,0 +1,4 @@
+class Latin1 {
+    // comentrio em latin-1
+    String s = "ao";
+}
@@ -0,0 +1,11 @@
+public class Literais {
+    String url = "http://exemplo.com/*nao-e-comentario*/";
+    String barra = "// também não";
+    char aspas = '"';
+    String escapada = "aspas \" // ainda string";
+    String bloco = """
+        texto // dentro do text block
+        /* também */
+        """;
+    int x = 1; /* comentário no meio */ int y = 2;
+}
@@ -0,0 +1,159 @@
+"""Geração de corpora Java sintéticos e de CSVs no formato do CK para os benchmarks.
+
+Tudo é determinístico a partir da semente, para que execuções em commits diferentes meçam a
+mesma entrada.
+"""
+import csv
+import random
+import zlib
+from pathlib import Path
+
+# Cabeçalhos dos CSVs do CK 0.7 (os mesmos de results_ck/)
+COLUNAS_CLASS = [
+    "file", "class", "type", "cbo", "cboModified", "fanin", "fanout", "wmc", "dit", "noc", "rfc", "lcom",
+    "lcom*", "tcc", "lcc", "totalMethodsQty", "staticMethodsQty", "publicMethodsQty", "privateMethodsQty",
+    "protectedMethodsQty", "defaultMethodsQty", "visibleMethodsQty", "abstractMethodsQty", "finalMethodsQty",
+    "synchronizedMethodsQty", "totalFieldsQty", "staticFieldsQty", "publicFieldsQty", "privateFieldsQty",
+    "protectedFieldsQty", "defaultFieldsQty", "finalFieldsQty", "synchronizedFieldsQty", "nosi", "loc",
+    "returnQty", "loopQty", "comparisonsQty", "tryCatchQty", "parenthesizedExpsQty", "stringLiteralsQty",
+    "numbersQty", "assignmentsQty", "mathOperationsQty", "variablesQty", "maxNestedBlocksQty",
+    "anonymousClassesQty", "innerClassesQty", "lambdasQty", "uniqueWordsQty", "modifiers", "logStatementsQty",
+]
+COLUNAS_METHOD = [
+    "file", "class", "method", "constructor", "line", "cbo", "cboModified", "fanin", "fanout", "wmc", "rfc",
+    "loc", "returnsQty", "variablesQty", "parametersQty", "methodsInvokedQty", "methodsInvokedLocalQty",
+    "methodsInvokedIndirectLocalQty", "loopQty", "comparisonsQty", "tryCatchQty", "parenthesizedExpsQty",
+    "stringLiteralsQty", "numbersQty", "assignmentsQty", "mathOperationsQty", "maxNestedBlocksQty",
+    "anonymousClassesQty", "innerClassesQty", "lambdasQty", "uniqueWordsQty", "modifiers", "logStatementsQty",
+    "hasJavaDoc",
+]
+COLUNAS_VARIABLE = ["file", "class", "method", "variable", "usage"]
+
+CLASSES_POR_PACOTE = 50
+PACOTES_POR_MODULO = 40
+
+
+def fonte_classe(pacote, nome, metodos, semente):
+    """Código-fonte de uma classe com campos, métodos, Javadoc, comentários e literais."""
+    rng = random.Random(semente)
+    linhas = [f"package {pacote};", "", "import java.util.List;", "", "/**", f" * Classe {nome}.", " */",
+              f"public class {nome} {{"]
+    for i in range(rng.randint(1, 4)):
+        linhas.append(f"    private int campo{i} = {i}; // campo {i}")
+    for m in range(metodos):
+        linhas += ["", "    /**", f"     * Método {m}.", "     */", f"    public int metodo{m}(int a, int b) {{"]
+        for i in range(rng.randint(2, 8)):
+            linhas.append(rng.choice([
+                f"        int v{i} = a + b * {i};",
+                f"        // passo {i}",
+                f'        String s{i} = "/* literal {i} */";',
+                f"        if (a > {i}) {{ b++; }}",
+                "",
+            ]))
+        linhas.append("        return a;")
+        linhas.append("    }")
+    linhas.append("}")
+    return "\n".join(linhas) + "\n"
+
+
+def gerar_arvore_java(destino, classes, metodos_por_classe=5, semente=42):
+    """Gera uma árvore de módulos/pacotes com uma classe por arquivo.
+
+    A estrutura imita um projeto Maven multi-módulo (<modulo>/src/main/java/<pacote>/), para que a
+    divisão em shards por módulo também seja exercitada.
+
+    Retorna:
+    - list: tuplas (caminho, pacote, nome da classe) de cada arquivo gerado.
+    """
+    destino = Path(destino)
+    arquivos = []
+    for n in range(classes):
+        indice_pacote = n // CLASSES_POR_PACOTE
+        modulo = f"modulo{indice_pacote // PACOTES_POR_MODULO}"
+        pacote = f"br.bench.{modulo}.p{indice_pacote}"
+        nome = f"Classe{n}"
+        pasta = destino / modulo / "src" / "main" / "java" / Path(*pacote.split("."))
+        if n % CLASSES_POR_PACOTE == 0:
+            pasta.mkdir(parents=True, exist_ok=True)
+        caminho = pasta / f"{nome}.java"
+        caminho.write_text(fonte_classe(pacote, nome, metodos_por_classe, semente + n), encoding="utf-8")
+        arquivos.append((caminho, pacote, nome))
+    return arquivos
+
+
+def _valores(chave, colunas):
+    """Valores inteiros pseudoaleatórios e estáveis para as colunas numéricas de uma linha."""
+    rng = random.Random(zlib.crc32(chave.encode("utf-8")))
+    return {coluna: rng.randint(0, 30) for coluna in colunas}
+
+
+def linha_classe(caminho, classe, loc):
+    linha = _valores(classe, COLUNAS_CLASS[3:])
+    linha.update({"file": str(caminho), "class": classe, "type": "class", "loc": loc,
+                  "lcom*": round(linha["lcom*"] / 30, 4), "tcc": round(linha["tcc"] / 30, 4),
+                  "lcc": round(linha["lcc"] / 30, 4)})
+    return linha
+
+
+def linha_metodo(caminho, classe, metodo):
+    linha = _valores(f"{classe}.{metodo}", COLUNAS_METHOD[3:])
+    linha.update({"file": str(caminho), "class": classe, "method": f"{metodo}/2[int,int]",
+                  "constructor": "false", "hasJavaDoc": "true"})
+    return linha
+
+
+def gerar_csvs_ck(arquivos, destino, metodos_por_classe=5, variaveis_por_metodo=2, tipos=("class", "method")):
+    """Grava CSVs no formato do CK (class.csv, method.csv, variable.csv) para os arquivos gerados.
+
+    Parâmetros:
+    - arquivos (list): tuplas (caminho, pacote, nome) de gerar_arvore_java.
+    - destino (Path): pasta de saída.
+    - tipos (iterable): quais CSVs gerar.
+
+    Retorna:
+    - dict: caminho de cada CSV gerado, por tipo.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    gerados = {}
+    if "class" in tipos:
+        gerados["class"] = destino / "class.csv"
+        with open(gerados["class"], "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUNAS_CLASS)
+            writer.writeheader()
+            for caminho, pacote, nome in arquivos:
+                writer.writerow(linha_classe(caminho, f"{pacote}.{nome}", 10 + 8 * metodos_por_classe))
+    if "method" in tipos:
+        gerados["method"] = destino / "method.csv"
+        with open(gerados["method"], "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUNAS_METHOD)
+            writer.writeheader()
+            for caminho, pacote, nome in arquivos:
+                for m in range(metodos_por_classe):
+                    writer.writerow(linha_metodo(caminho, f"{pacote}.{nome}", f"metodo{m}"))
+    if "variable" in tipos:
+        gerados["variable"] = destino / "variable.csv"
+        with open(gerados["variable"], "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUNAS_VARIABLE)
+            for caminho, pacote, nome in arquivos:
+                for m in range(metodos_por_classe):
+                    for v in range(variaveis_por_metodo):
+                        writer.writerow([caminho, f"{pacote}.{nome}", f"metodo{m}/2[int,int]", f"v{v}", v + 1])
+    return gerados
+
+
+def gerar_metricas_por_repo(destino, repositorios, semente=42):
+    """Grava um total_metrics_per_repo.csv sintético com o número de repositórios indicado."""
+    rng = random.Random(semente)
+    colunas = ["repositorio", "loc_total", "comentarios_total", "cbo_total", "dit_total", "lcom_total",
+               "arquivos_java", "loc_media_por_arquivo", "comentarios_media_por_arquivo", "ck_shards"]
+    with open(Path(destino) / "total_metrics_per_repo.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(colunas)
+        for n in range(repositorios):
+            arquivos = rng.randint(10, 20000)
+            loc = arquivos * rng.randint(20, 200)
+            comentarios = loc // rng.randint(3, 10)
+            writer.writerow([f"repo{n}", loc, comentarios, arquivos * 5, arquivos * 2, arquivos * 7, arquivos,
+                             round(loc / arquivos, 2), round(comentarios / arquivos, 2), 1])
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Substituto do `java -jar ck.jar` para benchmarks offline.
+
+Aceita a mesma linha de comando que ck_runner monta
+(`<java> -Xmx<N>m -jar <ck.jar> <projeto> true 0 true <prefixo de saída>`) e grava class.csv,
+method.csv, field.csv e variable.csv no formato do CK, com uma classe por arquivo .java, um método
+por `public int metodo` e uma variável local por método (field.csv fica só com o cabeçalho).
+Não executa a JVM: o tempo medido é o da orquestração (listagem, shards, I/O dos CSVs).
+"""
+import csv
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from sintetico import COLUNAS_CLASS, COLUNAS_METHOD, COLUNAS_VARIABLE, linha_classe, linha_metodo  # noqa: E402
+
+_PACOTE = re.compile(r"^package\s+([\w.]+);", re.M)
+_METODO = re.compile(r"public int (metodo\d+)\(")
+
+
+def main(argv):
+    projeto, prefixo = Path(argv[-5]), argv[-1]
+    with open(prefixo + "field.csv", "w", newline="", encoding="utf-8") as f_campo:
+        csv.writer(f_campo).writerow(COLUNAS_VARIABLE)
+    with open(prefixo + "class.csv", "w", newline="", encoding="utf-8") as f_classe, \
+            open(prefixo + "method.csv", "w", newline="", encoding="utf-8") as f_metodo, \
+            open(prefixo + "variable.csv", "w", newline="", encoding="utf-8") as f_variavel:
+        classes = csv.DictWriter(f_classe, fieldnames=COLUNAS_CLASS)
+        metodos = csv.DictWriter(f_metodo, fieldnames=COLUNAS_METHOD)
+        variaveis = csv.writer(f_variavel)
+        classes.writeheader()
+        metodos.writeheader()
+        variaveis.writerow(COLUNAS_VARIABLE)
+        for caminho in sorted(projeto.rglob("*.java")):
+            texto = caminho.read_text(encoding="utf-8", errors="replace")
+            pacote = _PACOTE.search(texto)
+            classe = f"{pacote.group(1)}.{caminho.stem}" if pacote else caminho.stem
+            classes.writerow(linha_classe(caminho, classe, texto.count("\n")))
+            for metodo in _METODO.findall(texto):
+                linha = linha_metodo(caminho, classe, metodo)
+                metodos.writerow(linha)
+                variaveis.writerow([caminho, classe, linha["method"], "resultado", 2])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,388 @@
+import csv
+import json
+import logging
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Dimensionamento do heap da JVM a partir do volume de código Java do repositório
+HEAP_MIN_MB = 512
+HEAP_BASE_MB = 256
+HEAP_MB_POR_MB_FONTE = 8
+
+TIPOS_CSV = ["class", "method", "field", "variable"]
+
+# Métricas que dependem de tipos de outras classes: com shards, referências a classes de outro
+# shard não são resolvidas pelo CK e esses valores podem ficar subestimados
+METRICAS_AFETADAS_POR_SHARD = ["cbo", "cboModified", "fanin", "fanout", "dit", "noc", "rfc"]
+
+
+def calcular_heap_mb(bytes_java, max_heap_mb=8192, fator=HEAP_MB_POR_MB_FONTE):
+    """Calcula o -Xmx (em MB) para o CK a partir do tamanho total dos arquivos .java.
+
+    Parâmetros:
+    - bytes_java (int): soma do tamanho dos arquivos .java do repositório.
+    - max_heap_mb (int): limite superior do heap.
+    - fator (float): MB de heap por MB de código-fonte.
+
+    Retorna:
+    - int: heap em MB, entre HEAP_MIN_MB e max_heap_mb.
+    """
+    heap = HEAP_BASE_MB + fator * bytes_java / (1024 * 1024)
+    return int(min(max(heap, HEAP_MIN_MB), max_heap_mb))
+
+
+def _executar_medindo(cmd, cwd):
+    """Executa o comando e retorna (código de saída, pico de memória residente em MB ou None).
+
+    Em sistemas POSIX o pico de memória do processo filho vem de os.wait4 (ru_maxrss, em KB no Linux).
+    """
+    processo = subprocess.Popen(cmd, cwd=cwd)
+    if hasattr(os, "wait4"):
+        _, status, uso = os.wait4(processo.pid, 0)
+        processo.returncode = os.waitstatus_to_exitcode(status)
+        return processo.returncode, round(uso.ru_maxrss / 1024, 1)
+    return processo.wait(), None
+
+
+def _executar_ck(jar_path, src_dir, out_dir, java_path, heap_mb):
+    """Executa uma instância do CK e retorna (código de saída, pico de memória em MB, tempo em s).
+
+    Os caminhos são absolutos porque o CK roda com out_dir como diretório de trabalho.
+    """
+    out_dir = Path(out_dir).resolve()
+    src_dir = Path(src_dir).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cmd = [
+        java_path, f"-Xmx{heap_mb}m", "-jar", str(jar_path),
+        str(src_dir),
+        "true",
+        "0",
+        "true",
+        str(out_dir) + os.sep  # o CK concatena o nome do CSV a este prefixo
+    ]
+    inicio = time.perf_counter()
+    codigo, pico_memoria_mb = _executar_medindo(cmd, cwd=str(out_dir))
+    return codigo, pico_memoria_mb, round(time.perf_counter() - inicio, 2)
+
+
+def _unidades(arquivos, raiz, nivel, max_arquivos, max_bytes):
+    """Divide os arquivos (lista de (caminho, bytes)) em unidades que respeitam o orçamento.
+
+    Os arquivos são agrupados pelo diretório no nível indicado (abaixo de raiz). Um grupo que cabe
+    no orçamento é uma unidade; senão, é dividido no nível seguinte. Os arquivos soltos no próprio
+    diretório formam uma unidade à parte, repartida em blocos se ainda assim não couber.
+    """
+    if len(arquivos) <= max_arquivos and sum(tamanho for _, tamanho in arquivos) <= max_bytes:
+        return [arquivos] if arquivos else []
+    grupos = {}
+    soltos = []
+    for arquivo, tamanho in arquivos:
+        partes = arquivo.relative_to(raiz).parts
+        if len(partes) > nivel + 1:
+            grupos.setdefault(partes[nivel], []).append((arquivo, tamanho))
+        else:
+            soltos.append((arquivo, tamanho))
+    unidades = []
+    bloco = []
+    for arquivo, tamanho in sorted(soltos):
+        if bloco and (len(bloco) >= max_arquivos or sum(t for _, t in bloco) + tamanho > max_bytes):
+            unidades.append(bloco)
+            bloco = []
+        bloco.append((arquivo, tamanho))
+    if bloco:
+        unidades.append(bloco)
+    for nome in sorted(grupos):
+        unidades.extend(_unidades(grupos[nome], raiz, nivel + 1, max_arquivos, max_bytes))
+    return unidades
+
+
+def planejar_shards(repo_dir, max_arquivos, max_bytes, arquivos=None):
+    """Agrupa os arquivos .java do repositório em shards por módulo/diretório, respeitando o orçamento.
+
+    As unidades de _unidades (módulos de topo, ou subdiretórios quando um módulo não cabe) são
+    distribuídas do maior para o menor no primeiro shard em que couberem.
+
+    Parâmetros:
+    - repo_dir (Path): raiz do repositório.
+    - max_arquivos (int | float), max_bytes (int | float): orçamento de cada shard.
+    - arquivos (list | None): arquivos a distribuir (padrão: todos os .java de repo_dir).
+
+    Retorna:
+    - list: lista de shards, cada um uma lista de caminhos de arquivos .java.
+    """
+    repo_dir = Path(repo_dir)
+    if arquivos is None:
+        arquivos = repo_dir.rglob("*.java")
+    arquivos = [(Path(arquivo), Path(arquivo).stat().st_size) for arquivo in arquivos]
+    unidades = _unidades(arquivos, repo_dir, 0, max_arquivos, max_bytes)
+    unidades.sort(key=lambda unidade: sum(tamanho for _, tamanho in unidade), reverse=True)
+    shards = []
+    for unidade in unidades:
+        arquivos_unidade = len(unidade)
+        bytes_unidade = sum(tamanho for _, tamanho in unidade)
+        for shard in shards:
+            if shard["arquivos"] + arquivos_unidade <= max_arquivos and shard["bytes"] + bytes_unidade <= max_bytes:
+                break
+        else:
+            shard = {"arquivos": 0, "bytes": 0, "caminhos": []}
+            shards.append(shard)
+        shard["arquivos"] += arquivos_unidade
+        shard["bytes"] += bytes_unidade
+        shard["caminhos"].extend(arquivo for arquivo, _ in unidade)
+    return [shard["caminhos"] for shard in shards]
+
+
+def _materializar_shard(repo_dir, caminhos, destino):
+    """Monta a árvore do shard em destino com hard links (ou cópias) preservando os caminhos relativos."""
+    for caminho in caminhos:
+        alvo = destino / caminho.relative_to(repo_dir)
+        alvo.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(caminho, alvo)
+        except OSError:
+            shutil.copy2(caminho, alvo)
+
+
+def _mesclar_csvs(shards, repo_dir, out_dir):
+    """Concatena os CSVs de cada shard em out_dir, reescrevendo a coluna file para o caminho original
+    e acrescentando a coluna ck_shard com o índice do shard de origem."""
+    for tipo in TIPOS_CSV:
+        destino = out_dir / f"{tipo}.csv"
+        cabecalho_escrito = False
+        with open(destino, "w", newline="", encoding="utf-8") as saida:
+            writer = csv.writer(saida)
+            for indice, (src_dir, shard_out) in enumerate(shards):
+                arquivos = list(shard_out.glob(f"*{tipo}.csv"))
+                if not arquivos:
+                    continue
+                prefixo = str(src_dir)
+                with open(arquivos[0], newline="", encoding="utf-8", errors="replace") as entrada:
+                    reader = csv.reader(entrada)
+                    cabecalho = next(reader, None)
+                    if cabecalho is None:
+                        continue
+                    if not cabecalho_escrito:
+                        writer.writerow(cabecalho + ["ck_shard"])
+                        cabecalho_escrito = True
+                    posicao_file = cabecalho.index("file") if "file" in cabecalho else None
+                    for linha in reader:
+                        if posicao_file is not None and linha[posicao_file].startswith(prefixo):
+                            linha[posicao_file] = str(repo_dir) + linha[posicao_file][len(prefixo):]
+                        writer.writerow(linha + [indice])
+        if not cabecalho_escrito:
+            destino.unlink()
+
+
+def _run_ck_sharded(jar_path, repo_dir, out_dir, java_path, max_heap_mb, shards, workers):
+    """Executa o CK em paralelo, um processo por shard, e mescla os resultados em out_dir."""
+    base = out_dir / "shards"
+    shutil.rmtree(base, ignore_errors=True)
+    preparados = []
+    for indice, caminhos in enumerate(shards):
+        src_dir = (base / f"shard-{indice}" / "src").resolve()
+        _materializar_shard(repo_dir, caminhos, src_dir)
+        bytes_shard = sum(caminho.stat().st_size for caminho in caminhos)
+        preparados.append((src_dir, base / f"shard-{indice}" / "out", calcular_heap_mb(bytes_shard, max_heap_mb)))
+
+    def executar(preparado):
+        src_dir, shard_out, heap_mb = preparado
+        return _executar_ck(jar_path, src_dir, shard_out, java_path, heap_mb)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        resultados = list(executor.map(executar, preparados))
+
+    falhas = [indice for indice, (codigo, _, _) in enumerate(resultados) if codigo != 0]
+    if not falhas:
+        _mesclar_csvs([(src_dir, shard_out) for src_dir, shard_out, _ in preparados], repo_dir.resolve(), out_dir)
+        (out_dir / "shards.json").write_text(json.dumps({
+            "shards": len(shards),
+            "arquivos_por_shard": [len(caminhos) for caminhos in shards],
+            "metricas_afetadas": METRICAS_AFETADAS_POR_SHARD,
+        }, indent=1), encoding="utf-8")
+    shutil.rmtree(base, ignore_errors=True)
+    return {
+        "codigo": 1 if falhas else 0,
+        "heap_mb": max(heap_mb for _, _, heap_mb in preparados),
+        "pico_memoria_mb": max((pico for _, pico, _ in resultados if pico is not None), default=None),
+        "shards_com_falha": falhas,
+    }
+
+
+def run_ck_on_repo(jar_path, repo_dir, out_dir, java_path="java", max_heap_mb=8192, metricas=None,
+                   shard_max_arquivos=None, shard_max_bytes=None, shard_workers=1, arquivos=None):
+    """Executa CK em um repositório específico, gravando os CSVs em out_dir.
+
+    Parâmetros:
+    - jar_path (Path): caminho do ck.jar.
+    - repo_dir (Path): diretório do repositório a analisar.
+    - out_dir (Path): diretório de saída dos CSVs (passado explicitamente ao CK).
+    - java_path (str): executável java.
+    - max_heap_mb (int): limite superior do heap calculado por calcular_heap_mb.
+    - metricas (dict | None): se informado, é preenchido com arquivos_java, bytes_java, heap_mb,
+      tempo_s, pico_memoria_mb e shards da execução.
+    - shard_max_arquivos (int | None), shard_max_bytes (int | None): orçamento de cada shard. Se o
+      repositório ultrapassar algum deles, é dividido em shards analisados em paralelo.
+    - shard_workers (int): execuções CK simultâneas ao analisar shards.
+    - arquivos (list | None): analisa apenas estes arquivos de repo_dir (montados à parte, como um
+      shard) em vez do repositório inteiro.
+
+    Retorna:
+    - bool: True se o CK terminou e gerou CSVs.
+
+    Observações:
+    - O diretório de trabalho do processo atual não é alterado, então execuções concorrentes são seguras.
+    - Com shards, os CSVs de cada shard são mesclados em out_dir (coluna ck_shard indica a origem) e
+      shards.json lista as métricas que dependem de resolução entre classes de shards diferentes
+      (METRICAS_AFETADAS_POR_SHARD), que podem ficar subestimadas.
+    """
+    repo_dir = Path(repo_dir)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    java_files = list(repo_dir.rglob("*.java")) if arquivos is None else [Path(arquivo) for arquivo in arquivos]
+    if not java_files:
+        logger.warning(f"Nenhum arquivo .java encontrado em: {repo_dir.name}")
+        return False
+
+    bytes_java = sum(arquivo.stat().st_size for arquivo in java_files)
+    limite_arquivos = shard_max_arquivos or float("inf")
+    limite_bytes = shard_max_bytes or float("inf")
+    shards = None
+    if arquivos is not None:
+        shards = planejar_shards(repo_dir, limite_arquivos, limite_bytes, java_files)
+    elif len(java_files) > limite_arquivos or bytes_java > limite_bytes:
+        shards = planejar_shards(repo_dir, limite_arquivos, limite_bytes)
+
+    # Remove o marcador de uma execução anterior em shards
+    (out_dir / "shards.json").unlink(missing_ok=True)
+    inicio = time.perf_counter()
+    if shards and (len(shards) > 1 or arquivos is not None):
+        logger.info(f"Executando CK em {repo_dir.name} ({len(java_files)} arquivos Java, "
+                    f"{bytes_java / (1024 * 1024):.1f} MB) dividido em {len(shards)} shards")
+        resultado = _run_ck_sharded(jar_path, repo_dir, out_dir, java_path, max_heap_mb, shards, shard_workers)
+        codigo, heap_mb, pico_memoria_mb = resultado["codigo"], resultado["heap_mb"], resultado["pico_memoria_mb"]
+        if resultado["shards_com_falha"]:
+            logger.error(f"Shards com falha em {repo_dir.name}: {resultado['shards_com_falha']}")
+    else:
+        shards = [java_files]
+        heap_mb = calcular_heap_mb(bytes_java, max_heap_mb)
+        logger.info(f"Executando CK em {repo_dir.name} ({len(java_files)} arquivos Java, "
+                    f"{bytes_java / (1024 * 1024):.1f} MB, heap {heap_mb} MB)")
+        codigo, pico_memoria_mb, _ = _executar_ck(jar_path, repo_dir, out_dir, java_path, heap_mb)
+    tempo_s = round(time.perf_counter() - inicio, 2)
+
+    logger.info(f"CK em {repo_dir.name}: {tempo_s}s, pico de memória da JVM: "
+                f"{pico_memoria_mb if pico_memoria_mb is not None else '?'} MB")
+    if metricas is not None:
+        metricas.update({
+            "arquivos_java": len(java_files),
+            "bytes_java": bytes_java,
+            "heap_mb": heap_mb,
+            "tempo_s": tempo_s,
+            "pico_memoria_mb": pico_memoria_mb,
+            "shards": len(shards),
+        })
+
+    if codigo != 0:
+        logger.error(f"Erro ao analisar {repo_dir.name}: CK terminou com código {codigo}")
+        return False
+    logger.info(f"Análise CK concluída para {repo_dir.name}")
+
+    csv_files = list(out_dir.glob("*.csv"))
+    if csv_files:
+        logger.info(f"Arquivos gerados: {len(csv_files)} CSVs")
+        return True
+    logger.warning(f"Nenhum arquivo CSV foi gerado para {repo_dir.name}")
+    return False
+
+
+def _gravar_csv_incremental(destino, blobs, novos, colunas, cache, tipo):
+    """Grava destino com as linhas de cada arquivo de blobs, vindas de novos ou do cache.
+
+    Retorna o número de linhas gravadas.
+    """
+    if colunas is None and destino.exists():
+        # Nenhum arquivo com linhas deste tipo foi analisado desde que o cache existe
+        with open(destino, newline="", encoding="utf-8", errors="replace") as f:
+            colunas = [coluna for coluna in next(csv.reader(f), []) if coluna not in ("file", "ck_shard")] or None
+    if colunas is None:
+        destino.unlink(missing_ok=True)
+        return 0
+    caminhos = list(blobs.items())
+    total = 0
+    with open(destino, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["file"] + colunas, restval="", extrasaction="ignore")
+        writer.writeheader()
+        # Em lotes, para não manter em memória as linhas em cache do repositório inteiro
+        for inicio in range(0, len(caminhos), 500):
+            lote = caminhos[inicio:inicio + 500]
+            anteriores = cache.linhas_por_blob([blob for _, blob in lote if blob not in novos], tipo)
+            for caminho, blob in lote:
+                for linha in novos.get(blob, anteriores.get(blob, ())):
+                    writer.writerow({"file": caminho, **linha})
+                    total += 1
+    return total
+
+
+def run_ck_incremental(jar_path, repo_dir, out_dir, blobs, cache, **opcoes):
+    """Executa o CK apenas nos arquivos cujo blob do git ainda não foi analisado e monta os CSVs
+    completos do repositório (class, method, field e variable) em out_dir.
+
+    Parâmetros:
+    - jar_path, repo_dir, out_dir: como em run_ck_on_repo.
+    - blobs (dict): caminho absoluto -> hash de blob do git de cada .java (analysis_cache.blobs_java).
+    - cache (AnaliseCache): cache das linhas dos CSVs do CK por blob.
+    - opcoes: demais parâmetros de run_ck_on_repo (java_path, max_heap_mb, metricas, shard_*).
+
+    Retorna:
+    - bool: True se o CSV de classes foi gerado.
+
+    Observações:
+    - As linhas dos arquivos inalterados vêm do cache; as dos arquivos novos ou alterados são
+      calculadas pelo CK e armazenadas. Como no caso dos shards, referências a classes fora dos
+      arquivos reanalisados não são resolvidas (METRICAS_AFETADAS_POR_SHARD).
+    - Se nenhum arquivo mudou, o CK não roda e o shards.json da execução anterior é mantido.
+    """
+    # As chaves de blobs são caminhos reais, então a raiz também precisa ser
+    repo_dir = Path(repo_dir).resolve()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    analisados = cache.blobs_analisados(blobs.values(), TIPOS_CSV)
+    alterados = [caminho for caminho, blob in blobs.items() if blob not in analisados]
+    logger.info(f"Análise incremental de {repo_dir.name}: {len(blobs) - len(alterados)} arquivos reaproveitados, "
+                f"{len(alterados)} a analisar")
+    if opcoes.get("metricas") is not None:
+        opcoes["metricas"]["arquivos_reaproveitados"] = len(blobs) - len(alterados)
+
+    novos = {tipo: {} for tipo in TIPOS_CSV}
+    colunas = {tipo: cache.colunas(tipo) for tipo in TIPOS_CSV}
+    if alterados:
+        if not run_ck_on_repo(jar_path, repo_dir, out_dir, arquivos=alterados, **opcoes):
+            return False
+        for tipo in TIPOS_CSV:
+            # Arquivos sem nenhuma linha também são registrados (lista vazia) para não serem reanalisados
+            por_blob = novos[tipo] = {blobs[caminho]: [] for caminho in alterados}
+            arquivo = out_dir / f"{tipo}.csv"
+            if arquivo.exists():
+                with open(arquivo, newline="", encoding="utf-8", errors="replace") as f:
+                    reader = csv.DictReader(f)
+                    colunas[tipo] = [coluna for coluna in reader.fieldnames if coluna not in ("file", "ck_shard")]
+                    for linha in reader:
+                        blob = blobs.get(linha["file"])
+                        if blob in por_blob:
+                            por_blob[blob].append({coluna: valor for coluna, valor in linha.items()
+                                                   if coluna not in ("file", "ck_shard")})
+            cache.salvar_linhas(tipo, por_blob, colunas[tipo])
+
+    for tipo in TIPOS_CSV:
+        linhas = _gravar_csv_incremental(out_dir / f"{tipo}.csv", blobs, novos[tipo], colunas[tipo], cache, tipo)
+        if tipo == "class" and not linhas and not alterados:
+            logger.warning(f"Nenhuma classe encontrada em {repo_dir.name}")
+            return False
+    return True
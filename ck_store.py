@@ -0,0 +1,150 @@
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # armazenamento Parquet é opcional
+    pa = None
+
+# Tipos dos CSVs gerados pelo CK; as demais colunas são contagens inteiras
+TIPOS_CK = ["class", "method", "field", "variable"]
+COLUNAS_TEXTO = {"file", "class", "type", "method", "variable"}
+COLUNAS_BOOL = {"constructor", "hasJavaDoc"}
+COLUNAS_FLOAT = {"lcom*", "tcc", "lcc"}
+
+
+def _exigir_pyarrow():
+    if pa is None:
+        raise ImportError("O armazenamento Parquet do CK requer o pacote pyarrow (pip install pyarrow)")
+
+
+def _tipo_coluna(coluna):
+    if coluna in COLUNAS_TEXTO:
+        return pa.string()
+    if coluna in COLUNAS_BOOL:
+        return pa.bool_()
+    if coluna in COLUNAS_FLOAT:
+        return pa.float64()
+    return pa.int64()
+
+
+def salvar_ck_parquet(results_dir, repositorio, destino, compressao="zstd"):
+    """Converte os CSVs do CK de um repositório para Parquet, particionado por repositório.
+
+    Parâmetros:
+    - results_dir (Path): diretório com os CSVs do CK do repositório (class, method, field, variable).
+    - repositorio (str): identificador do repositório (ex.: "owner/repo"), usado como partição.
+    - destino (Path): raiz do armazenamento; cada tipo fica em destino/<tipo>/repositorio=<id>/.
+    - compressao (str): codec de compressão do Parquet.
+
+    Retorna:
+    - dict: número de linhas gravadas por tipo de CSV.
+
+    Observações:
+    - Os CSVs são lidos em blocos (streaming) e gravados em row groups, sem carregar o arquivo inteiro.
+    - Os tipos das colunas são fixos (texto, booleano, float ou inteiro), para que todas as partições
+      tenham o mesmo schema.
+    - Reprocessar um repositório substitui a partição dele.
+    """
+    _exigir_pyarrow()
+    linhas = {}
+    for tipo in TIPOS_CK:
+        arquivos = list(Path(results_dir).glob(f"*{tipo}.csv"))
+        if not arquivos:
+            continue
+        particao = Path(destino) / tipo / f"repositorio={quote(repositorio, safe='')}"
+        particao.mkdir(parents=True, exist_ok=True)
+        for antigo in particao.glob("*.parquet"):
+            antigo.unlink()
+
+        with open(arquivos[0], "r", encoding="utf-8", errors="replace") as f:
+            cabecalho = f.readline().strip().split(",")
+        tipos = {coluna: _tipo_coluna(coluna) for coluna in cabecalho}
+        leitor = pa_csv.open_csv(
+            arquivos[0],
+            convert_options=pa_csv.ConvertOptions(column_types=tipos, null_values=["", "NaN", "null"],
+                                                  true_values=["true"], false_values=["false"]),
+        )
+        total = 0
+        with pq.ParquetWriter(particao / "part-0.parquet", leitor.schema, compression=compressao) as writer:
+            for lote in leitor:
+                writer.write_batch(lote)
+                total += lote.num_rows
+        linhas[tipo] = total
+    return linhas
+
+
+def abrir_dataset(destino, tipo):
+    """Abre o dataset Parquet de um tipo de CSV do CK (class, method, field, variable) de todos os repositórios."""
+    _exigir_pyarrow()
+    return ds.dataset(Path(destino) / tipo, format="parquet", partitioning="hive")
+
+
+def _filtro_repositorios(repositorios):
+    if repositorios is None:
+        return None
+    return ds.field("repositorio").isin(list(repositorios))
+
+
+def consultar(destino, tipo, colunas, repositorios=None, filtro=None):
+    """Lê apenas as colunas e partições necessárias do armazenamento Parquet do CK.
+
+    Parâmetros:
+    - destino (Path): raiz do armazenamento.
+    - tipo (str): "class", "method", "field" ou "variable".
+    - colunas (list): colunas a ler (inclua "repositorio" para identificar a origem de cada linha).
+    - repositorios (list | None): restringe a leitura às partições desses repositórios.
+    - filtro (pyarrow.dataset.Expression | None): filtro adicional aplicado durante a leitura.
+
+    Retorna:
+    - DataFrame: linhas que satisfazem os filtros, apenas com as colunas pedidas.
+    """
+    expressao = _filtro_repositorios(repositorios)
+    if filtro is not None:
+        expressao = filtro if expressao is None else expressao & filtro
+    return abrir_dataset(destino, tipo).to_table(columns=colunas, filter=expressao).to_pandas()
+
+
+def agregar_por_repositorio(destino, tipo, metricas, repositorios=None, filtro=None):
+    """Calcula soma, contagem, mínimo, máximo e média de métricas por repositório, em streaming.
+
+    O dataset é percorrido em lotes; cada lote é agregado e apenas os parciais ficam em memória,
+    então a memória usada depende do número de repositórios, não do número de linhas.
+
+    Parâmetros:
+    - destino (Path): raiz do armazenamento.
+    - tipo (str): "class", "method", "field" ou "variable".
+    - metricas (list): colunas numéricas a agregar (ex.: ["wmc", "loc"]).
+    - repositorios (list | None): restringe a leitura às partições desses repositórios.
+    - filtro (pyarrow.dataset.Expression | None): filtro adicional aplicado durante a leitura.
+
+    Retorna:
+    - DataFrame: indexado por repositório, com colunas <metrica>_sum, _count, _min, _max e _mean.
+    """
+    expressao = _filtro_repositorios(repositorios)
+    if filtro is not None:
+        expressao = filtro if expressao is None else expressao & filtro
+    dataset = abrir_dataset(destino, tipo)
+
+    agregacoes = [(metrica, funcao) for metrica in metricas for funcao in ("sum", "count", "min", "max")]
+    parciais = []
+    for lote in dataset.to_batches(columns=["repositorio"] + list(metricas), filter=expressao):
+        if lote.num_rows:
+            tabela = pa.Table.from_batches([lote]).group_by("repositorio").aggregate(agregacoes)
+            parciais.append(tabela.to_pandas())
+    if not parciais:
+        return pd.DataFrame()
+
+    combinado = pd.concat(parciais, ignore_index=True).groupby("repositorio")
+    resultado = pd.DataFrame({
+        f"{metrica}_{funcao}": getattr(combinado[f"{metrica}_{funcao}"], "sum" if funcao in ("sum", "count") else funcao)()
+        for metrica, funcao in agregacoes
+    })
+    for metrica in metricas:
+        resultado[f"{metrica}_mean"] = resultado[f"{metrica}_sum"] / resultado[f"{metrica}_count"]
+    return resultado
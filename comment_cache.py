@@ -0,0 +1,70 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class ComentariosCache:
+    """Cache persistente (SQLite) da contagem de linhas de comentário por arquivo .java.
+
+    Parâmetros:
+    - caminho (Path | str): arquivo SQLite do cache.
+
+    Observações:
+    - A busca rápida é pelo caminho do arquivo, validada por mtime e tamanho: o arquivo não
+      precisa ser lido de novo se não mudou.
+    - As contagens também ficam indexadas pelo hash de blob do git (por_hash), para que o mesmo
+      conteúdo em outro caminho ou checkout possa ser reaproveitado sem ler o arquivo: o hash de
+      cada arquivo de um checkout vem de `git ls-files -s` (ver analysis_cache.blobs_java).
+    - É seguro compartilhar uma instância entre threads.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS arquivos (
+                    caminho TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    hash TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS conteudos (
+                    hash TEXT PRIMARY KEY,
+                    comentarios INTEGER NOT NULL
+                )
+            """)
+
+    def por_caminho(self, caminho, mtime_ns, tamanho):
+        """Retorna a contagem armazenada se o arquivo não mudou desde que foi contado, senão None."""
+        with self._lock:
+            linha = self._conn.execute("""
+                SELECT c.comentarios FROM arquivos a JOIN conteudos c ON c.hash = a.hash
+                WHERE a.caminho = ? AND a.mtime_ns = ? AND a.tamanho = ?
+            """, (str(caminho), mtime_ns, tamanho)).fetchone()
+        return linha[0] if linha else None
+
+    def por_hash(self, hash_conteudo):
+        """Retorna a contagem armazenada para o conteúdo com esse hash, ou None."""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT comentarios FROM conteudos WHERE hash = ?", (hash_conteudo,)
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def salvar(self, registros):
+        """Armazena uma lista de tuplas (caminho, mtime_ns, tamanho, hash, comentarios)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO conteudos (hash, comentarios) VALUES (?, ?)",
+                [(hash_conteudo, comentarios) for _, _, _, hash_conteudo, comentarios in registros],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO arquivos (caminho, mtime_ns, tamanho, hash) VALUES (?, ?, ?, ?)",
+                [(str(caminho), mtime_ns, tamanho, hash_conteudo)
+                 for caminho, mtime_ns, tamanho, hash_conteudo, _ in registros],
+            )
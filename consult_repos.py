@@ -1,107 +1,157 @@
-import requests
 from dotenv import load_dotenv
 from datetime import datetime, timezone
 import pandas as pd
-import time
 from pathlib import Path
 import subprocess
 import os
 import shutil
-from extract_metrics import processar_ck_results_repo, gerar_metrics_totais_finais, exibir_resumo_final
+import threading
+from urllib.parse import parse_qs, urlparse
+from extract_metrics import (processar_ck_results_repo, gerar_metrics_totais_finais, exibir_resumo_final,
+                             anexar_metricas_repo, COLUNAS_DISTRIBUICAO, COLUNAS_METODOS)
+from pipeline import executar_pipeline
+from github_client import GitHubClient, map_concorrente
+from http_cache import HttpCache
+from run_manifest import RunManifest
+from comment_cache import ComentariosCache
+from ck_store import salvar_ck_parquet
+from mirror_store import MirrorStore, tamanho_diretorio
+from run_report import RunReport
+from disk_scheduler import AgendadorDisco, Lixeira, intercalar_por_tamanho
+from ck_runner import run_ck_on_repo, run_ck_incremental
+from analysis_cache import AnaliseCache, blobs_java, commit_local, commit_remoto
+from rq_analysis import MotorCorrelacoes
+from repo_source import FonteRepositorios
+import argparse
+from graphql_collector import GraphQLFixtures, collect_repo_metadata_graphql
+import logging
 import stat
-import tempfile
 import os
 
+logger = logging.getLogger(__name__)
+
 def remove_readonly(func, path, _):
     """Remove sinalizador de somente leitura e tenta excluir novamente (para arquivos Git do Windows)"""
     os.chmod(path, stat.S_IWRITE)
     func(path)
 
-def safe_remove_repository(repo_path):
-    """Remove repositório de forma segura, lidando com arquivos somente leitura"""
+def tamanho_projetado(repo):
+    """Tamanho projetado do checkout em bytes, a partir do campo size (KB) retornado pela API de busca."""
+    return int((repo.get("size") or 0) * 1024 * clone_size_factor)
+
+
+def orcamento_disco(destino):
+    """Orçamento de disco para checkouts em bytes (DISK_BUDGET_GB ou 80% do espaço livre); None desativa."""
+    if disk_budget_gb is not None:
+        return int(float(disk_budget_gb) * 1024 ** 3) or None
+    return int(shutil.disk_usage(destino).free * 0.8)
+
+
+def safe_remove_repository(repo_path, lixeira=None, tamanho=0):
+    """Remove repositório de forma segura, lidando com arquivos somente leitura.
+
+    Com lixeira (disk_scheduler.Lixeira), o diretório é renomeado e apagado em segundo plano;
+    tamanho (bytes) continua contando contra o orçamento de disco até a remoção terminar.
+    """
+    if lixeira is not None and lixeira.descartar(repo_path, tamanho):
+        logger.info(f"Repositório {repo_path.name} enviado para remoção em segundo plano")
+        return True
     try:
         shutil.rmtree(repo_path, onerror=remove_readonly)
-        print(f"Repositório {repo_path.name} removido para liberar espaço")
+        logger.info(f"Repositório {repo_path.name} removido para liberar espaço")
         return True
     except Exception as clean_error:
-        print(f"AVISO: Erro ao remover {repo_path.name}: {clean_error}")
-        
-        try:
-            for root, dirs, files in os.walk(repo_path):
-                for dir in dirs:
-                    os.chmod(os.path.join(root, dir), stat.S_IWRITE)
-                for file in files:
-                    os.chmod(os.path.join(root, file), stat.S_IWRITE)
-            shutil.rmtree(repo_path, ignore_errors=True)
-            print(f"Repositório {repo_path.name} removido com força bruta")
+        logger.warning(f"Erro ao remover {repo_path.name}: {clean_error}")
+
+        for root, dirs, files in os.walk(repo_path):
+            for nome in dirs + files:
+                try:
+                    os.chmod(os.path.join(root, nome), stat.S_IWRITE | stat.S_IREAD | stat.S_IEXEC)
+                except OSError:
+                    pass
+        shutil.rmtree(repo_path, ignore_errors=True)
+        if not repo_path.exists():
+            logger.info(f"Repositório {repo_path.name} removido com força bruta")
             return True
-        except:
-            pass
-        
-        try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                result = subprocess.run([
-                    'robocopy', temp_dir, str(repo_path), '/MIR', '/NFL', '/NDL', '/NJS'
-                ], capture_output=True, text=True)
-                if result.returncode < 8:
-                    os.rmdir(repo_path)
-                    print(f"Repositório {repo_path.name} removido via robocopy")
-                    return True
-        except Exception as e:
-            print(f"AVISO: Robocopy também falhou: {e}")
-        
-        print(f"ERRO: Não foi possível remover {repo_path.name} - continuando...")
+
+        logger.error(f"Não foi possível remover {repo_path.name} - continuando...")
         return False
 
-load_dotenv()
 
-token = os.getenv("GITHUB_TOKEN")
-path_repositories = os.getenv("PATH_REPOSITORIES")  # e.g., r"C:\path\to\repositories"
-path_ck_jar = os.getenv("PATH_CK_JAR")  # e.g., r"C:\path\to\ck.jar"
-path_output_ck = os.getenv("PATH_OUTPUT_CK")  # e.g., r"C:\path\to\output"
-path_results_metrics = os.getenv("PATH_RESULTS_METRICS")  # e.g., r"C:\path\to\results"
-java_path = os.getenv("JAVA_PATH")  # e.g., r"C:\Program Files\Java\jdk-24\bin\java.exe"
+# Arquivos da saída do CK mantidos depois da agregação: as estatísticas por classe e o número de
+# shards, reaproveitado por run_ck_incremental quando nenhum arquivo mudou
+SAIDA_CK_MANTIDA = ("estatisticas_metodos.csv", "shards.json")
 
-def get_popular_repositories_java(num_repos):
-    """
-    Retorna os repositórios Java mais populares do GitHub, ordenados por número de estrelas.
 
-    Parâmetros:
-    - num_repos (int): número máximo de repositórios a buscar (até 1000).
+def descartar_saida_ck(repo_out_dir, lixeira):
+    """Remove os CSVs do CK de um repositório já agregado, mantendo apenas SAIDA_CK_MANTIDA.
+
+    Os demais arquivos são movidos para um subdiretório, entregue à lixeira (disk_scheduler.Lixeira)
+    para remoção em segundo plano; com CK_PARQUET_DIR, a saída completa continua no Parquet.
 
     Retorna:
-    - list: lista de dicionários, cada um representando um repositório conforme o campo "items" da resposta da API.
+    - bool: True se os arquivos foram removidos de repo_out_dir.
+    """
+    descarte = repo_out_dir / ".descarte"
+    descarte.mkdir(exist_ok=True)
+    for caminho in list(repo_out_dir.iterdir()):
+        if caminho != descarte and caminho.name not in SAIDA_CK_MANTIDA:
+            os.replace(caminho, descarte / caminho.name)
+    return lixeira.descartar(descarte)
 
-    Arremessa:
-    - Exception: se alguma requisição HTTP não retornar status 200.
+load_dotenv()
 
-    Observações:
-    - A função faz a paginação automaticamente para buscar mais de 100 repositórios, respeitando o limite de 1000 imposto pela API do GitHub.
-    - Insere um delay de 2 segundos entre as requisições para evitar atingir o rate limit da API.
-    """
-    all_repos = []
-    per_page = 100
-    for page in range(1, (num_repos // per_page) + 2):
-        url = (
-            f"https://api.github.com/search/repositories"
-            f"?q=language:Java+stars:>0&sort=stars&order=desc"
-            f"&per_page={per_page}&page={page}"
-        )
-        headers = {"Authorization": f"Token {token}"}
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            items = response.json()["items"]
-            all_repos.extend(items)
-            if len(all_repos) >= num_repos or not items:
-                break
-        else:
-            raise Exception(
-                f"Error fetching repositories: {response.status_code} - {response.text}"
-            )
-        time.sleep(2)  
-    return all_repos[:num_repos]
+token = os.getenv("GITHUB_TOKEN")
+path_repositories = os.getenv("PATH_REPOSITORIES")  # e.g., r"C:\path\to\repositories"
+path_ck_jar = os.getenv("PATH_CK_JAR")  # e.g., r"C:\path\to\ck.jar"
+path_output_ck = os.getenv("PATH_OUTPUT_CK")  # e.g., r"C:\path\to\output"
+path_results_metrics = os.getenv("PATH_RESULTS_METRICS")  # e.g., r"C:\path\to\results"
+java_path = os.getenv("JAVA_PATH", "java")  # e.g., r"C:\Program Files\Java\jdk-24\bin\java.exe"
+ck_max_heap_mb = int(os.getenv("CK_MAX_HEAP_MB", "8192"))  # limite do heap calculado para cada execução CK
+ck_shard_max_files = int(os.getenv("CK_SHARD_MAX_FILES", "20000"))  # acima disso o repositório é dividido em shards (0 desativa)
+ck_shard_max_mb = int(os.getenv("CK_SHARD_MAX_MB", "200"))  # MB de código .java por shard (0 desativa)
+ck_shard_workers = int(os.getenv("CK_SHARD_WORKERS", "2"))  # shards de um mesmo repositório analisados ao mesmo tempo
+clone_workers = int(os.getenv("CLONE_WORKERS", "2"))  # clones simultâneos (rede)
+ck_workers = int(os.getenv("CK_WORKERS", "1"))  # execuções CK simultâneas (CPU/memória)
+cleanup_workers = int(os.getenv("CLEANUP_WORKERS", "1"))  # remoções simultâneas (disco)
+max_checkouts = int(os.getenv("MAX_CHECKOUTS", "3"))  # repositórios clonados em disco ao mesmo tempo
+api_workers = int(os.getenv("API_WORKERS", "8"))  # requisições simultâneas à API do GitHub
+num_repos = int(os.getenv("NUM_REPOS", "1000"))  # repositórios analisados (acima de 1000, busca em janelas de estrelas)
+search_workers = int(os.getenv("SEARCH_WORKERS", "4"))  # páginas da busca baixadas ao mesmo tempo
+repo_list_refresh = os.getenv("REPO_LIST_REFRESH", "0") == "1"  # refaz a busca mesmo com data/repository_data.csv
+releases_count_mode = os.getenv("RELEASES_COUNT_MODE", "link")  # "link", "graphql" ou "paginate"
+metadata_source = os.getenv("METADATA_SOURCE", "graphql")  # "graphql" (lotes) ou "rest" (por repositório)
+fixtures_dir = os.getenv("GITHUB_FIXTURES_DIR")  # respostas GraphQL gravadas, para execução offline
+fixtures_mode = os.getenv("GITHUB_FIXTURES_MODE", "replay")  # "record" ou "replay"
+clone_mode = os.getenv("CLONE_MODE", "sparse")  # "sparse" (apenas *.java) ou "shallow"
+clone_timeout = float(os.getenv("CLONE_TIMEOUT", "1800"))  # segundos por comando git
+mirror_cache_dir = os.getenv("MIRROR_CACHE_DIR")  # se definido, clona via mirrors locais reaproveitados
+mirror_cache_max_gb = os.getenv("MIRROR_CACHE_MAX_GB")  # orçamento de disco dos mirrors (remoção LRU)
+ck_parquet_dir = os.getenv("CK_PARQUET_DIR")  # se definido, guarda a saída completa do CK em Parquet
+incremental = os.getenv("INCREMENTAL", "1") == "1"  # pula repositórios cujo HEAD não mudou desde a última análise
+disk_budget_gb = os.getenv("DISK_BUDGET_GB")  # espaço para checkouts; padrão: 80% do espaço livre, "0" desativa
+clone_size_factor = float(os.getenv("CLONE_SIZE_FACTOR", "1.0"))  # checkout projetado = size da API x fator
+ck_incremental_files = os.getenv("CK_INCREMENTAL_FILES", "0") == "1"  # CK apenas nos arquivos (blobs) alterados
+method_memory_mb = int(os.getenv("METHOD_MEMORY_MB", "256"))  # teto de memória da leitura dos CSVs de métodos/variáveis
+
+http_cache_path = os.getenv("HTTP_CACHE_PATH", "data/http_cache.sqlite")  # vazio desativa o cache
+http_cache_ttl = float(os.getenv("HTTP_CACHE_TTL", "0"))  # segundos sem revalidar uma resposta
+http_cache_max_mb = os.getenv("HTTP_CACHE_MAX_MB")  # limite de tamanho do cache (remoção LRU)
+http_cache_max_age = os.getenv("HTTP_CACHE_MAX_AGE")  # segundos após os quais uma resposta é descartada
+github_offline = os.getenv("GITHUB_OFFLINE", "0") == "1"  # serve apenas respostas já armazenadas
+
+http_cache = None
+if http_cache_path:
+    http_cache = HttpCache(
+        http_cache_path,
+        ttl=http_cache_ttl,
+        max_idade=float(http_cache_max_age) if http_cache_max_age else None,
+        max_bytes=int(float(http_cache_max_mb) * 1024 * 1024) if http_cache_max_mb else None,
+    )
+github = GitHubClient(token, base_url=os.getenv("GITHUB_API_URL", "https://api.github.com"),
+                      pool_size=api_workers, cache=http_cache, offline=github_offline)
+graphql_client = GraphQLFixtures(github, fixtures_dir, fixtures_mode) if fixtures_dir else github
 
-    
 def get_repository_age_years(repo_details):
     """Calcula a idade do repositório em anos.
 
@@ -131,17 +181,50 @@ def get_repositories_details(owner, repository):
     Arremessa:
     - Exception: se a requisição HTTP não retornar status 200.
     """
-    url = f"https://api.github.com/repos/{owner}/{repository}"
-    headers = {
-        "Authorization": f"Token {token}"
-    }
-    response = requests.get(url, headers=headers)
+    response = github.get(f"repos/{owner}/{repository}")
     if response.status_code == 200:
         return response.json()
     else:
         raise Exception(f"Error fetching repository details: {response.status_code} - {response.text}")
 
 def get_repository_releases_count(owner, repository):
+    """Conta o número total de releases de um repositório com uma única requisição.
+
+    Pede a primeira página com per_page=1 e lê o número da última página no cabeçalho
+    Link (rel="last"), que é igual ao total de releases.
+
+    Parâmetros:
+    - owner (str): proprietário/organização do repositório.
+    - repository (str): nome do repositório.
+
+    Retorna:
+    - int: número total de releases.
+
+    Arremessa:
+    - Exception: se a requisição HTTP retornar status diferente de 200.
+
+    Observações:
+    - Se a resposta não trouxer o cabeçalho Link, o total é o tamanho da própria página (0 ou 1).
+    - Com RELEASES_COUNT_MODE=paginate usa a contagem paginada (get_repository_releases_count_paginated).
+    """
+    if releases_count_mode == "paginate":
+        return get_repository_releases_count_paginated(owner, repository)
+
+    response = github.get(f"repos/{owner}/{repository}/releases", params={"per_page": 1})
+    if response.status_code != 200:
+        raise Exception(f"Error fetching repository releases: {response.status_code} - {response.text}")
+
+    last = response.links.get("last")
+    if last:
+        page = parse_qs(urlparse(last["url"]).query).get("page")
+        if page:
+            return int(page[0])
+        # Link sem número de página: recorre à contagem paginada
+        return get_repository_releases_count_paginated(owner, repository)
+    return len(response.json())
+
+
+def get_repository_releases_count_paginated(owner, repository):
     """Conta o número total de releases de um repositório paginando o endpoint de releases.
 
     Parâmetros:
@@ -154,22 +237,38 @@ def get_repository_releases_count(owner, repository):
     Arremessa:
     - Exception: se alguma requisição HTTP de página retornar status diferente de 200.
     """
-    url = f"https://api.github.com/repos/{owner}/{repository}/releases"
-    headers = {"Authorization": f"Token {token}"}
+    url = f"repos/{owner}/{repository}/releases"
     page = 1
-    releases = []
+    total_releases = 0
     while True:
-        print(f"Fetching releases for page {page}")
-        response = requests.get(f"{url}?page={page}&per_page=100", headers=headers)
+        logger.info(f"Fetching releases for page {page}")
+        response = github.get(url, params={"page": page, "per_page": 100})
         if response.status_code == 200:
             page_releases = response.json()
             if not page_releases:
                 break
-            releases.extend(page_releases)
+            total_releases += len(page_releases)
             page += 1
         else:
             raise Exception(f"Error fetching repository releases: {response.status_code} - {response.text}")
-    return len(releases)
+    return total_releases
+
+
+def get_releases_count_graphql(full_names, batch_size=100):
+    """Conta as releases de vários repositórios em lote via GraphQL (releases { totalCount }).
+
+    Parâmetros:
+    - full_names (list): nomes completos ("owner/repo") dos repositórios.
+    - batch_size (int): quantidade de repositórios consultados por requisição GraphQL.
+
+    Retorna:
+    - dict: mapeia cada full_name para o total de releases (repositórios não encontrados ficam de fora).
+
+    Arremessa:
+    - Exception: se a requisição GraphQL falhar.
+    """
+    metadados = collect_repo_metadata_graphql(graphql_client, full_names, batch_size=batch_size)
+    return {full_name: repo["releases_count"] for full_name, repo in metadados.items()}
     
     
 def get_repository_url(repo_details):
@@ -181,143 +280,166 @@ def get_stargazers_count(repo_details):
     return repo_details.get("stargazers_count", 0)
 
 
-def collect_and_save_repo_info(repos):
-    """Coleta informações detalhadas de uma lista de repositórios e salva em um arquivo Excel.
+def collect_repo_info(repos):
+    """Coleta informações detalhadas de uma lista de repositórios (ex.: uma página da busca).
 
     Parâmetros:
     - repos (list): lista de dicionários com informações dos repositórios; cada dicionário deve conter as chaves "full_name", "name" e "owner".
 
     Retorna:
-    - None: função salva os dados em "repository_data.xlsx" e não retorna valor.
+    - list: uma linha por repositório com full_name, repo_name, url, stars_count, releases_count,
+      repo_age_years e size_kb (campo size do item da busca); repositórios sem metadados ficam de fora.
 
     Arremessa:
     - Exception: se alguma chamada à API feita durante a coleta falhar (propaga exceções das funções chamadoras).
 
     Observações:
-    - Faz chamadas adicionais à API para cada repositório; insere um delay de 3 segundos entre requisições para suavizar a carga na API e não tomar timeout por excesso de requisições feitas em menos de 1 minuto.
+    - Faz chamadas adicionais à API para cada repositório; os repositórios são consultados em paralelo
+      (API_WORKERS requisições simultâneas) e o GitHubClient espera apenas quando o rate limit se esgota.
+    - Com RELEASES_COUNT_MODE=graphql as releases de todos os repositórios são contadas antes, em lotes GraphQL.
+    - Com METADATA_SOURCE=graphql (padrão) usa collect_repo_metadata_graphql: estrelas, data de criação, URL e
+      releases de 50 repositórios por requisição, em vez de uma chamada de detalhes + releases por repositório.
     """
-    rows = []
-
-    for index, repo in enumerate(repos):
-        print(f"Processing repository: {repo['full_name']}\nTotal remaining: {len(repos) - index - 1}")
+    if metadata_source == "graphql":
+        metadados = collect_repo_metadata_graphql(graphql_client, [repo["full_name"] for repo in repos])
+        rows = []
+        for repo in repos:
+            repo_metadata = metadados.get(repo["full_name"])
+            if repo_metadata is None:
+                logger.warning(f"Metadados não encontrados para {repo['full_name']}")
+                continue
+            rows.append({
+                "full_name": repo_metadata["full_name"],
+                "repo_name": repo_metadata["repo_name"],
+                "url": repo_metadata["url"],
+                "stars_count": repo_metadata["stars_count"],
+                "releases_count": repo_metadata["releases_count"],
+                "repo_age_years": round(get_repository_age_years(repo_metadata), 2),
+                # Vem do item da busca: o full_name canônico do GraphQL difere do da busca em repositórios renomeados
+                "size_kb": repo.get("size"),
+            })
+        return rows
+
+    releases_graphql = {}
+    if releases_count_mode == "graphql":
+        releases_graphql = get_releases_count_graphql([repo["full_name"] for repo in repos])
+
+    def coletar(indexed_repo):
+        index, repo = indexed_repo
+        logger.info(f"Processing repository: {repo['full_name']} (total remaining: {len(repos) - index - 1})")
         owner = repo["owner"]["login"]
         repo_name = repo["name"]
 
         repo_details = get_repositories_details(owner, repo_name)
         url = get_repository_url(repo_details)
         stars_count = get_stargazers_count(repo_details)
-        releases_count = get_repository_releases_count(owner, repo_name)
+        releases_count = releases_graphql.get(repo["full_name"])
+        if releases_count is None:
+            releases_count = get_repository_releases_count(owner, repo_name)
         repo_age = round(get_repository_age_years(repo_details), 2)
 
-        rows.append({
+        return {
             "full_name": repo["full_name"],
             "repo_name": repo_name,
             "url": url,
             "stars_count": stars_count,
             "releases_count": releases_count,
             "repo_age_years": repo_age,
-        })
-        time.sleep(3)
-    df = pd.DataFrame(rows)
-    df.to_excel("data/repository_data.xlsx", index=False)
-    
-def run_ck_on_repo(jar_path, repo_dir, out_dir):
-    """Executa CK em um repositório específico"""
-    
-    out_dir.mkdir(parents=True, exist_ok=True)
-    
-    java_files = list(repo_dir.rglob("*.java"))
-    if not java_files:
-        print(f"AVISO: Nenhum arquivo .java encontrado em: {repo_dir.name}")
-        return False
+            "size_kb": repo.get("size"),
+        }
 
-    print(f"Executando CK em {repo_dir.name} ({len(java_files)} arquivos Java)")
-    original_cwd = os.getcwd()
-    
-    cmd = [
-        java_path, "-Xmx4g", "-jar", str(jar_path),
-        str(repo_dir),
-        "true",  
-        "0",
-        "true"
-    ]
-    
-    try:
-        os.chdir(str(out_dir))
-        subprocess.check_call(cmd)
-        print(f"Análise CK concluída para {repo_dir.name}")
-        
-        csv_files = list(out_dir.glob("*.csv"))
-        if csv_files:
-            print(f"Arquivos gerados: {len(csv_files)} CSVs")
-            return True
-        else:
-            print(f"AVISO: Nenhum arquivo CSV foi gerado para {repo_dir.name}")
-            return False
-            
-    except subprocess.CalledProcessError as e:
-        print(f"ERRO: Erro ao analisar {repo_dir.name}: {e}")
-        return False
-    finally:
-        os.chdir(original_cwd)
+    return map_concorrente(coletar, list(enumerate(repos)), workers=api_workers)
     
+def _run_git(args, timeout):
+    """Executa um comando git com timeout, levantando CalledProcessError/TimeoutExpired em caso de falha."""
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True, timeout=timeout)
+
 
 def clone_repository(url: str, destino: Path):
     """
-    Clona o repositório Git usando shallow clone para otimizar velocidade e espaço.
+    Clona o repositório Git baixando apenas o necessário para a análise CK.
     
-    Usa --depth 1 --single-branch para baixar apenas o último commit da branch padrão.
+    No modo "sparse" (padrão) usa --depth 1 --single-branch --filter=blob:none com sparse-checkout
+    de '*.java': apenas os blobs dos arquivos Java são baixados e gravados em disco. No modo
+    "shallow" (CLONE_MODE=shallow) usa apenas --depth 1 --single-branch.
 
     Parâmetros:
-    - url (str): URL HTTPS do repositório no GitHub.
+    - url (str): URL do repositório (HTTPS do GitHub ou file:// de um repositório local).
     - destino (Path): Caminho para a pasta onde o repositório será clonado.
+
+    Arremessa:
+    - subprocess.CalledProcessError | subprocess.TimeoutExpired: se o clone e o fallback falharem.
+
+    Observações:
+    - Cada comando git é limitado por CLONE_TIMEOUT segundos.
+    - Se o clone sparse falhar, o fallback é um único shallow clone (--depth 1); nunca é feito
+      clone com histórico completo.
     """
     repo_name = url.rstrip("/").split("/")[-1]
+    if repo_name.endswith(".git"):
+        repo_name = repo_name[:-4]
     repo_path = destino / repo_name
 
     if repo_path.exists():
-        print(f"Repositório '{repo_name}' já existe, pulando clone.")
+        logger.info(f"Repositório '{repo_name}' já existe, pulando clone.")
         return
 
     destino.mkdir(parents=True, exist_ok=True)
 
-    print(f"Clonando {repo_name} (shallow clone)...")
+    if clone_mode == "sparse":
+        logger.info(f"Clonando {repo_name} (sparse clone, apenas *.java)...")
+        try:
+            _run_git([
+                "clone",
+                "--depth", "1",           # Apenas último commit
+                "--single-branch",        # Apenas branch padrão
+                "--filter=blob:none",     # Blobs só sob demanda
+                "--no-checkout",
+                url,
+                str(repo_path)
+            ], clone_timeout)
+            _run_git(["-C", str(repo_path), "sparse-checkout", "set", "--no-cone", "*.java"], clone_timeout)
+            _run_git(["-C", str(repo_path), "checkout"], clone_timeout)
+            logger.info(f"Repositório clonado: {repo_name}")
+            return
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logger.error(f"Erro no sparse clone de {repo_name}: {getattr(e, 'stderr', None) or e}")
+            shutil.rmtree(repo_path, ignore_errors=True)
+
+    logger.info(f"Clonando {repo_name} (shallow clone)...")
     try:
         # Shallow clone otimizado - apenas último commit da branch padrão
-        subprocess.run([
-            "git", "clone", 
+        _run_git([
+            "clone", 
             "--depth", "1",           # Apenas último commit
             "--single-branch",        # Apenas branch padrão  
             url, 
             str(repo_path)
-        ], check=True, capture_output=True, text=True)
-        print(f"Repositório clonado: {repo_name}")
+        ], clone_timeout)
+        logger.info(f"Repositório clonado: {repo_name}")
         
-    except subprocess.CalledProcessError as e:
-        print(f"ERRO: Erro ao clonar {repo_name}: {e.stderr}")
-        try:
-            print(f"Tentando clone tradicional para {repo_name}...")
-            subprocess.run(["git", "clone", url, str(repo_path)], check=True)
-            print(f"Clone tradicional bem-sucedido: {repo_name}")
-        except subprocess.CalledProcessError as e2:
-            print(f"ERRO: Clone tradicional também falhou para {repo_name}: {e2}")
-            raise
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        logger.error(f"Erro ao clonar {repo_name}: {getattr(e, 'stderr', None) or e}")
+        shutil.rmtree(repo_path, ignore_errors=True)
+        raise
 
 
-def main():
+def main(resume=False, max_tentativas=3):
     """Função principal que executa o pipeline completo de análise de repositórios Java.
 
     Executa as seguintes etapas:
-    1. Busca os repositórios Java mais populares do GitHub
-    2. Coleta e salva informações detalhadas dos repositórios em Excel
-    3. Clona cada repositório usando shallow clone para otimização
-    4. Executa análise CK (Code Quality) em cada repositório
+    1. Busca os repositórios Java mais populares do GitHub, página a página (ou lê a lista de data/repository_data.csv)
+    2. Coleta as informações detalhadas de cada página e as salva em CSV/Excel
+    3. Clona os repositórios de cada página assim que ela chega, com clones simultâneos
+    4. Executa análise CK (Code Quality) em cada repositório, em diretório de saída próprio
     5. Processa e agrega as métricas de qualidade
     6. Remove repositórios após processamento para economizar espaço
     7. Gera relatórios finais consolidados
 
     Parâmetros:
-    - Nenhum: utiliza variáveis de ambiente configuradas no arquivo .env
+    - resume (bool): retoma a execução anterior a partir do manifesto, pulando repositórios já agregados.
+    - max_tentativas (int): número máximo de tentativas por repositório ao retomar.
+    - Demais configurações vêm das variáveis de ambiente do arquivo .env
 
     Retorna:
     - None: função executa o pipeline e salva resultados em arquivos CSV/Excel
@@ -326,93 +448,272 @@ def main():
     - Exception: se ocorrer erro geral no processamento (capturado e logado)
 
     Observações:
-    - Processa até 1000 repositórios Java mais populares do GitHub
+    - Processa os NUM_REPOS (padrão 1000) repositórios Java mais populares do GitHub; a busca roda em uma
+      thread própria (repo_source.FonteRepositorios) e alimenta o agendador de clones enquanto o pipeline já trabalha
     - Usa shallow clone (--depth 1) para otimizar velocidade e espaço em disco  
+    - Clone, análise e limpeza rodam em estágios concorrentes (ver pipeline.executar_pipeline);
+      a concorrência de cada estágio é configurada por CLONE_WORKERS, CK_WORKERS e CLEANUP_WORKERS
+    - MAX_CHECKOUTS limita quantos repositórios clonados ficam em disco ao mesmo tempo
     - Implementa tratamento robusto de erros com continuação do processamento
     - Remove repositórios após cada análise para economizar espaço em disco
     - Gera estatísticas finais de sucessos e falhas
+    - As correlações das RQs (rq_analysis.MotorCorrelacoes) são atualizadas a cada repositório concluído
+      e gravadas em correlacoes_rq.csv ao final
+    - O estágio de cada repositório é registrado em run_manifest.sqlite (pasta de métricas); com --resume,
+      os resultados existentes são mantidos e apenas repositórios incompletos ou com falha são refeitos
     """
+    relatorio = None
     try:
-        popular_repos = get_popular_repositories_java(1000)  
-        collect_and_save_repo_info(popular_repos)
-        
-        destino = path_repositories
+        pasta_saida = Path(path_results_metrics)
+        pasta_saida.mkdir(parents=True, exist_ok=True)
+        manifest = RunManifest(pasta_saida / "run_manifest.sqlite")
+        cache_comentarios = ComentariosCache(pasta_saida / "comentarios_cache.sqlite")
+        analise_cache = AnaliseCache(pasta_saida / "analise_cache.sqlite")
+        relatorio = RunReport(pasta_saida / "run_report.jsonl", continuar=resume)
+        mirror_store = None
+        if mirror_cache_dir:
+            mirror_store = MirrorStore(
+                mirror_cache_dir,
+                max_bytes=int(float(mirror_cache_max_gb) * 1024 ** 3) if mirror_cache_max_gb else None,
+                timeout=clone_timeout,
+            )
+        if not resume:
+            manifest.limpar()
+
+        destino = Path(path_repositories)
         destino.mkdir(parents=True, exist_ok=True)
 
-        ck_jar = path_ck_jar
-        out_dir = path_output_ck
+        ck_jar = Path(path_ck_jar)
+        out_dir = Path(path_output_ck)
         out_dir.mkdir(parents=True, exist_ok=True)
 
-        pasta_saida = path_results_metrics
-        pasta_saida.mkdir(parents=True, exist_ok=True)
-        
-        arquivo_per_repo = pasta_saida / "total_metrics_per_repo.csv"
-        if arquivo_per_repo.exists():
-            arquivo_per_repo.unlink()
-        arquivo_per_repo_xlsx = pasta_saida / "total_metrics_per_repo.xlsx"  
-        if arquivo_per_repo_xlsx.exists():
-            arquivo_per_repo_xlsx.unlink()
+        if not resume:
+            arquivo_per_repo = pasta_saida / "total_metrics_per_repo.csv"
+            if arquivo_per_repo.exists():
+                arquivo_per_repo.unlink()
+            arquivo_per_repo_xlsx = pasta_saida / "total_metrics_per_repo.xlsx"  
+            if arquivo_per_repo_xlsx.exists():
+                arquivo_per_repo_xlsx.unlink()
         
-        print(f"\n{'='*50}")
-        print("Iniciando análise CK dos repositórios...")
-        print(f"{'='*50}")
-        
-        successful_analyses = 0
-        failed_analyses = 0
-        
-        for i, repo in enumerate(popular_repos, 1):
-            repo_name = repo["name"]
-            repo_path = destino / repo_name
-            print(f"\nProcessando {i}/{len(popular_repos)}: {repo_name}")
-            
+        logger.info(f"{'='*50}")
+        logger.info("Iniciando análise CK dos repositórios...")
+        logger.info(f"{'='*50}")
+
+        # Admite clones pelo tamanho projetado, alternando repositórios grandes e pequenos de cada página
+        orcamento = orcamento_disco(destino)
+        agendador = AgendadorDisco(tamanho=tamanho_projetado, orcamento_bytes=orcamento, aberto=True)
+        lixeira = Lixeira(destino / ".lixeira", ao_mudar=agendador.ajustar_ocupado)
+        # Lixeira própria porque PATH_OUTPUT_CK pode estar em outro sistema de arquivos
+        lixeira_ck = Lixeira(out_dir / ".lixeira")
+        if orcamento is not None:
+            logger.info(f"Orçamento de disco para checkouts: {orcamento / 1024 ** 3:.1f} GB")
+
+        # Correlações das RQs, atualizadas conforme cada repositório termina; os metadados chegam com a lista
+        motor = MotorCorrelacoes({})
+        fonte = FonteRepositorios(github, num_repos, "data/repository_data.csv", enriquecer=collect_repo_info,
+                                  atualizar=repo_list_refresh, workers=search_workers)
+
+        def alimentar():
+            """Entrega ao agendador os repositórios de cada página da lista assim que ela chega."""
             try:
-                clone_repository(get_repository_url(repo), destino)
-                
-                if repo_path.exists():
-                    ck_success = run_ck_on_repo(ck_jar, repo_path, out_dir)
-                    
-                    if ck_success:
-                        processar_ck_results_repo(repo_name, out_dir, pasta_saida)
-                        successful_analyses += 1
-                        print(f"Repositório {repo_name} processado e adicionado ao total")
-                    else:
-                        failed_analyses += 1
-                        print(f"ERRO: Falha ao processar {repo_name}")
-                        
-                    safe_remove_repository(repo_path)
-                        
-                else:
-                    print(f"AVISO: Repositório não encontrado: {repo_path}")
-                    failed_analyses += 1
-                    
+                with relatorio.medir(None, "api") as medicao:
+                    estatisticas_antes = dict(github.estatisticas)
+                    recebidos = concluidos = 0
+                    for repos, linhas in fonte:
+                        recebidos += len(repos)
+                        manifest.registrar_metadata([repo["full_name"] for repo in repos])
+                        motor.adicionar_metadados(linhas)
+                        if resume:
+                            pendentes = manifest.pendentes(repos, max_tentativas)
+                            concluidos += len(repos) - len(pendentes)
+                            repos = pendentes
+                        agendador.adicionar(intercalar_por_tamanho(repos, tamanho_projetado))
+                    medicao["repositorios"] = recebidos
+                    medicao["origem"] = fonte.origem
+                    medicao.update({chave: valor - estatisticas_antes[chave] for chave, valor in github.estatisticas.items()})
+                if fonte.origem == "api":
+                    pd.read_csv(fonte.arquivo).to_excel("data/repository_data.xlsx", index=False)
+                if resume:
+                    logger.info(f"Retomando execução: {concluidos} repositórios já concluídos "
+                                f"ou sem tentativas restantes, {recebidos - concluidos} a processar")
             except Exception as e:
-                print(f"ERRO: Erro ao processar {repo_name}: {e}")
-                print(f"Pulando {repo_name} e continuando com próximo repositório...")
-                failed_analyses += 1
-                
-                if repo_path.exists():
-                    safe_remove_repository(repo_path)
-                continue
+                logger.error(f"Erro ao obter a lista de repositórios: {e}")
+            finally:
+                agendador.encerrar()
+
+        alimentador = threading.Thread(target=alimentar, daemon=True)
+        alimentador.start()
         
-        print(f"\n{'='*50}")
-        print("Gerando métricas totais finais...")
-        print(f"{'='*50}")
+        def clonar(tarefa):
+            repo = tarefa["repo"]
+            # CK concluído em uma tentativa anterior: a saída em out_dir é reaproveitada em analisar
+            tarefa["ck_anterior"] = resume and manifest.estagio(repo["full_name"]) == "ck_done"
+            manifest.iniciar_tentativa(repo["full_name"])
+            if incremental:
+                anterior = analise_cache.analise_anterior(repo["full_name"])
+                # Totais gravados antes das colunas de distribuição e de métodos: reanalisa
+                if (anterior is not None and set(COLUNAS_DISTRIBUICAO + COLUNAS_METODOS) <= anterior[1].keys()
+                        and anterior[0] == commit_remoto(get_repository_url(repo))):
+                    # HEAD inalterado: reaproveita os totais da última análise sem clonar
+                    logger.info(f"{repo['full_name']} inalterado desde {anterior[0][:12]}, reaproveitando a análise anterior")
+                    totais = {"repositorio": anterior[1].get("repositorio"), "full_name": repo["full_name"],
+                              **anterior[1]}
+                    anexar_metricas_repo(pasta_saida / "total_metrics_per_repo.csv", totais)
+                    motor.adicionar(repo["full_name"], totais)
+                    tarefa["inalterado"] = True
+                    return True
+            # Separado por owner para que repositórios homônimos não compartilhem o checkout
+            destino_owner = destino / repo["owner"]["login"]
+            tarefa["repo_path"] = destino_owner / repo["name"]
+            with relatorio.medir(repo["full_name"], "clone") as medicao:
+                if mirror_store is not None:
+                    mirror = mirror_store.caminho_mirror(repo["full_name"])
+                    antes = tamanho_diretorio(mirror) if mirror.exists() else 0
+                    mirror_store.criar_checkout(repo["full_name"], get_repository_url(repo), tarefa["repo_path"])
+                    medicao["bytes_baixados"] = tamanho_diretorio(mirror) - antes
+                else:
+                    clone_repository(get_repository_url(repo), destino_owner)
+                    medicao["bytes_baixados"] = tamanho_diretorio(tarefa["repo_path"] / ".git")
+                if not tarefa["repo_path"].exists():
+                    logger.warning(f"Repositório não encontrado: {tarefa['repo_path']}")
+                    medicao["ok"] = False
+                    return False
+            manifest.avancar(repo["full_name"], "cloned")
+            return True
+
+        def analisar(tarefa):
+            repo_name = tarefa["repo"]["name"]
+            full_name = tarefa["repo"]["full_name"]
+            if tarefa.get("inalterado"):
+                manifest.avancar(full_name, "aggregated")
+                return True
+            # Cada execução CK escreve em seu próprio diretório para não sobrescrever as demais
+            repo_out_dir = out_dir / tarefa["repo"]["full_name"]
+            # Hashes de blob do índice do git: chave dos caches de comentários e das linhas do CK
+            blobs = blobs_java(tarefa["repo_path"]) if incremental else None
+            opcoes_ck = {
+                "java_path": java_path,
+                "max_heap_mb": ck_max_heap_mb,
+                "shard_max_arquivos": ck_shard_max_files or None,
+                "shard_max_bytes": ck_shard_max_mb * 1024 * 1024 or None,
+                "shard_workers": ck_shard_workers,
+            }
+            with relatorio.medir(full_name, "ck") as medicao:
+                opcoes_ck["metricas"] = medicao
+                if tarefa.get("ck_anterior") and list(repo_out_dir.glob("*class*.csv")):
+                    logger.info(f"CK de {full_name} já concluído na tentativa anterior; reaproveitando {repo_out_dir}")
+                    medicao["reaproveitado"] = True
+                    ck_ok = True
+                elif ck_incremental_files and blobs:
+                    ck_ok = run_ck_incremental(ck_jar, tarefa["repo_path"], repo_out_dir, blobs, analise_cache,
+                                               **opcoes_ck)
+                else:
+                    ck_ok = run_ck_on_repo(ck_jar, tarefa["repo_path"], repo_out_dir, **opcoes_ck)
+                # tempo_s do CK é medido pelo próprio relatório
+                medicao.pop("tempo_s", None)
+                medicao["ok"] = ck_ok
+            if not ck_ok:
+                logger.error(f"Falha ao processar {repo_name}")
+                return False
+            manifest.avancar(full_name, "ck_done")
+            totais = {}
+            metricas = {}
+            processar_ck_results_repo(repo_name, repo_out_dir, pasta_saida, cache_comentarios, blobs=blobs,
+                                      totais=totais, metricas=metricas, memoria_metodos=method_memory_mb * 1024 * 1024,
+                                      full_name=full_name)
+            for estagio in ("agregacao", "comentarios", "metodos"):
+                if estagio in metricas:
+                    relatorio.registrar(full_name, estagio, metricas[estagio].pop("tempo_s"), ok=bool(totais),
+                                        **metricas[estagio])
+            commit_sha = commit_local(tarefa["repo_path"]) if incremental else None
+            if totais and commit_sha:
+                analise_cache.registrar_analise(full_name, commit_sha, totais)
+            if totais:
+                motor.adicionar(full_name, totais)
+            if ck_parquet_dir:
+                linhas = salvar_ck_parquet(repo_out_dir, full_name, Path(ck_parquet_dir))
+                logger.info(f"Saída CK de {full_name} salva em Parquet: {linhas}")
+            manifest.avancar(full_name, "aggregated")
+            # Os CSVs do CK já estão nos totais (e no Parquet): sem isso a saída de cada repositório se acumula
+            descartar_saida_ck(repo_out_dir, lixeira_ck)
+            logger.info(f"Repositório {repo_name} processado e adicionado ao total")
+            return True
+
+        def limpar(tarefa):
+            full_name = tarefa["repo"]["full_name"]
+            if not tarefa["sucesso"]:
+                manifest.registrar_falha(full_name, tarefa["erro"])
+            if tarefa["repo_path"] is None:
+                if tarefa["sucesso"]:
+                    manifest.avancar(full_name, "cleaned")
+                return
+            tamanho = tamanho_projetado(tarefa["repo"])
+            with relatorio.medir(full_name, "limpeza") as medicao:
+                if mirror_store is not None:
+                    mirror_store.remover_checkout(full_name, tarefa["repo_path"], lixeira, tamanho)
+                    removido = True
+                elif tarefa["repo_path"].exists():
+                    removido = safe_remove_repository(tarefa["repo_path"], lixeira, tamanho)
+                else:
+                    removido = True
+                medicao["ok"] = removido
+            if removido and tarefa["sucesso"]:
+                manifest.avancar(full_name, "cleaned")
+
+        resultado = executar_pipeline(
+            None, clonar, analisar, limpar,
+            clone_workers=clone_workers,
+            analise_workers=ck_workers,
+            limpeza_workers=cleanup_workers,
+            max_checkouts=max_checkouts,
+            agendador=agendador,
+        )
+        alimentador.join()
+        lixeira.aguardar()
+        lixeira_ck.aguardar()
+        successful_analyses = resultado["sucessos"]
+        failed_analyses = resultado["falhas"]
+        
+        logger.info(f"{'='*50}")
+        logger.info("Gerando métricas totais finais...")
+        logger.info(f"{'='*50}")
         
-        df_per_repo_sorted = gerar_metrics_totais_finais(pasta_saida)
+        with relatorio.medir(None, "relatorio"):
+            df_per_repo_sorted = gerar_metrics_totais_finais(pasta_saida)
+            if resume:
+                # Repositórios concluídos em execuções anteriores (os desta já foram incluídos)
+                motor.carregar_totais(pasta_saida / "total_metrics_per_repo.csv")
+            motor.salvar(pasta_saida / "correlacoes_rq.csv")
         if df_per_repo_sorted is not None:
             exibir_resumo_final(df_per_repo_sorted)
         
-        print(f"\n{'='*50}")
-        print("Processamento COMPLETO!")
-        print(f"Análises bem-sucedidas: {successful_analyses}")
-        print(f"ERRO: Falhas na análise: {failed_analyses}")
-        print(f"Resultados CK salvos em: {out_dir}")
-        print(f"Métricas salvas em: {pasta_saida}")
-        print(f"{'='*50}")
+        logger.info(f"{'='*50}")
+        logger.info("Processamento COMPLETO!")
+        logger.info(f"Análises bem-sucedidas: {successful_analyses}")
+        logger.info(f"Falhas na análise: {failed_analyses}")
+        logger.info(f"Resultados CK salvos em: {out_dir}")
+        logger.info(f"Métricas salvas em: {pasta_saida}")
+        logger.info(f"Manifesto da execução: {manifest.resumo()}")
+        logger.info(f"Tempo por estágio (relatório completo em {relatorio.caminho}):")
+        relatorio.salvar_resumo(pasta_saida / "run_report_resumo.json")
+        logger.info(f"{'='*50}")
         
     except Exception as e:
-        print(f"ERRO: Erro geral: {e}")
+        logger.error(f"Erro geral: {e}")
+    finally:
+        if relatorio is not None:
+            relatorio.fechar()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Coleta e análise CK dos repositórios Java mais populares do GitHub")
+    parser.add_argument("--resume", action="store_true",
+                        help="retoma a execução anterior, refazendo apenas repositórios incompletos ou com falha")
+    parser.add_argument("--max-tentativas", type=int, default=3,
+                        help="número máximo de tentativas por repositório ao usar --resume (padrão: 3)")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "INFO"),
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="nível mínimo das mensagens de log (padrão: LOG_LEVEL ou INFO)")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    main(resume=args.resume, max_tentativas=args.max_tentativas)
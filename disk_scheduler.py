@@ -0,0 +1,196 @@
+import logging
+import os
+import queue
+import shutil
+import stat
+import threading
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def intercalar_por_tamanho(itens, tamanho):
+    """Ordena os itens alternando entre o maior e o menor restante (maior, menor, 2º maior, 2º menor...).
+
+    Assim, clones grandes (limitados por rede/disco) ficam em paralelo com análises de repositórios
+    pequenos, em vez de todos os grandes disputarem o orçamento de disco ao mesmo tempo.
+    """
+    ordenados = sorted(itens, key=tamanho, reverse=True)
+    intercalados = []
+    inicio, fim = 0, len(ordenados) - 1
+    while inicio <= fim:
+        intercalados.append(ordenados[inicio])
+        if inicio != fim:
+            intercalados.append(ordenados[fim])
+        inicio += 1
+        fim -= 1
+    return intercalados
+
+
+class AgendadorDisco:
+    """Admite repositórios para clone apenas quando o tamanho projetado do checkout cabe no orçamento.
+
+    Parâmetros:
+    - itens (iterable): repositórios, na ordem de preferência (ver intercalar_por_tamanho).
+    - tamanho (callable | None): retorna o tamanho projetado, em bytes, do checkout de um item.
+    - orcamento_bytes (int | None): espaço em disco disponível para checkouts; None não limita.
+    - max_adiamentos (int): vezes que um item pode ser preterido por itens menores antes que o
+      agendador pare de admitir outros e espere espaço para ele.
+    - aberto (bool): a lista ainda vai receber itens por adicionar(); enquanto não for chamado
+      encerrar(), proximo espera por novos itens em vez de retornar None.
+
+    Observações:
+    - Um item maior que o orçamento inteiro é admitido quando não há nada em disco.
+    - ajustar_ocupado registra espaço ainda não liberado (ex.: checkouts aguardando remoção na
+      Lixeira), que conta contra o orçamento.
+    - total conta todos os itens recebidos, admitidos ou não.
+    - É seguro compartilhar uma instância entre threads.
+    """
+
+    def __init__(self, itens=(), tamanho=None, orcamento_bytes=None, max_adiamentos=16, aberto=False):
+        self._pendentes = list(itens)
+        self.total = len(self._pendentes)
+        self._aberto = aberto
+        self._tamanho = tamanho or (lambda item: 0)
+        self.orcamento_bytes = orcamento_bytes
+        self.max_adiamentos = max_adiamentos
+        self._em_uso = 0
+        self._ocupado_extra = 0
+        self._adiamentos = {}
+        self._condicao = threading.Condition()
+
+    def __len__(self):
+        with self._condicao:
+            return len(self._pendentes)
+
+    def adicionar(self, itens):
+        """Acrescenta itens ao fim da lista de pendentes."""
+        itens = list(itens)
+        with self._condicao:
+            self._pendentes.extend(itens)
+            self.total += len(itens)
+            self._condicao.notify_all()
+
+    def encerrar(self):
+        """Indica que não haverá novos itens; proximo retorna None quando os pendentes acabarem."""
+        with self._condicao:
+            self._aberto = False
+            self._condicao.notify_all()
+
+    def proximo(self):
+        """Bloqueia até que algum item pendente caiba no orçamento e o retorna; None se não há pendentes."""
+        with self._condicao:
+            while self._pendentes or self._aberto:
+                item, preteridos = self._escolher() if self._pendentes else (None, ())
+                if item is not None:
+                    # Só conta como adiamento quando um item posterior foi de fato admitido antes
+                    for preterido in preteridos:
+                        self._adiamentos[id(preterido)] = self._adiamentos.get(id(preterido), 0) + 1
+                    self._pendentes.remove(item)
+                    self._adiamentos.pop(id(item), None)
+                    self._em_uso += self._tamanho(item)
+                    return item
+                self._condicao.wait()
+            return None
+
+    def _escolher(self):
+        """Retorna (item admissível, itens anteriores a ele que não couberam), ou (None, ())."""
+        if self.orcamento_bytes is None:
+            return self._pendentes[0], ()
+        ocupado = self._em_uso + self._ocupado_extra
+        preteridos = []
+        for item in self._pendentes:
+            if ocupado == 0 or ocupado + self._tamanho(item) <= self.orcamento_bytes:
+                return item, preteridos
+            if self._adiamentos.get(id(item), 0) >= self.max_adiamentos:
+                # Evita que um repositório grande espere indefinidamente atrás dos pequenos
+                return None, ()
+            preteridos.append(item)
+        return None, ()
+
+    def liberar(self, item):
+        """Devolve ao orçamento o espaço reservado para o item."""
+        with self._condicao:
+            self._em_uso -= self._tamanho(item)
+            self._condicao.notify_all()
+
+    def ajustar_ocupado(self, delta):
+        """Soma delta bytes ao espaço ocupado fora das reservas (negativo quando é liberado)."""
+        with self._condicao:
+            self._ocupado_extra += delta
+            self._condicao.notify_all()
+
+
+def _forcar_remocao(func, path, _):
+    """Remove o sinalizador de somente leitura (arquivos de objetos do git) e tenta de novo."""
+    os.chmod(path, stat.S_IWRITE | stat.S_IREAD | stat.S_IEXEC)
+    func(path)
+
+
+class Lixeira:
+    """Remoção rápida de diretórios: renomeia para uma pasta de descarte e apaga em segundo plano.
+
+    Parâmetros:
+    - diretorio (Path | str): pasta de descarte; deve estar no mesmo sistema de arquivos dos
+      diretórios removidos, para que a renomeação seja instantânea.
+    - ao_mudar (callable | None): recebe +bytes quando um diretório é descartado e -bytes quando
+      termina de ser apagado (ex.: AgendadorDisco.ajustar_ocupado).
+
+    Observações:
+    - O diretório some do caminho original imediatamente, então um novo clone no mesmo caminho
+      não espera a remoção.
+    - Sobras de execuções anteriores na pasta de descarte são apagadas ao iniciar.
+    """
+
+    def __init__(self, diretorio, ao_mudar=None):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.ao_mudar = ao_mudar
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._apagar, daemon=True)
+        self._thread.start()
+        for sobra in self.diretorio.iterdir():
+            self._fila.put((sobra, 0))
+
+    def descartar(self, caminho, tamanho=0):
+        """Move caminho para a pasta de descarte e agenda sua remoção.
+
+        Parâmetros:
+        - caminho (Path): diretório a remover.
+        - tamanho (int): bytes ocupados, repassados a ao_mudar até a remoção terminar.
+
+        Retorna:
+        - bool: True se o diretório foi removido do caminho original.
+        """
+        caminho = Path(caminho)
+        if not caminho.exists():
+            return True
+        alvo = self.diretorio / f"{caminho.name}-{uuid.uuid4().hex[:8]}"
+        try:
+            os.rename(caminho, alvo)
+        except OSError as e:
+            # Outro sistema de arquivos: remove no lugar
+            logger.warning(f"Não foi possível mover {caminho} para a lixeira ({e}); removendo diretamente")
+            shutil.rmtree(caminho, onerror=_forcar_remocao)
+            return not caminho.exists()
+        if self.ao_mudar is not None and tamanho:
+            self.ao_mudar(tamanho)
+        self._fila.put((alvo, tamanho))
+        return True
+
+    def _apagar(self):
+        while True:
+            alvo, tamanho = self._fila.get()
+            try:
+                shutil.rmtree(alvo, onerror=_forcar_remocao)
+            except OSError as e:
+                logger.warning(f"Erro ao apagar {alvo}: {e}")
+            finally:
+                if self.ao_mudar is not None and tamanho:
+                    self.ao_mudar(-tamanho)
+                self._fila.task_done()
+
+    def aguardar(self):
+        """Bloqueia até que todos os diretórios descartados tenham sido apagados."""
+        self._fila.join()
@@ -1,105 +1,491 @@
 import pandas as pd
-from pathlib import Path
+import csv
+import json
+import logging
+import math
+import os
+import threading
+import time
+from java_scanner import analisar_arquivo_java, escanear_arquivos
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock, apenas o lock entre threads
+    fcntl = None
+
+_per_repo_lock = threading.Lock()
+# total_metrics_per_repo.csv -> repositórios já gravados e até onde o arquivo foi lido (anexar_metricas_repo)
+_per_repo_indices = {}
+logger = logging.getLogger(__name__)
 
 
 def contar_linhas_comentarios(caminho_java):
     """Conta linhas de comentário em um arquivo .java"""
-    total_comentarios = 0
+    return analisar_arquivo_java(caminho_java)["comentario"]
+
+
+def contar_comentarios_repo(caminhos, cache=None, workers=None, blobs=None, metricas=None):
+    """Conta as linhas de comentário de cada arquivo .java distinto de um repositório.
+
+    Cada arquivo é lido no máximo uma vez, independente de quantas classes declara; os arquivos
+    são analisados em paralelo por java_scanner.escanear_arquivos. Com cache, arquivos inalterados
+    (mesmo hash de blob do git ou, sem blobs, mesmo caminho, mtime e tamanho) não são lidos.
+
+    Parâmetros:
+    - caminhos (iterable): caminhos dos arquivos .java (repetições são ignoradas).
+    - cache (ComentariosCache | None): cache persistente das contagens.
+    - workers (int | None): número de processos usados na análise (padrão: número de CPUs).
+    - blobs (dict | None): caminho real absoluto -> hash de blob do git (analysis_cache.blobs_java).
+    - metricas (dict | None): se informado, é preenchido com arquivos_java, arquivos_lidos (fora do
+      cache) e bytes_lidos.
+
+    Retorna:
+    - Series: contagem de linhas de comentário indexada pelo caminho do arquivo.
+    """
+    contagens = {}
+    pendentes = []
+    for caminho in dict.fromkeys(caminhos):
+        comentarios = None
+        blob = blobs.get(os.path.realpath(caminho)) if blobs else None
+        if cache is not None and blob is not None:
+            comentarios = cache.por_hash(blob)
+        elif cache is not None:
+            try:
+                info = os.stat(caminho)
+                comentarios = cache.por_caminho(caminho, info.st_mtime_ns, info.st_size)
+            except OSError:
+                comentarios = 0
+        if comentarios is None:
+            pendentes.append(caminho)
+        else:
+            contagens[caminho] = comentarios
+
+    novos = []
+    bytes_lidos = 0
+    for caminho, resultado in escanear_arquivos(pendentes, workers=workers).items():
+        contagens[caminho] = resultado["comentario"]
+        if resultado["hash"] is not None:
+            bytes_lidos += resultado["tamanho"]
+            novos.append((caminho, resultado["mtime_ns"], resultado["tamanho"], resultado["hash"],
+                          resultado["comentario"]))
+    if cache is not None and novos:
+        cache.salvar(novos)
+    if metricas is not None:
+        metricas.update({"arquivos_java": len(contagens), "arquivos_lidos": len(pendentes), "bytes_lidos": bytes_lidos})
+    return pd.Series(contagens, dtype="int64")
+
+
+def _chave_per_repo(cabecalho):
+    """Coluna que identifica o repositório de cada linha: full_name ou, em arquivos antigos, repositorio."""
+    return "full_name" if "full_name" in cabecalho else "repositorio"
+
+
+def anexar_metricas_repo(arquivo_per_repo, totais_repo):
+    """Acrescenta a linha de um repositório ao total_metrics_per_repo.csv, substituindo a que já houver.
+
+    A escrita é protegida por um lock entre threads e, quando disponível, por flock entre processos;
+    o cabeçalho só é escrito se o arquivo estiver vazio.
+
+    Observações:
+    - Se o repositório (full_name, ou repositorio em arquivos sem essa coluna) já tem uma linha, ela é
+      substituída: uma execução interrompida entre esta escrita e o registro no manifesto não
+      duplica a linha ao ser retomada.
+    - As chaves já gravadas ficam em memória com a posição até onde o arquivo foi lido; cada chamada
+      lê apenas o que outros processos acrescentaram desde então, e o arquivo só é reescrito na
+      substituição.
+    - Se o arquivo já tem cabeçalho (ex.: --resume sobre resultados de uma versão anterior), a linha
+      segue a ordem das colunas dele: colunas ausentes ficam vazias e colunas que o arquivo não tem
+      são descartadas com um aviso, para que as linhas continuem alinhadas ao cabeçalho.
+    """
+    nome_arquivo = os.path.basename(arquivo_per_repo)
+    with _per_repo_lock:
+        with open(arquivo_per_repo, "a+", newline="", encoding="utf-8") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                cabecalho = next(csv.reader([f.readline()]), None)
+                inicio_linhas = f.tell()
+                if not cabecalho:
+                    cabecalho = list(totais_repo.keys())
+                    csv.writer(f, lineterminator="\n").writerow(cabecalho)
+                    inicio_linhas = f.tell()
+                else:
+                    descartadas = [coluna for coluna in totais_repo if coluna not in cabecalho]
+                    if descartadas:
+                        logger.warning(f"{nome_arquivo} não tem as colunas {', '.join(descartadas)}; "
+                                       f"elas ficam de fora (inicie uma execução nova para incluí-las)")
+                posicao_chave = cabecalho.index(_chave_per_repo(cabecalho))
+                chave = str(totais_repo.get(cabecalho[posicao_chave], ""))
+
+                indice = _per_repo_indices.get(os.fspath(arquivo_per_repo))
+                tamanho = f.seek(0, os.SEEK_END)
+                if indice is None or indice["cabecalho"] != cabecalho or indice["lido"] > tamanho:
+                    indice = {"cabecalho": cabecalho, "chaves": set(), "lido": inicio_linhas}
+                f.seek(indice["lido"])
+                for valores in csv.reader(f.read().splitlines()):
+                    if len(valores) > posicao_chave:
+                        indice["chaves"].add(valores[posicao_chave])
+
+                if chave in indice["chaves"]:
+                    logger.info(f"{chave} já tinha uma linha em {nome_arquivo}; substituindo")
+                    f.seek(inicio_linhas)
+                    mantidas = [valores for valores in csv.reader(f.read().splitlines())
+                                if len(valores) <= posicao_chave or valores[posicao_chave] != chave]
+                    f.seek(0)
+                    f.truncate()
+                    csv.writer(f, lineterminator="\n").writerows([cabecalho, *mantidas])
+                csv.DictWriter(f, fieldnames=cabecalho, restval="", extrasaction="ignore",
+                               lineterminator="\n").writerow(totais_repo)
+                f.flush()
+                indice["chaves"].add(chave)
+                indice["lido"] = f.tell()
+                _per_repo_indices[os.fspath(arquivo_per_repo)] = indice
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# Colunas do CSV de classes do CK usadas na agregação, com tipos explícitos (NaN é lido como float)
+COLUNAS_CLASSE = {"file": str, "loc": "float64", "cbo": "float64", "dit": "float64", "lcom": "float64"}
+METRICAS_CLASSE = ["loc", "cbo", "dit", "lcom"]
+# Colunas da distribuição por classe acrescentadas ao total_metrics_per_repo (ver distribuicao_por_classe)
+COLUNAS_DISTRIBUICAO = [f"{metrica}_{medida}" for metrica in METRICAS_CLASSE
+                        for medida in ("mediana", "p90", "media_classe")]
+
+# CSVs de classes acima deste tamanho são lidos em blocos, mantendo a memória limitada
+LIMITE_LEITURA_COMPLETA = 256 * 1024 * 1024
+LINHAS_POR_CHUNK = 200_000
+
+
+def _acumular_histograma(histogramas, chave, valores):
+    """Soma a contagem de cada valor de uma Series ao histograma histogramas[chave]."""
+    contagem = valores.value_counts(sort=False)
+    anterior = histogramas.get(chave)
+    histogramas[chave] = contagem if anterior is None else anterior.add(contagem, fill_value=0)
+
+
+def agregar_metricas_por_arquivo(class_file, chunksize=None, histogramas=None):
+    """Lê o CSV de classes do CK e soma loc/cbo/dit/lcom por arquivo .java.
+
+    Parâmetros:
+    - class_file (Path): caminho do CSV de classes gerado pelo CK.
+    - chunksize (int | None): se informado, lê o CSV em blocos desse número de linhas.
+    - histogramas (dict | None): se informado, recebe por métrica uma Series valor -> número de
+      classes, acumulada na mesma leitura (ver distribuicao_por_classe).
+
+    Retorna:
+    - DataFrame: indexado pelo caminho do arquivo, com as colunas loc, cbo, dit, lcom e classes
+      (quantidade de classes do arquivo).
+    """
+    leitor = pd.read_csv(class_file, usecols=list(COLUNAS_CLASSE), dtype=COLUNAS_CLASSE, chunksize=chunksize)
+    blocos = [leitor] if chunksize is None else leitor
+
+    parciais = []
+    for bloco in blocos:
+        bloco = bloco[bloco["file"].notna() & (bloco["file"] != "")]
+        metricas = bloco[METRICAS_CLASSE].fillna(0).astype("int64")
+        if histogramas is not None:
+            for metrica in METRICAS_CLASSE:
+                _acumular_histograma(histogramas, metrica, metricas[metrica])
+        metricas["classes"] = 1
+        parciais.append(metricas.groupby(bloco["file"], sort=False).sum())
+
+    if not parciais:
+        return pd.DataFrame(columns=METRICAS_CLASSE + ["classes"])
+    if len(parciais) == 1:
+        return parciais[0]
+    # Um mesmo arquivo pode aparecer em blocos diferentes: soma os parciais
+    return pd.concat(parciais).groupby(level=0, sort=False).sum()
+
+
+def _percentil_histograma(histograma, p):
+    """Percentil p (0-100) pelo posto mais próximo a partir de uma Series valor -> contagem."""
+    histograma = histograma.sort_index()
+    acumulado = histograma.cumsum()
+    posto = max(1, math.ceil(p / 100 * acumulado.iloc[-1]))
+    return histograma.index[acumulado.searchsorted(posto)]
+
+
+def distribuicao_por_classe(histogramas):
+    """Resume a distribuição por classe de cada métrica de um repositório.
+
+    Ao contrário das somas do total_metrics_per_repo, mediana, p90 e média por classe são
+    comparáveis entre repositórios de tamanhos diferentes, e são essas as medidas usadas nas
+    correlações de rq_analysis. Como os histogramas guardam apenas os valores distintos, o resumo
+    é exato e a memória não depende do número de classes.
+
+    Parâmetros:
+    - histogramas (dict): por métrica, Series valor -> número de classes (de agregar_metricas_por_arquivo).
+
+    Retorna:
+    - dict: <metrica>_mediana, <metrica>_p90 e <metrica>_media_classe de cada métrica de METRICAS_CLASSE.
+    """
+    distribuicao = {}
+    for metrica in METRICAS_CLASSE:
+        histograma = histogramas.get(metrica)
+        if histograma is None or histograma.sum() == 0:
+            continue
+        distribuicao[f"{metrica}_mediana"] = float(_percentil_histograma(histograma, 50))
+        distribuicao[f"{metrica}_p90"] = float(_percentil_histograma(histograma, 90))
+        distribuicao[f"{metrica}_media_classe"] = round(
+            float((histograma.index.to_numpy() * histograma.to_numpy()).sum() / histograma.sum()), 2)
+    return distribuicao
+
+
+# Colunas dos CSVs de métodos e de variáveis do CK usadas nas estatísticas por classe: file e class
+# são lidas como categóricas (cada caminho fica uma vez por bloco) e as contagens viram int32
+COLUNAS_METODO = {"file": "category", "class": "category", "wmc": "float32", "loc": "float32"}
+COLUNAS_VARIAVEL = {"file": "category", "class": "category", "usage": "float32"}
+# Estatísticas de métodos acrescentadas ao total_metrics_per_repo; vazias se o CK não gerou method.csv
+COLUNAS_METODOS = ["metodos", "wmc_classe_mediana", "wmc_classe_p90", "wmc_classe_media",
+                   "loc_metodo_mediana", "loc_metodo_p90", "loc_metodo_p99", "loc_metodo_media",
+                   "variaveis", "uso_variavel_mediana", "uso_variavel_p90"]
+# Teto de memória da leitura dos CSVs de métodos e variáveis de um repositório
+MEMORIA_METODOS = 256 * 1024 * 1024
+# Memória de um bloco em relação ao tamanho das suas linhas no CSV (texto lido + colunas convertidas)
+FATOR_MEMORIA_LINHA = 4
+
+
+def linhas_por_bloco(arquivo_csv, memoria_bytes):
+    """Linhas por bloco para que a leitura de arquivo_csv fique abaixo de memoria_bytes.
+
+    O tamanho médio das linhas é estimado pelo primeiro MB do arquivo.
+    """
+    with open(arquivo_csv, "rb") as f:
+        amostra = f.read(1024 * 1024)
+    bytes_por_linha = len(amostra) / max(1, amostra.count(b"\n"))
+    return max(1000, int(memoria_bytes / (bytes_por_linha * FATOR_MEMORIA_LINHA)))
+
+
+def _agregar_por_classe(arquivo_csv, colunas, chunksize, agregar_bloco, combinacao):
+    """Lê um CSV do CK em blocos e reduz cada bloco por (file, class) com agregar_bloco.
+
+    Os parciais são combinados quando passam do dobro do último resultado combinado: como o CK
+    grava as linhas de uma classe juntas, quase não há classes repetidas entre blocos e cada linha
+    é recombinada poucas vezes, enquanto a memória fica limitada ao bloco corrente mais cerca de
+    duas linhas por classe.
+    """
+    def combinar(parciais):
+        if len(parciais) == 1:
+            return parciais[0]
+        return pd.concat(parciais).groupby(level=[0, 1], sort=False).agg(combinacao)
+
+    parciais = []
+    linhas_parciais = linhas_combinadas = 0
+    for bloco in pd.read_csv(arquivo_csv, usecols=list(colunas), dtype=colunas, chunksize=chunksize):
+        bloco = bloco[bloco["file"].notna() & bloco["class"].notna()]
+        parcial = agregar_bloco(bloco)
+        parcial.index = parcial.index.set_levels([nivel.astype(str) for nivel in parcial.index.levels])
+        parciais.append(parcial)
+        linhas_parciais += len(parcial)
+        if linhas_parciais > 2 * max(linhas_combinadas, chunksize):
+            parciais = [combinar(parciais)]
+            linhas_parciais = linhas_combinadas = len(parciais[0])
+    return combinar(parciais) if parciais else None
+
+
+def agregar_metodos_por_classe(method_file, chunksize, histogramas=None):
+    """Reduz o CSV de métodos do CK a uma linha por classe, lendo-o em blocos.
+
+    Parâmetros:
+    - method_file (Path): CSV de métodos gerado pelo CK.
+    - chunksize (int): linhas por bloco (ver linhas_por_bloco).
+    - histogramas (dict | None): se informado, recebe em "loc_metodo" o histograma do LOC dos métodos.
+
+    Retorna:
+    - DataFrame | None: indexado por (file, class), com metodos, wmc (soma da complexidade dos
+      métodos), loc e loc_max; None se o CSV não tem linhas.
+    """
+    def agregar_bloco(bloco):
+        valores = bloco[["wmc", "loc"]].fillna(0).astype("int32")
+        if histogramas is not None:
+            _acumular_histograma(histogramas, "loc_metodo", valores["loc"])
+        grupos = valores.groupby([bloco["file"], bloco["class"]], observed=True, sort=False)
+        return grupos.agg(metodos=("loc", "size"), wmc=("wmc", "sum"), loc=("loc", "sum"), loc_max=("loc", "max"))
+
+    return _agregar_por_classe(method_file, COLUNAS_METODO, chunksize, agregar_bloco,
+                               {"metodos": "sum", "wmc": "sum", "loc": "sum", "loc_max": "max"})
+
+
+def agregar_variaveis_por_classe(variable_file, chunksize, histogramas=None):
+    """Reduz o CSV de variáveis do CK a uma linha por classe (variaveis e usos), lendo-o em blocos.
+
+    Com histogramas, acumula em "uso_variavel" o histograma dos usos de cada variável.
+    """
+    def agregar_bloco(bloco):
+        usos = bloco["usage"].fillna(0).astype("int32")
+        if histogramas is not None:
+            _acumular_histograma(histogramas, "uso_variavel", usos)
+        grupos = usos.groupby([bloco["file"], bloco["class"]], observed=True, sort=False)
+        return grupos.agg(variaveis="size", usos="sum")
+
+    return _agregar_por_classe(variable_file, COLUNAS_VARIAVEL, chunksize, agregar_bloco,
+                               {"variaveis": "sum", "usos": "sum"})
+
+
+def estatisticas_metodos_repo(results_dir, memoria_bytes=MEMORIA_METODOS, metricas=None):
+    """Estatísticas de métodos de um repositório a partir dos CSVs de métodos e variáveis do CK.
+
+    Os CSVs são lidos em blocos dimensionados por linhas_por_bloco, apenas com as colunas usadas e
+    tipos compactos, de modo que a memória não passe de memoria_bytes mais uma linha por classe.
+    A tabela por classe (metodos, wmc, loc, loc_max, variaveis, usos) é gravada em
+    estatisticas_metodos.csv, no próprio results_dir.
+
+    Parâmetros:
+    - results_dir (Path): diretório com os CSVs do CK do repositório.
+    - memoria_bytes (int): teto de memória da leitura de cada CSV.
+    - metricas (dict | None): se informado, recebe bytes_csv, linhas_por_bloco e classes.
+
+    Retorna:
+    - dict: COLUNAS_METODOS (WMC por classe: mediana, p90 e média; LOC por método: mediana, p90,
+      p99 e média; usos por variável: mediana e p90); valores None se não há CSV de métodos.
+    """
+    estatisticas = dict.fromkeys(COLUNAS_METODOS)
+    method_files = list(results_dir.glob("*method.csv"))
+    if not method_files:
+        return estatisticas
+
     try:
-        with open(caminho_java, "r", encoding="utf-8") as f:
-            in_block_comment = False
-            for linha in f:
-                linha = linha.strip()
-                if in_block_comment:
-                    total_comentarios += 1
-                    if "*/" in linha:
-                        in_block_comment = False
-                elif linha.startswith("//"):
-                    total_comentarios += 1
-                elif "/*" in linha:
-                    total_comentarios += 1
-                    if "*/" not in linha:
-                        in_block_comment = True
-    except Exception:
-        pass  
-    return total_comentarios
-
-
-def processar_ck_results_repo(repo_name, results_dir, pasta_saida):
-    """Processa resultados CK de um repositório específico dos arquivos únicos sobrescritos"""
+        histogramas = {}
+        chunksize = linhas_por_bloco(method_files[0], memoria_bytes)
+        bytes_csv = method_files[0].stat().st_size
+        por_classe = agregar_metodos_por_classe(method_files[0], chunksize, histogramas)
+        if por_classe is None:
+            return estatisticas
+        variable_files = list(results_dir.glob("*variable.csv"))
+        if variable_files:
+            bytes_csv += variable_files[0].stat().st_size
+            variaveis = agregar_variaveis_por_classe(variable_files[0], linhas_por_bloco(variable_files[0], memoria_bytes),
+                                                     histogramas)
+            if variaveis is not None:
+                por_classe = por_classe.join(variaveis, how="left")
+                por_classe[["variaveis", "usos"]] = por_classe[["variaveis", "usos"]].fillna(0).astype("int64")
+        por_classe.to_csv(results_dir / "estatisticas_metodos.csv")
+    except (OSError, ValueError) as e:
+        logger.warning(f"Erro ao ler os CSVs de métodos em {results_dir}: {e}")
+        return estatisticas
+
+    wmc = por_classe["wmc"].value_counts(sort=False)
+    loc_metodo = histogramas["loc_metodo"]
+    estatisticas.update({
+        "metodos": int(por_classe["metodos"].sum()),
+        "wmc_classe_mediana": float(_percentil_histograma(wmc, 50)),
+        "wmc_classe_p90": float(_percentil_histograma(wmc, 90)),
+        "wmc_classe_media": round(float(por_classe["wmc"].mean()), 2),
+        "loc_metodo_mediana": float(_percentil_histograma(loc_metodo, 50)),
+        "loc_metodo_p90": float(_percentil_histograma(loc_metodo, 90)),
+        "loc_metodo_p99": float(_percentil_histograma(loc_metodo, 99)),
+        "loc_metodo_media": round(float(por_classe["loc"].sum() / por_classe["metodos"].sum()), 2),
+    })
+    uso_variavel = histogramas.get("uso_variavel")
+    if uso_variavel is not None and uso_variavel.sum() > 0:
+        estatisticas.update({
+            "variaveis": int(uso_variavel.sum()),
+            "uso_variavel_mediana": float(_percentil_histograma(uso_variavel, 50)),
+            "uso_variavel_p90": float(_percentil_histograma(uso_variavel, 90)),
+        })
+    if metricas is not None:
+        metricas.update({"bytes_csv": bytes_csv, "linhas_por_bloco": chunksize, "classes": len(por_classe)})
+    return estatisticas
+
+
+def _numero_de_shards(results_dir):
+    """Lê de shards.json (gravado pelo ck_runner) em quantos shards o repositório foi analisado."""
+    try:
+        return json.loads((results_dir / "shards.json").read_text(encoding="utf-8"))["shards"]
+    except (OSError, ValueError, KeyError):
+        return 1
+
+
+def processar_ck_results_repo(repo_name, results_dir, pasta_saida, cache_comentarios=None, blobs=None,
+                              totais=None, metricas=None, memoria_metodos=MEMORIA_METODOS, full_name=None):
+    """Processa o CSV de classes do CK de um repositório e acrescenta seus totais ao total_metrics_per_repo.
+
+    As métricas são agregadas por arquivo .java com operações colunares; CSVs grandes
+    (acima de LIMITE_LEITURA_COMPLETA) são lidos em blocos de LINHAS_POR_CHUNK linhas.
+    As linhas de comentário são contadas em uma etapa própria, uma vez por arquivo distinto
+    (contar_comentarios_repo, com cache_comentarios e blobs opcionais), e unidas às métricas por arquivo.
+    A linha inclui também mediana, p90 e média por classe de cada métrica (COLUNAS_DISTRIBUICAO),
+    calculadas na mesma leitura do CSV, e as estatísticas de métodos de estatisticas_metodos_repo
+    (COLUNAS_METODOS), com a leitura dos CSVs de métodos e variáveis limitada a memoria_metodos bytes.
+    Com full_name ("owner/repo"), a linha ganha a coluna full_name, que a identifica no arquivo
+    (repositórios homônimos de owners diferentes não se confundem).
+    Se totais (dict) for informado, é preenchido com a linha acrescentada ao total_metrics_per_repo;
+    se metricas (dict) for informado, recebe "agregacao" (tempo_s, bytes_csv, classes) e
+    "comentarios" (tempo_s e as métricas de contar_comentarios_repo) e "metodos" (tempo_s e as
+    métricas de estatisticas_metodos_repo).
+
+    Retorna:
+    - DataFrame: métricas por arquivo (loc, cbo, dit, lcom, classes, comentarios); vazio em caso de falha.
+    """
     
     # Procurar arquivo class CSV no diretório principal
     class_files = list(results_dir.glob("*class*.csv"))
     if not class_files:
-        print(f"Nenhum arquivo class CSV encontrado em {results_dir}")
-        return []
+        logger.warning(f"Nenhum arquivo class CSV encontrado em {results_dir}")
+        return pd.DataFrame()
     
     class_file = class_files[0]
-    print(f"Processando métricas de {repo_name}")
+    logger.info(f"Processando métricas de {repo_name}")
     
     try:
-        class_csv = pd.read_csv(class_file)
-        if class_csv.empty:
-            return []
+        inicio = time.perf_counter()
+        bytes_csv = class_file.stat().st_size
+        chunksize = LINHAS_POR_CHUNK if bytes_csv > LIMITE_LEITURA_COMPLETA else None
+        histogramas = {}
+        por_arquivo = agregar_metricas_por_arquivo(class_file, chunksize, histogramas)
+        if metricas is not None:
+            metricas["agregacao"] = {"tempo_s": time.perf_counter() - inicio, "bytes_csv": bytes_csv,
+                                     "classes": int(por_arquivo["classes"].sum()) if not por_arquivo.empty else 0}
+        if por_arquivo.empty:
+            return por_arquivo
+
+        inicio = time.perf_counter()
+        metricas_comentarios = {}
+        comentarios = contar_comentarios_repo(por_arquivo.index, cache_comentarios, blobs=blobs,
+                                              metricas=metricas_comentarios)
+        if metricas is not None:
+            metricas["comentarios"] = {"tempo_s": time.perf_counter() - inicio, **metricas_comentarios}
+        por_arquivo["comentarios"] = comentarios.reindex(por_arquivo.index, fill_value=0)
+
+        inicio = time.perf_counter()
+        metricas_metodos = {}
+        estatisticas_metodos = estatisticas_metodos_repo(results_dir, memoria_metodos, metricas_metodos)
+        if metricas is not None:
+            metricas["metodos"] = {"tempo_s": time.perf_counter() - inicio, **metricas_metodos}
+
+        totais_repo = {
+            "repositorio": repo_name,
+            **({"full_name": full_name} if full_name else {}),
+            "loc_total": int(por_arquivo["loc"].sum()),
+            "comentarios_total": int(por_arquivo["comentarios"].sum()),
+            "cbo_total": int(por_arquivo["cbo"].sum()),
+            "dit_total": int(por_arquivo["dit"].sum()),
+            "lcom_total": int(por_arquivo["lcom"].sum()),
+            "arquivos_java": len(por_arquivo),
+            "loc_media_por_arquivo": round(por_arquivo["loc"].mean(), 2),
+            "comentarios_media_por_arquivo": round(por_arquivo["comentarios"].mean(), 2),
+            # Mais de um shard: cbo e dit podem estar subestimados (ver ck_runner.METRICAS_AFETADAS_POR_SHARD)
+            "ck_shards": _numero_de_shards(results_dir),
+            **distribuicao_por_classe(histogramas),
+            **estatisticas_metodos,
+        }
         
-        metricas_repo = []
-        for _, row in class_csv.iterrows():
-            caminho_arquivo = row.get("file", "")
-            loc = int(row.get("loc", 0)) if pd.notnull(row.get("loc", 0)) else 0
-            cbo = int(row.get("cbo", 0)) if pd.notnull(row.get("cbo", 0)) else 0
-            dit = int(row.get("dit", 0)) if pd.notnull(row.get("dit", 0)) else 0
-            lcom = int(row.get("lcom", 0)) if pd.notnull(row.get("lcom", 0)) else 0
-
-            if caminho_arquivo:
-                caminho_java = Path(caminho_arquivo)
-                linhas_comentario = contar_linhas_comentarios(caminho_java)
-                
-                metricas_repo.append({
-                    "repositorio": repo_name,
-                    "arquivo": caminho_java.name,
-                    "loc": loc,
-                    "comentarios": linhas_comentario,
-                    "cbo": cbo,
-                    "dit": dit,
-                    "lcom": lcom
-                })
+        # Apenas acrescenta a linha; o Excel é gerado uma única vez em gerar_metrics_totais_finais
+        anexar_metricas_repo(pasta_saida / "total_metrics_per_repo.csv", totais_repo)
+        if totais is not None:
+            totais.update(totais_repo)
         
-        if metricas_repo:
-            df_repo = pd.DataFrame(metricas_repo)
-            totais_repo = {
-                "repositorio": repo_name,
-                "loc_total": df_repo["loc"].sum(),
-                "comentarios_total": df_repo["comentarios"].sum(),
-                "cbo_total": df_repo["cbo"].sum(),
-                "dit_total": df_repo["dit"].sum(),
-                "lcom_total": df_repo["lcom"].sum(),
-                "arquivos_java": len(metricas_repo),
-                "loc_media_por_arquivo": round(df_repo["loc"].mean(), 2),
-                "comentarios_media_por_arquivo": round(df_repo["comentarios"].mean(), 2)
-            }
-            
-            arquivo_per_repo = pasta_saida / "total_metrics_per_repo.csv"
-            df_novo_repo = pd.DataFrame([totais_repo])
-            
-            if arquivo_per_repo.exists():
-                df_existente = pd.read_csv(arquivo_per_repo)
-                df_combined = pd.concat([df_existente, df_novo_repo], ignore_index=True)
-            else:
-                df_combined = df_novo_repo
-            
-            df_combined.to_csv(arquivo_per_repo, index=False)
-            df_combined.to_excel(pasta_saida / "total_metrics_per_repo.xlsx", index=False)
-            
-            print(f"Métricas de {repo_name} adicionadas ao total_metrics_per_repo")
-            print(f"   Arquivos: {len(metricas_repo)}")
-            print(f"   LOC Total: {totais_repo['loc_total']:,}")
-            print(f"   Comentários: {totais_repo['comentarios_total']:,}")
+        logger.info(f"Métricas de {repo_name} adicionadas ao total_metrics_per_repo: "
+                    f"{totais_repo['arquivos_java']} arquivos, {totais_repo['loc_total']:,} LOC, "
+                    f"{totais_repo['comentarios_total']:,} linhas de comentário")
             
-        return metricas_repo
+        return por_arquivo
         
     except Exception as e:
-        print(f"Erro ao processar métricas de {repo_name}: {e}")
-        return []
+        logger.error(f"Erro ao processar métricas de {repo_name}: {e}")
+        return pd.DataFrame()
 
 
 def gerar_metrics_totais_finais(pasta_saida):
@@ -107,7 +493,7 @@ def gerar_metrics_totais_finais(pasta_saida):
     arquivo_per_repo = pasta_saida / "total_metrics_per_repo.csv"
     
     if not arquivo_per_repo.exists():
-        print("Arquivo total_metrics_per_repo.csv não encontrado")
+        logger.warning("Arquivo total_metrics_per_repo.csv não encontrado")
         return None
         
     df_per_repo = pd.read_csv(arquivo_per_repo)
@@ -125,7 +511,7 @@ def gerar_metrics_totais_finais(pasta_saida):
     df_totais_finais = pd.DataFrame([totais_finais])
     df_totais_finais.to_csv(pasta_saida / "total_metrics.csv", index=False)
     df_totais_finais.to_excel(pasta_saida / "total_metrics.xlsx", index=False)
-    print("Métricas totais finais salvas")
+    logger.info("Métricas totais finais salvas")
     
     df_per_repo_sorted = df_per_repo.sort_values("loc_total", ascending=False)
     df_per_repo_sorted.to_csv(arquivo_per_repo, index=False)
@@ -137,15 +523,12 @@ def gerar_metrics_totais_finais(pasta_saida):
 def exibir_resumo_final(df_per_repo_sorted):
     """Exibe resumo final das métricas por repositório"""
     if df_per_repo_sorted is None or df_per_repo_sorted.empty:
-        print("Nenhum dado para exibir")
+        logger.info("Nenhum dado para exibir")
         return
         
-    print(f"\n RESUMO FINAL:")
-    print("="*70)
+    logger.info("RESUMO FINAL:")
+    logger.info("="*70)
     for _, row in df_per_repo_sorted.iterrows():
-        print(f" {row['repositorio']}")
-        print(f"   Arquivos: {int(row['arquivos_java'])}")
-        print(f"   LOC Total: {int(row['loc_total']):,}")
-        print(f"   Comentários: {int(row['comentarios_total']):,}")
-        print(f"   LOC/arquivo: {row['loc_media_por_arquivo']}")
-        print()
+        logger.info(f"{row['repositorio']}: {int(row['arquivos_java'])} arquivos, "
+                    f"{int(row['loc_total']):,} LOC, {int(row['comentarios_total']):,} comentários, "
+                    f"{row['loc_media_por_arquivo']} LOC/arquivo")
@@ -0,0 +1,213 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def _recurso_rate_limit(url):
+    """Retorna o recurso de rate limit do GitHub ao qual a URL pertence ("core", "search" ou "graphql")."""
+    if "/search/" in url:
+        return "search"
+    if url.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+class GitHubClient:
+    """Cliente HTTP da API do GitHub com conexões reaproveitadas e controle de rate limit.
+
+    Parâmetros:
+    - token (str): token de acesso do GitHub (enviado no cabeçalho Authorization).
+    - base_url (str): URL base da API; pode apontar para um servidor local de testes.
+    - pool_size (int): número de conexões mantidas abertas no pool da sessão.
+    - max_retries (int): número máximo de novas tentativas para rate limit secundário e erros 5xx.
+    - backoff_base (float): espera inicial, em segundos, do backoff exponencial.
+    - timeout (float): timeout, em segundos, de cada requisição.
+    - cache (HttpCache | None): cache persistente para requisições GET.
+    - offline (bool): se True, requisições GET são atendidas apenas pelo cache e as demais (ex.: POST
+      do GraphQL) falham, sem acesso à rede.
+
+    Observações:
+    - Em vez de pausas fixas, o cliente lê X-RateLimit-Remaining/X-RateLimit-Reset de cada resposta
+      e só espera quando a cota do recurso ("core", "search", "graphql") se esgota.
+    - Respostas 403/429 de rate limit secundário respeitam Retry-After ou usam backoff exponencial.
+    - Com cache, GETs já armazenados são enviados como requisições condicionais; respostas 304 não
+      consomem a cota primária do rate limit e o corpo é servido a partir do cache.
+    - estatisticas acumula requisicoes, respostas_cache, bytes_recebidos e espera_s (tempo parado
+      por rate limit), usados no relatório da execução.
+    - É seguro compartilhar uma instância entre threads.
+    """
+
+    def __init__(self, token=None, base_url="https://api.github.com", pool_size=10, max_retries=5,
+                 backoff_base=2.0, timeout=30.0, cache=None, offline=False):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Token {token}"
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        self._lock = threading.Lock()
+        self._pausa_ate = {}
+        self.estatisticas = {"requisicoes": 0, "respostas_cache": 0, "bytes_recebidos": 0, "espera_s": 0.0}
+
+    def _contar(self, **valores):
+        with self._lock:
+            for chave, valor in valores.items():
+                self.estatisticas[chave] += valor
+
+    def url(self, caminho):
+        """Monta a URL absoluta a partir de um caminho relativo à API (URLs absolutas são mantidas)."""
+        if caminho.startswith("http://") or caminho.startswith("https://"):
+            return caminho
+        return f"{self.base_url}/{caminho.lstrip('/')}"
+
+    def get(self, caminho, params=None, headers=None):
+        """Executa um GET respeitando o rate limit e retorna o objeto requests.Response."""
+        return self.request("GET", caminho, params=params, headers=headers)
+
+    def post(self, caminho, json=None, headers=None):
+        """Executa um POST (usado pelo endpoint GraphQL) respeitando o rate limit."""
+        return self.request("POST", caminho, json=json, headers=headers)
+
+    def graphql(self, query, variables=None):
+        """Executa uma consulta no endpoint GraphQL e retorna o campo "data" da resposta.
+
+        Arremessa:
+        - Exception: se a resposta não tiver status 200 ou trouxer apenas erros.
+        """
+        response = self.post("graphql", json={"query": query, "variables": variables or {}})
+        if response.status_code != 200:
+            raise Exception(f"Error fetching GraphQL data: {response.status_code} - {response.text}")
+        corpo = response.json()
+        if corpo.get("data") is None:
+            raise Exception(f"Error fetching GraphQL data: {corpo.get('errors')}")
+        return corpo["data"]
+
+    def request(self, metodo, caminho, **kwargs):
+        """Executa uma requisição com espera de rate limit e novas tentativas.
+
+        Retorna:
+        - requests.Response: a última resposta obtida; o chamador decide como tratar status != 200.
+        """
+        url = self.url(caminho)
+        if self.offline and metodo != "GET":
+            # Só GETs têm cache; consultas GraphQL offline vêm de GraphQLFixtures no modo replay
+            raise Exception(f"Modo offline: {metodo} {url} exigiria acesso à rede "
+                            f"(para GraphQL, use GITHUB_FIXTURES_DIR com GITHUB_FIXTURES_MODE=replay)")
+        if metodo == "GET" and (self.cache is not None or self.offline):
+            return self._get_com_cache(url, kwargs.get("params"), kwargs.get("headers"))
+        return self._enviar(metodo, url, **kwargs)
+
+    def _get_com_cache(self, url, params=None, headers=None):
+        """GET com cache: serve respostas dentro do TTL, revalida as demais e armazena respostas 200."""
+        chave = requests.Request("GET", url, params=params).prepare().url
+        entrada = self.cache.obter(chave) if self.cache is not None else None
+
+        if self.offline:
+            if entrada is None:
+                raise Exception(f"Modo offline: resposta não encontrada no cache para {chave}")
+            self.cache.tocar(chave)
+            self._contar(respostas_cache=1)
+            return self.cache.como_response(entrada)
+
+        if entrada is not None and self.cache.fresca(entrada):
+            self.cache.tocar(chave)
+            self._contar(respostas_cache=1)
+            return self.cache.como_response(entrada)
+
+        headers = dict(headers or {})
+        if entrada is not None:
+            if entrada["etag"]:
+                headers["If-None-Match"] = entrada["etag"]
+            if entrada["last_modified"]:
+                headers["If-Modified-Since"] = entrada["last_modified"]
+
+        response = self._enviar("GET", chave, headers=headers)
+        if response.status_code == 304 and entrada is not None:
+            self.cache.revalidada(chave)
+            self._contar(respostas_cache=1)
+            return self.cache.como_response(entrada)
+        if response.status_code == 200:
+            self.cache.salvar(chave, response)
+        return response
+
+    def _enviar(self, metodo, url, **kwargs):
+        recurso = _recurso_rate_limit(url)
+        tentativa = 0
+        while True:
+            self._aguardar(recurso)
+            response = self.session.request(metodo, url, timeout=self.timeout, **kwargs)
+            self._contar(requisicoes=1, bytes_recebidos=len(response.content))
+            self._atualizar_rate_limit(recurso, response)
+
+            espera = self._espera_para_nova_tentativa(response, tentativa)
+            if espera is None or tentativa >= self.max_retries:
+                return response
+            logger.warning(f"Rate limit/erro {response.status_code} em {url}; nova tentativa em {espera:.1f}s")
+            self._pausar(recurso, espera)
+            tentativa += 1
+
+    def _aguardar(self, recurso):
+        with self._lock:
+            pausa_ate = self._pausa_ate.get(recurso, 0)
+        espera = pausa_ate - time.time()
+        if espera > 0:
+            self._contar(espera_s=espera)
+            time.sleep(espera)
+
+    def _pausar(self, recurso, segundos):
+        with self._lock:
+            self._pausa_ate[recurso] = max(self._pausa_ate.get(recurso, 0), time.time() + segundos)
+
+    def _atualizar_rate_limit(self, recurso, response):
+        restante = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if restante is None or reset is None:
+            return
+        try:
+            restante = int(restante)
+            reset = float(reset)
+        except ValueError:
+            return
+        if restante <= 0:
+            # Cota esgotada: todas as threads esperam até o reset informado pelo servidor
+            self._pausar(recurso, max(0.0, reset - time.time()) + 1)
+
+    def _espera_para_nova_tentativa(self, response, tentativa):
+        """Retorna quantos segundos esperar antes de repetir a requisição, ou None se não deve repetir."""
+        status = response.status_code
+        if status in (403, 429):
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                reset = float(response.headers.get("X-RateLimit-Reset", time.time()))
+                return max(0.0, reset - time.time()) + 1
+            if status == 429 or "rate limit" in response.text.lower():
+                return self.backoff_base * (2 ** tentativa)
+            return None
+        if status >= 500:
+            return self.backoff_base * (2 ** tentativa)
+        return None
+
+
+def map_concorrente(funcao, itens, workers=8):
+    """Aplica funcao a cada item usando um pool de threads, preservando a ordem dos resultados."""
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(funcao, itens))
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_REPOSITORIO = """
+    nameWithOwner
+    name
+    url
+    stargazerCount
+    createdAt
+    releases { totalCount }
+"""
+
+class GraphQLFixtures:
+    """Grava e reproduz respostas GraphQL a partir de arquivos JSON, para execução offline.
+
+    Parâmetros:
+    - client: objeto com método graphql(query, variables) (por exemplo, GitHubClient); pode ser None no modo "replay".
+    - diretorio (Path | str): pasta onde as respostas são salvas, uma por arquivo.
+    - modo (str): "record" consulta a API e salva cada resposta; "replay" só lê as respostas gravadas.
+
+    Observações:
+    - Cada resposta é identificada pelo SHA-256 da consulta e das variáveis, então a mesma
+      sequência de consultas sempre encontra os mesmos arquivos.
+    """
+
+    def __init__(self, client, diretorio, modo="replay"):
+        if modo not in ("record", "replay"):
+            raise ValueError(f"Modo de fixtures inválido: {modo}")
+        self.client = client
+        self.diretorio = Path(diretorio)
+        self.modo = modo
+
+    def _arquivo(self, query, variables):
+        chave = json.dumps({"query": query, "variables": variables or {}}, sort_keys=True)
+        return self.diretorio / f"{hashlib.sha256(chave.encode('utf-8')).hexdigest()}.json"
+
+    def graphql(self, query, variables=None):
+        arquivo = self._arquivo(query, variables)
+        if self.modo == "replay":
+            if not arquivo.exists():
+                raise Exception(f"Fixture GraphQL não encontrada: {arquivo.name}")
+            return json.loads(arquivo.read_text(encoding="utf-8"))
+
+        data = self.client.graphql(query, variables)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        arquivo.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+        return data
+
+
+def _normalizar(node):
+    """Converte um nó Repository do GraphQL para os campos usados em data/repository_data.csv."""
+    return {
+        "full_name": node["nameWithOwner"],
+        "repo_name": node["name"],
+        "url": node["url"],
+        "stars_count": node["stargazerCount"],
+        "releases_count": node["releases"]["totalCount"],
+        "created_at": node["createdAt"],
+    }
+
+
+def collect_repo_metadata_graphql(client, full_names, batch_size=50):
+    """Busca estrelas, data de criação, URL e total de releases de vários repositórios por requisição.
+
+    Parâmetros:
+    - client: objeto com método graphql(query, variables) (GitHubClient ou GraphQLFixtures).
+    - full_names (list): nomes completos ("owner/repo") dos repositórios.
+    - batch_size (int): repositórios por consulta GraphQL (cada um vira um alias na mesma query).
+
+    Retorna:
+    - dict: mapeia cada full_name para um dicionário com full_name, repo_name, url, stars_count,
+      releases_count e created_at. Repositórios não encontrados ficam de fora.
+
+    Arremessa:
+    - Exception: se alguma requisição GraphQL falhar.
+    """
+    metadados = {}
+    for start in range(0, len(full_names), batch_size):
+        batch = full_names[start:start + batch_size]
+        campos = []
+        for i, full_name in enumerate(batch):
+            owner, name = full_name.split("/", 1)
+            campos.append(
+                f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) "
+                f"{{ {CAMPOS_REPOSITORIO} }}"
+            )
+        data = client.graphql("query { " + " ".join(campos) + " }")
+        for i, full_name in enumerate(batch):
+            node = data.get(f"r{i}")
+            if node is not None:
+                metadados[full_name] = _normalizar(node)
+        logger.info(f"Metadados GraphQL: {min(start + batch_size, len(full_names))}/{len(full_names)} repositórios")
+    return metadados
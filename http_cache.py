@@ -0,0 +1,138 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class HttpCache:
+    """Cache persistente (SQLite) de respostas HTTP GET, com revalidação por ETag/Last-Modified.
+
+    Parâmetros:
+    - caminho (Path | str): arquivo SQLite do cache.
+    - ttl (float): segundos em que uma resposta é servida sem nenhuma requisição; depois disso ela é
+      revalidada com uma requisição condicional (If-None-Match/If-Modified-Since).
+    - max_idade (float | None): segundos após os quais uma resposta é descartada mesmo que não tenha
+      sido revalidada; None mantém as respostas indefinidamente.
+    - max_bytes (int | None): tamanho máximo dos corpos armazenados; ao ultrapassar, as respostas
+      acessadas há mais tempo são removidas (LRU).
+
+    Observações:
+    - As respostas são identificadas pela URL completa (incluindo a query string).
+    - É seguro compartilhar uma instância entre threads.
+    """
+
+    def __init__(self, caminho, ttl=0, max_idade=None, max_bytes=None):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_idade = max_idade
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS respostas (
+                    url TEXT PRIMARY KEY,
+                    headers TEXT NOT NULL,
+                    corpo BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    armazenado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL,
+                    tamanho INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_acessado_em ON respostas (acessado_em)")
+        self.remover_expirados()
+
+    def obter(self, url):
+        """Retorna a entrada armazenada para a URL (dict) ou None se não houver ou tiver expirado."""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT headers, corpo, etag, last_modified, armazenado_em FROM respostas WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if linha is None:
+            return None
+        headers, corpo, etag, last_modified, armazenado_em = linha
+        if self.max_idade is not None and time.time() - armazenado_em > self.max_idade:
+            self.remover(url)
+            return None
+        return {
+            "url": url,
+            "headers": json.loads(headers),
+            "corpo": corpo,
+            "etag": etag,
+            "last_modified": last_modified,
+            "armazenado_em": armazenado_em,
+        }
+
+    def fresca(self, entrada):
+        """Indica se a entrada ainda está dentro do TTL e pode ser usada sem revalidação."""
+        return time.time() - entrada["armazenado_em"] < self.ttl
+
+    def salvar(self, url, response):
+        """Armazena uma resposta 200 e aplica o limite de tamanho do cache."""
+        agora = time.time()
+        corpo = response.content
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(dict(response.headers)), corpo, response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"), agora, agora, len(corpo)),
+            )
+        self._aplicar_limite_tamanho()
+
+    def revalidada(self, url):
+        """Marca a entrada como revalidada (resposta 304): reinicia o TTL e atualiza o acesso."""
+        agora = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE respostas SET armazenado_em = ?, acessado_em = ? WHERE url = ?", (agora, agora, url)
+            )
+
+    def tocar(self, url):
+        """Atualiza o instante de último acesso da entrada (usado pela remoção LRU)."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE respostas SET acessado_em = ? WHERE url = ?", (time.time(), url))
+
+    def remover(self, url):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM respostas WHERE url = ?", (url,))
+
+    def remover_expirados(self):
+        """Remove as respostas armazenadas há mais de max_idade segundos."""
+        if self.max_idade is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM respostas WHERE armazenado_em < ?", (time.time() - self.max_idade,))
+
+    def _aplicar_limite_tamanho(self):
+        if self.max_bytes is None:
+            return
+        with self._lock, self._conn:
+            total = self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for url, tamanho in self._conn.execute(
+                "SELECT url, tamanho FROM respostas ORDER BY acessado_em ASC"
+            ).fetchall():
+                self._conn.execute("DELETE FROM respostas WHERE url = ?", (url,))
+                total -= tamanho
+                if total <= self.max_bytes:
+                    break
+
+    @staticmethod
+    def como_response(entrada):
+        """Reconstrói um requests.Response (status 200) a partir de uma entrada do cache."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entrada["url"]
+        response.headers = CaseInsensitiveDict(entrada["headers"])
+        response._content = entrada["corpo"]
+        response.encoding = "utf-8"
+        return response
@@ -0,0 +1,195 @@
+"""Cache local de mirrors bare e blobless dos repositórios analisados (MIRROR_CACHE_DIR).
+
+Uso:
+- python mirror_store.py [data/repository_data.csv] --dir <MIRROR_CACHE_DIR> [--max-gb N]: cria ou atualiza
+  os mirrors de todos os repositórios da lista antes de uma execução (ex.: em um cron noturno).
+"""
+import argparse
+import csv
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MARCADOR_USO = "lab02-ultimo-uso"
+
+
+def _run_git(args, timeout):
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True, timeout=timeout)
+
+
+def tamanho_diretorio(caminho):
+    """Soma o tamanho, em bytes, dos arquivos de um diretório (sem seguir links simbólicos)."""
+    total = 0
+    for raiz, _, arquivos in os.walk(caminho):
+        for arquivo in arquivos:
+            try:
+                total += os.lstat(os.path.join(raiz, arquivo)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class MirrorStore:
+    """Cache local de mirrors bare e blobless dos repositórios, com worktrees para análise.
+
+    Parâmetros:
+    - diretorio (Path | str): pasta onde os mirrors ficam, em <owner>/<repo>.git.
+    - max_bytes (int | None): orçamento de disco dos mirrors; ao ultrapassar, os mirrors usados há
+      mais tempo são removidos (LRU). None desativa a remoção.
+    - timeout (float): limite, em segundos, de cada comando git.
+
+    Observações:
+    - Os mirrors são identificados pelo full_name ("owner/repo") de data/repository_data.csv.
+    - O primeiro uso faz `git clone --mirror --filter=blob:none`; os seguintes apenas `git fetch`
+      incremental. Os blobs dos arquivos .java são baixados sob demanda no checkout e ficam no
+      mirror, então reexecuções não baixam o código de novo.
+    - Os checkouts são `git worktree` sparse (*.java) que compartilham os objetos do mirror.
+    - É seguro compartilhar uma instância entre threads; mirrors com checkout ativo não são removidos.
+    """
+
+    def __init__(self, diretorio, max_bytes=None, timeout=1800):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._locks_mirror = {}
+        self._em_uso = {}
+
+    def caminho_mirror(self, full_name):
+        owner, repo = full_name.split("/", 1)
+        return self.diretorio / owner / f"{repo}.git"
+
+    def _lock_mirror(self, full_name):
+        with self._lock:
+            return self._locks_mirror.setdefault(full_name, threading.Lock())
+
+    def atualizar(self, full_name, url):
+        """Cria o mirror do repositório ou, se já existir, atualiza-o com um fetch incremental.
+
+        Retorna:
+        - Path: caminho do mirror.
+        """
+        mirror = self.caminho_mirror(full_name)
+        with self._lock_mirror(full_name):
+            if (mirror / "HEAD").exists():
+                logger.info(f"Atualizando mirror de {full_name} (fetch incremental)...")
+                _run_git(["--git-dir", str(mirror), "fetch", "--prune", "origin"], self.timeout)
+            else:
+                logger.info(f"Criando mirror de {full_name} (blobless)...")
+                mirror.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    _run_git(["clone", "--mirror", "--filter=blob:none", url, str(mirror)], self.timeout)
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+                    shutil.rmtree(mirror, ignore_errors=True)
+                    raise
+            (mirror / MARCADOR_USO).write_text(str(time.time()), encoding="utf-8")
+        return mirror
+
+    def criar_checkout(self, full_name, url, destino):
+        """Atualiza o mirror e cria em destino um worktree sparse (apenas *.java) do HEAD.
+
+        Arremessa:
+        - subprocess.CalledProcessError | subprocess.TimeoutExpired: se algum comando git falhar.
+        """
+        with self._lock:
+            self._em_uso[full_name] = self._em_uso.get(full_name, 0) + 1
+        try:
+            mirror = self.atualizar(full_name, url)
+            destino = Path(destino)
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            shutil.rmtree(destino, ignore_errors=True)
+            with self._lock_mirror(full_name):
+                _run_git(["--git-dir", str(mirror), "worktree", "prune"], self.timeout)
+                _run_git(["--git-dir", str(mirror), "worktree", "add", "--detach", "--no-checkout",
+                          str(destino), "HEAD"], self.timeout)
+            _run_git(["-C", str(destino), "sparse-checkout", "set", "--no-cone", "*.java"], self.timeout)
+            _run_git(["-C", str(destino), "checkout"], self.timeout)
+            logger.info(f"Checkout de {full_name} criado a partir do mirror")
+        except Exception:
+            self.remover_checkout(full_name, destino)
+            raise
+        self.aplicar_orcamento()
+
+    def remover_checkout(self, full_name, destino, lixeira=None, tamanho=0):
+        """Remove o worktree de análise e libera o mirror para remoção LRU.
+
+        Com lixeira (disk_scheduler.Lixeira), o worktree é renomeado e apagado em segundo plano.
+        """
+        if lixeira is None or not lixeira.descartar(destino, tamanho):
+            shutil.rmtree(destino, ignore_errors=True)
+        mirror = self.caminho_mirror(full_name)
+        if (mirror / "HEAD").exists():
+            with self._lock_mirror(full_name):
+                try:
+                    _run_git(["--git-dir", str(mirror), "worktree", "prune"], self.timeout)
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                    logger.warning(f"Erro ao limpar worktrees de {full_name}: {e}")
+        with self._lock:
+            restantes = self._em_uso.get(full_name, 0) - 1
+            if restantes > 0:
+                self._em_uso[full_name] = restantes
+            else:
+                self._em_uso.pop(full_name, None)
+
+    def aplicar_orcamento(self):
+        """Remove os mirrors usados há mais tempo até o total caber em max_bytes."""
+        if self.max_bytes is None:
+            return
+        mirrors = []
+        for mirror in self.diretorio.glob("*/*.git"):
+            marcador = mirror / MARCADOR_USO
+            ultimo_uso = marcador.stat().st_mtime if marcador.exists() else 0
+            mirrors.append((ultimo_uso, mirror, tamanho_diretorio(mirror)))
+        total = sum(tamanho for _, _, tamanho in mirrors)
+        for _, mirror, tamanho in sorted(mirrors, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            full_name = f"{mirror.parent.name}/{mirror.name[:-4]}"
+            with self._lock:
+                if full_name in self._em_uso:
+                    continue
+            with self._lock_mirror(full_name):
+                shutil.rmtree(mirror, ignore_errors=True)
+            total -= tamanho
+            logger.info(f"Mirror de {full_name} removido do cache (LRU)")
+
+    def atualizar_de_csv(self, csv_path):
+        """Cria ou atualiza os mirrors de todos os repositórios listados em data/repository_data.csv."""
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for linha in csv.DictReader(f):
+                try:
+                    self.atualizar(linha["full_name"], linha["url"])
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                    logger.error(f"Erro ao atualizar mirror de {linha['full_name']}: {e}")
+        self.aplicar_orcamento()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="?", default="data/repository_data.csv",
+                        help="lista de repositórios com full_name e url (padrão: data/repository_data.csv)")
+    parser.add_argument("--dir", default=os.getenv("MIRROR_CACHE_DIR"),
+                        help="pasta dos mirrors (padrão: MIRROR_CACHE_DIR)")
+    parser.add_argument("--max-gb", type=float,
+                        default=float(os.getenv("MIRROR_CACHE_MAX_GB")) if os.getenv("MIRROR_CACHE_MAX_GB") else None,
+                        help="orçamento de disco dos mirrors, em GB (padrão: MIRROR_CACHE_MAX_GB; sem limite)")
+    parser.add_argument("--timeout", type=float, default=1800, help="limite, em segundos, de cada comando git")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("informe --dir ou defina MIRROR_CACHE_DIR")
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    store = MirrorStore(args.dir, max_bytes=int(args.max_gb * 1024 ** 3) if args.max_gb else None,
+                        timeout=args.timeout)
+    store.atualizar_de_csv(args.csv)
+
+
+if __name__ == "__main__":
+    main()
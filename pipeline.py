@@ -0,0 +1,135 @@
+import logging
+import queue
+import threading
+
+from disk_scheduler import AgendadorDisco
+
+logger = logging.getLogger(__name__)
+
+_FIM = object()
+
+
+def executar_pipeline(repos, clonar, analisar, limpar, clone_workers=2, analise_workers=1,
+                      limpeza_workers=1, max_checkouts=2, agendador=None):
+    """Executa o pipeline clone -> análise -> limpeza com estágios concorrentes.
+
+    Cada estágio possui seu próprio conjunto de workers (threads) e os estágios são ligados por
+    filas limitadas. Um semáforo controla quantos checkouts podem existir em disco ao mesmo tempo:
+    ele é adquirido antes do clone e só é liberado depois que a limpeza do repositório termina.
+
+    Parâmetros:
+    - repos (iterable): repositórios a processar (dicionários retornados pela API de busca).
+    - clonar (callable): recebe a tarefa e clona o repositório; deve preencher tarefa["repo_path"]
+      e retornar True se o checkout estiver disponível.
+    - analisar (callable): recebe a tarefa e executa CK + agregação; retorna True em caso de sucesso.
+    - limpar (callable): recebe a tarefa e remove o checkout do disco.
+    - clone_workers (int): número de clones simultâneos (estágio limitado por rede).
+    - analise_workers (int): número de análises CK simultâneas (estágio limitado por CPU/memória).
+    - limpeza_workers (int): número de remoções simultâneas (estágio limitado por disco).
+    - max_checkouts (int): número máximo de repositórios clonados presentes em disco.
+    - agendador (AgendadorDisco | None): decide qual repositório clonar a seguir (por exemplo, pelo
+      orçamento de disco); se informado, substitui repos. Padrão: a ordem de repos, sem orçamento.
+      Um agendador aberto pode receber repositórios enquanto o pipeline roda (ex.: a cada página
+      da busca); o clone termina quando ele for encerrado e esvaziado.
+
+    Retorna:
+    - dict: contagem de "sucessos" e "falhas".
+
+    Observações:
+    - Cada tarefa é um dicionário com as chaves "repo", "indice", "total" (repositórios conhecidos até
+      a admissão), "repo_path", "sucesso" e "erro" (mensagem da exceção que interrompeu a tarefa, se houver).
+    - Exceções lançadas por um estágio são registradas e contabilizadas como falha; a limpeza
+      sempre é executada para liberar o espaço do checkout.
+    """
+    if agendador is None:
+        agendador = AgendadorDisco(repos)
+    admitidos = [0]
+
+    fila_analise = queue.Queue(maxsize=max_checkouts)
+    fila_limpeza = queue.Queue(maxsize=max_checkouts)
+    checkouts = threading.BoundedSemaphore(max_checkouts)
+    contadores = {"sucessos": 0, "falhas": 0}
+    contadores_lock = threading.Lock()
+
+    def registrar(tarefa):
+        with contadores_lock:
+            if tarefa["sucesso"]:
+                contadores["sucessos"] += 1
+            else:
+                contadores["falhas"] += 1
+
+    def worker_clone():
+        while True:
+            checkouts.acquire()
+            repo = agendador.proximo()
+            if repo is None:
+                checkouts.release()
+                return
+            with contadores_lock:
+                admitidos[0] += 1
+                tarefa = {"repo": repo, "indice": admitidos[0], "total": agendador.total,
+                          "repo_path": None, "sucesso": False, "erro": None}
+            nome = tarefa["repo"]["full_name"]
+            logger.info(f"Processando {tarefa['indice']}/{tarefa['total']}: {nome}")
+            try:
+                clonado = clonar(tarefa)
+            except Exception as e:
+                logger.error(f"Erro ao clonar {nome}: {e}")
+                tarefa["erro"] = str(e)
+                clonado = False
+            if clonado:
+                fila_analise.put(tarefa)
+            else:
+                logger.info(f"Pulando {nome} e continuando com próximo repositório...")
+                fila_limpeza.put(tarefa)
+
+    def worker_analise():
+        while True:
+            tarefa = fila_analise.get()
+            if tarefa is _FIM:
+                return
+            nome = tarefa["repo"]["full_name"]
+            try:
+                tarefa["sucesso"] = bool(analisar(tarefa))
+            except Exception as e:
+                logger.error(f"Erro ao processar {nome}: {e}")
+                tarefa["erro"] = str(e)
+                tarefa["sucesso"] = False
+            fila_limpeza.put(tarefa)
+
+    def worker_limpeza():
+        while True:
+            tarefa = fila_limpeza.get()
+            if tarefa is _FIM:
+                return
+            try:
+                limpar(tarefa)
+            except Exception as e:
+                logger.warning(f"Erro ao limpar {tarefa['repo']['full_name']}: {e}")
+            finally:
+                registrar(tarefa)
+                agendador.liberar(tarefa["repo"])
+                checkouts.release()
+
+    def iniciar(alvo, quantidade):
+        threads = [threading.Thread(target=alvo, daemon=True) for _ in range(max(1, quantidade))]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    threads_clone = iniciar(worker_clone, clone_workers)
+    threads_analise = iniciar(worker_analise, analise_workers)
+    threads_limpeza = iniciar(worker_limpeza, limpeza_workers)
+
+    for thread in threads_clone:
+        thread.join()
+    for _ in threads_analise:
+        fila_analise.put(_FIM)
+    for thread in threads_analise:
+        thread.join()
+    for _ in threads_limpeza:
+        fila_limpeza.put(_FIM)
+    for thread in threads_limpeza:
+        thread.join()
+
+    return contadores
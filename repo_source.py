@@ -0,0 +1,174 @@
+import csv
+import itertools
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# A API de busca retorna no máximo 1000 resultados por consulta, em páginas de até 100
+LIMITE_BUSCA = 1000
+POR_PAGINA = 100
+# Colunas de repository_data.csv; size_kb é o campo size da busca (tamanho projetado do checkout)
+COLUNAS_REPOSITORIO = ["full_name", "repo_name", "url", "stars_count", "releases_count", "repo_age_years", "size_kb"]
+
+
+def _buscar_pagina(github, consulta, pagina):
+    response = github.get(
+        f"search/repositories"
+        f"?q={consulta}&sort=stars&order=desc"
+        f"&per_page={POR_PAGINA}&page={pagina}"
+    )
+    if response.status_code != 200:
+        raise Exception(f"Error fetching repositories: {response.status_code} - {response.text}")
+    return response.json()
+
+
+def paginas_busca_java(github, num_repos, workers=4):
+    """Gera os repositórios Java mais populares página a página, em ordem decrescente de estrelas.
+
+    Parâmetros:
+    - github (GitHubClient): cliente da API; com cache, as páginas ficam no HttpCache.
+    - num_repos (int): número de repositórios desejado; pode passar de 1000.
+    - workers (int): páginas de uma mesma janela buscadas ao mesmo tempo.
+
+    Retorna:
+    - generator: listas de repositórios (itens da API de busca), uma por página, assim que chegam.
+
+    Observações:
+    - A consulta é dividida em janelas de estrelas de até 1000 resultados: a primeira é
+      stars:>0 e cada janela seguinte vai de 1 até as estrelas do último repositório da anterior.
+      Repositórios empatados na fronteira aparecem nas duas e são entregues uma única vez.
+    - Dentro de uma janela, a primeira página informa o total e as demais são buscadas em paralelo;
+      a entrega segue a ordem das páginas.
+    """
+    vistos = set()
+    entregues = 0
+    maximo = None
+    while entregues < num_repos:
+        consulta = "language:Java+stars:>0" if maximo is None else f"language:Java+stars:1..{maximo}"
+        primeira = _buscar_pagina(github, consulta, 1)
+        total = min(primeira["total_count"], LIMITE_BUSCA)
+        paginas = min(math.ceil(total / POR_PAGINA), math.ceil((num_repos - entregues) / POR_PAGINA) + 1)
+        logger.info(f"Busca {consulta}: {primeira['total_count']} repositórios, {paginas} páginas")
+
+        ultimo = None
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futuros = [executor.submit(_buscar_pagina, github, consulta, pagina) for pagina in range(2, paginas + 1)]
+            try:
+                for resposta in itertools.chain([primeira], (futuro.result() for futuro in futuros)):
+                    if not resposta["items"]:
+                        break
+                    ultimo = resposta["items"][-1]["stargazers_count"]
+                    novos = [item for item in resposta["items"] if item["full_name"] not in vistos]
+                    novos = novos[:num_repos - entregues]
+                    vistos.update(item["full_name"] for item in novos)
+                    entregues += len(novos)
+                    if novos:
+                        yield novos
+                    if entregues >= num_repos:
+                        break
+            finally:
+                for futuro in futuros:
+                    futuro.cancel()
+
+        if primeira["total_count"] <= LIMITE_BUSCA or ultimo is None:
+            return
+        if ultimo == maximo:
+            # Mais de 1000 repositórios com o mesmo número de estrelas: os excedentes ficam de fora
+            logger.warning(f"Mais de {LIMITE_BUSCA} repositórios com {ultimo} estrelas; parte deles foi ignorada")
+            ultimo -= 1
+        if ultimo < 1:
+            return
+        maximo = ultimo
+
+
+def _repo_do_cache(linha):
+    """Reconstrói, a partir de uma linha de repository_data.csv, os campos da busca usados no pipeline."""
+    owner, nome = linha["full_name"].split("/", 1)
+    return {
+        "full_name": linha["full_name"],
+        "name": linha.get("repo_name") or nome,
+        "owner": {"login": owner},
+        "html_url": linha.get("url"),
+        "stargazers_count": int(float(linha.get("stars_count") or 0)),
+        "size": int(float(linha.get("size_kb") or 0)),
+    }
+
+
+class FonteRepositorios:
+    """Lista dos repositórios a analisar, entregue em lotes conforme fica disponível.
+
+    Parâmetros:
+    - github (GitHubClient): cliente usado na busca.
+    - num_repos (int): número de repositórios.
+    - arquivo (Path | str): CSV com a lista e os metadados (data/repository_data.csv).
+    - enriquecer (callable | None): recebe um lote de repositórios da busca e retorna as linhas de
+      metadados (full_name, repo_name, url, stars_count, releases_count, repo_age_years e, de
+      preferência, size_kb; sem ela, o tamanho vem do item da busca com o mesmo full_name).
+    - atualizar (bool): ignora o CSV existente e refaz a busca.
+    - workers (int): páginas da busca buscadas ao mesmo tempo.
+
+    Observações:
+    - Iterar produz tuplas (repos, linhas): repos no formato dos itens da busca (full_name, name,
+      owner.login, html_url, size, stargazers_count) e linhas com as colunas de COLUNAS_REPOSITORIO.
+    - Se o CSV já tem num_repos repositórios e a coluna size_kb, os lotes vêm dele sem nenhuma requisição
+      (origem == "cache"). Senão (origem == "api"), cada página da busca é enriquecida e entregue
+      logo que chega, e suas linhas são acrescentadas a <arquivo>.parcial, que substitui o CSV
+      quando a lista termina: uma busca interrompida não toma o lugar de uma lista completa.
+    """
+
+    def __init__(self, github, num_repos, arquivo="data/repository_data.csv", enriquecer=None, atualizar=False,
+                 workers=4):
+        self.github = github
+        self.num_repos = num_repos
+        self.arquivo = Path(arquivo)
+        self.enriquecer = enriquecer
+        self.atualizar = atualizar
+        self.workers = workers
+        self.origem = None
+
+    def _linhas_em_cache(self):
+        if self.atualizar or not self.arquivo.exists():
+            return None
+        with open(self.arquivo, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            linhas = list(reader)
+        if "size_kb" not in (reader.fieldnames or ()):
+            # Sem o tamanho dos repositórios, o orçamento de disco do AgendadorDisco não teria efeito
+            logger.info(f"{self.arquivo} não tem a coluna size_kb (lista de uma versão anterior); refazendo a busca")
+            return None
+        if len(linhas) < self.num_repos:
+            logger.info(f"{self.arquivo} tem {len(linhas)} repositórios, menos que os {self.num_repos} pedidos; "
+                        f"refazendo a busca")
+            return None
+        return linhas[:self.num_repos]
+
+    def __iter__(self):
+        linhas = self._linhas_em_cache()
+        if linhas is not None:
+            self.origem = "cache"
+            logger.info(f"Lista de repositórios lida de {self.arquivo} ({len(linhas)} repositórios)")
+            for inicio in range(0, len(linhas), POR_PAGINA):
+                lote = linhas[inicio:inicio + POR_PAGINA]
+                yield [_repo_do_cache(linha) for linha in lote], lote
+            return
+
+        self.origem = "api"
+        self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+        parcial = self.arquivo.with_name(self.arquivo.name + ".parcial")
+        with open(parcial, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUNAS_REPOSITORIO, extrasaction="ignore")
+            writer.writeheader()
+            for repos in paginas_busca_java(self.github, self.num_repos, self.workers):
+                tamanhos = {repo["full_name"]: repo.get("size") for repo in repos}
+                linhas = self.enriquecer(repos) if self.enriquecer is not None else []
+                for linha in linhas:
+                    if linha.get("size_kb") is None:
+                        linha["size_kb"] = tamanhos.get(linha["full_name"])
+                writer.writerows(linhas)
+                f.flush()
+                yield repos, linhas
+        os.replace(parcial, self.arquivo)
@@ -0,0 +1,238 @@
+"""Correlações das questões de pesquisa (RQ01-RQ04) entre métricas de processo e de qualidade.
+
+Une os metadados dos repositórios (repository_data.csv: estrelas, releases, idade) à distribuição
+por classe das métricas do CK de cada repositório (mediana, p90 e média por classe de CBO, DIT e
+LCOM, gravadas por extract_metrics no total_metrics_per_repo.csv) e calcula as correlações de
+Pearson e Spearman de cada variável de processo com cada métrica de qualidade.
+
+Uso:
+- python rq_analysis.py [--metadados data/repository_data.csv] [--totais <total_metrics_per_repo.csv>]
+"""
+import argparse
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from extract_metrics import COLUNAS_DISTRIBUICAO
+
+logger = logging.getLogger(__name__)
+
+# (questão, dimensão, coluna): metadados do repository_data.csv ou totais do total_metrics_per_repo.csv
+VARIAVEIS_RQ = [
+    ("RQ01", "popularidade", "stars_count"),
+    ("RQ02", "maturidade", "repo_age_years"),
+    ("RQ03", "atividade", "releases_count"),
+    ("RQ04", "tamanho", "loc_total"),
+    ("RQ04", "tamanho", "comentarios_total"),
+]
+# Métricas de qualidade: distribuição por classe de CBO, DIT e LCOM
+METRICAS_QUALIDADE = [coluna for coluna in COLUNAS_DISTRIBUICAO if not coluna.startswith("loc_")]
+COLUNAS_METADADOS = ["full_name", "repo_name", "stars_count", "releases_count", "repo_age_years"]
+# Abaixo disso a correlação não é informada
+MIN_PARES = 3
+
+
+def _numero(valor):
+    """Converte para float; ausentes e textos inválidos viram NaN."""
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def carregar_metadados(caminho):
+    """Lê repository_data.csv (ou .xlsx) e retorna os metadados por full_name."""
+    caminho = Path(caminho)
+    if caminho.suffix == ".xlsx":
+        df = pd.read_excel(caminho, usecols=COLUNAS_METADADOS)
+    else:
+        df = pd.read_csv(caminho, usecols=COLUNAS_METADADOS)
+    return df.drop_duplicates("full_name").set_index("full_name").to_dict(orient="index")
+
+
+class MotorCorrelacoes:
+    """Correlações de Pearson e Spearman das RQs, atualizadas a cada repositório analisado.
+
+    Parâmetros:
+    - metadados (Path | str | dict): repository_data.csv/.xlsx, ou o dict de carregar_metadados.
+    - variaveis (list | None): tuplas (questão, dimensão, coluna); padrão VARIAVEIS_RQ.
+    - metricas (list | None): colunas de qualidade; padrão METRICAS_QUALIDADE.
+
+    Observações:
+    - Os metadados são lidos uma única vez (ou recebidos aos poucos por adicionar_metadados); cada
+      repositório entra com adicionar(), a partir dos totais que processar_ck_results_repo acabou
+      de calcular, sem reler nenhum arquivo.
+    - Pearson: para cada par (variável, métrica) são mantidos n, médias e co-momentos, atualizados
+      pelo método de Welford com operações vetorizadas sobre a matriz de pares. Um valor ausente
+      exclui o repositório apenas dos pares afetados.
+    - Spearman depende dos postos de todos os repositórios, que mudam a cada inclusão: os valores
+      usados (algumas dezenas de números por repositório) ficam em memória e os postos são
+      recalculados em resultados().
+    - É seguro compartilhar uma instância entre threads.
+    """
+
+    def __init__(self, metadados, variaveis=None, metricas=None):
+        if not isinstance(metadados, dict):
+            metadados = carregar_metadados(metadados)
+        self.variaveis = list(variaveis or VARIAVEIS_RQ)
+        self.metricas = list(metricas or METRICAS_QUALIDADE)
+        self._metadados = {}
+        # repo_name -> full_name; nomes repetidos entre owners ficam ambíguos (None)
+        self._por_nome = {}
+        for full_name, dados in metadados.items():
+            self._incluir_metadados(full_name, dados)
+
+        forma = (len(self.variaveis), len(self.metricas))
+        self._n = np.zeros(forma, dtype=np.int64)
+        self._media_x = np.zeros(forma)
+        self._media_y = np.zeros(forma)
+        self._cxx = np.zeros(forma)
+        self._cyy = np.zeros(forma)
+        self._cxy = np.zeros(forma)
+        self._repositorios = set()
+        self._linhas = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._repositorios)
+
+    def _incluir_metadados(self, full_name, dados):
+        self._metadados[full_name] = dados
+        nome = dados.get("repo_name")
+        self._por_nome[nome] = None if self._por_nome.get(nome, full_name) != full_name else full_name
+
+    def adicionar_metadados(self, linhas):
+        """Acrescenta metadados de repositórios (linhas de repository_data com full_name), por exemplo
+        a cada página da busca, quando a lista completa ainda não existe."""
+        with self._lock:
+            for linha in linhas:
+                self._incluir_metadados(linha["full_name"], {chave: valor for chave, valor in linha.items()
+                                                             if chave != "full_name"})
+
+    def adicionar(self, full_name, totais):
+        """Inclui um repositório nas correlações.
+
+        Parâmetros:
+        - full_name (str): owner/nome, chave dos metadados.
+        - totais (dict): linha do total_metrics_per_repo (loc_total, comentarios_total e COLUNAS_DISTRIBUICAO).
+
+        Retorna:
+        - bool: False se o repositório não tem metadados ou já foi incluído.
+        """
+        with self._lock:
+            dados = self._metadados.get(full_name)
+        if dados is None:
+            logger.warning(f"Sem metadados para {full_name}; fora das correlações")
+            return False
+        dados = {**dados, **totais}
+        x = np.array([_numero(dados.get(coluna)) for _, _, coluna in self.variaveis])
+        y = np.array([_numero(dados.get(coluna)) for coluna in self.metricas])
+        with self._lock:
+            if full_name in self._repositorios:
+                return False
+            self._repositorios.add(full_name)
+            self._linhas.append(np.concatenate([x, y]))
+            self._acumular(x, y)
+        return True
+
+    def _acumular(self, x, y):
+        valido = ~np.isnan(x)[:, None] & ~np.isnan(y)[None, :]
+        xs = np.broadcast_to(x[:, None], valido.shape)
+        ys = np.broadcast_to(y[None, :], valido.shape)
+        self._n += valido
+        passo = np.divide(1.0, self._n, out=np.zeros(valido.shape), where=valido)
+        dx = np.where(valido, xs - self._media_x, 0.0)
+        dy = np.where(valido, ys - self._media_y, 0.0)
+        self._media_x += dx * passo
+        self._media_y += dy * passo
+        self._cxx += dx * np.where(valido, xs - self._media_x, 0.0)
+        self._cyy += dy * np.where(valido, ys - self._media_y, 0.0)
+        self._cxy += dx * np.where(valido, ys - self._media_y, 0.0)
+
+    def carregar_totais(self, arquivo_per_repo):
+        """Inclui os repositórios de um total_metrics_per_repo.csv existente (ex.: execução retomada).
+
+        As linhas são ligadas aos metadados pela coluna full_name ou, em arquivos sem ela, pelo nome
+        do repositório (coluna repositorio), ignorando nomes repetidos entre owners. Retorna o número
+        de repositórios incluídos.
+        """
+        arquivo_per_repo = Path(arquivo_per_repo)
+        if not arquivo_per_repo.exists() or arquivo_per_repo.stat().st_size == 0:
+            return 0
+        incluidos = 0
+        for totais in pd.read_csv(arquivo_per_repo).to_dict(orient="records"):
+            full_name = totais.get("full_name")
+            if not isinstance(full_name, str) or full_name not in self._metadados:
+                full_name = self._por_nome.get(totais.get("repositorio"))
+            if full_name is None:
+                logger.warning(f"{totais.get('repositorio')} sem metadados ou com nome ambíguo; fora das correlações")
+                continue
+            incluidos += self.adicionar(full_name, totais)
+        return incluidos
+
+    def resultados(self):
+        """Correlações atuais de cada variável das RQs com cada métrica de qualidade.
+
+        Retorna:
+        - DataFrame: colunas rq, dimensao, variavel, metrica, n (repositórios com os dois valores),
+          pearson e spearman; NaN quando há menos de MIN_PARES pares ou variância nula.
+        """
+        with self._lock:
+            n = self._n.copy()
+            cxx, cyy, cxy = self._cxx.copy(), self._cyy.copy(), self._cxy.copy()
+            linhas = list(self._linhas)
+
+        colunas_x = [coluna for _, _, coluna in self.variaveis]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pearson = cxy / np.sqrt(cxx * cyy)
+        pearson[(n < MIN_PARES) | ~np.isfinite(pearson)] = np.nan
+
+        spearman = np.full(n.shape, np.nan)
+        if linhas:
+            # Colunas por posição: a mesma coluna pode aparecer em mais de uma RQ
+            tabela = pd.DataFrame(np.vstack(linhas))
+            matriz = tabela.corr(method="spearman", min_periods=MIN_PARES).to_numpy()
+            spearman = matriz[:len(colunas_x), len(colunas_x):]
+
+        return pd.DataFrame({
+            "rq": np.repeat([rq for rq, _, _ in self.variaveis], len(self.metricas)),
+            "dimensao": np.repeat([dimensao for _, dimensao, _ in self.variaveis], len(self.metricas)),
+            "variavel": np.repeat(colunas_x, len(self.metricas)),
+            "metrica": np.tile(self.metricas, len(self.variaveis)),
+            "n": n.ravel(),
+            "pearson": np.round(pearson.ravel(), 4),
+            "spearman": np.round(spearman.ravel(), 4),
+        })
+
+    def salvar(self, caminho):
+        """Grava resultados() em CSV e retorna o DataFrame."""
+        resultados = self.resultados()
+        resultados.to_csv(caminho, index=False)
+        logger.info(f"Correlações das RQs ({len(self)} repositórios) salvas em {caminho}")
+        return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--metadados", default="data/repository_data.csv",
+                        help="repository_data.csv ou .xlsx (padrão: data/repository_data.csv)")
+    parser.add_argument("--totais", default="results_metrics/total_metrics_per_repo.csv",
+                        help="total_metrics_per_repo.csv com a distribuição por classe das métricas")
+    parser.add_argument("--saida", help="CSV de saída (padrão: correlacoes_rq.csv na pasta de --totais)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    motor = MotorCorrelacoes(args.metadados)
+    motor.carregar_totais(args.totais)
+    saida = Path(args.saida) if args.saida else Path(args.totais).parent / "correlacoes_rq.csv"
+    resultados = motor.salvar(saida)
+    with pd.option_context("display.width", 160, "display.max_rows", None):
+        print(resultados.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Estágios de cada repositório, na ordem em que o pipeline os conclui
+ESTAGIOS = ["pendente", "metadata", "cloned", "ck_done", "aggregated", "cleaned"]
+
+
+class RunManifest:
+    """Registro durável (SQLite) do estágio alcançado por cada repositório em uma execução.
+
+    Parâmetros:
+    - caminho (Path | str): arquivo SQLite do manifesto.
+
+    Observações:
+    - Um repositório é considerado concluído a partir do estágio "aggregated": suas métricas já
+      estão no total_metrics_per_repo.csv. Se a execução parar entre a gravação da linha e esse
+      registro, a linha é substituída (não duplicada) quando o repositório é refeito.
+    - Um repositório retomado em "ck_done" reaproveita a saída do CK da tentativa anterior.
+    - Cada nova tentativa de clone/análise incrementa o contador de tentativas do repositório,
+      usado para limitar quantas vezes um repositório com falha é refeito.
+    - É seguro compartilhar uma instância entre threads.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS repositorios (
+                    full_name TEXT PRIMARY KEY,
+                    estagio TEXT NOT NULL,
+                    falhou INTEGER NOT NULL DEFAULT 0,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    erro TEXT,
+                    atualizado_em REAL NOT NULL
+                )
+            """)
+
+    def limpar(self):
+        """Descarta todo o histórico (início de uma execução nova, sem --resume)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM repositorios")
+
+    def estagio(self, full_name):
+        """Retorna o último estágio alcançado pelo repositório ("pendente" se não houver registro)."""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT estagio FROM repositorios WHERE full_name = ?", (full_name,)
+            ).fetchone()
+        return linha[0] if linha else "pendente"
+
+    def concluido(self, full_name):
+        return ESTAGIOS.index(self.estagio(full_name)) >= ESTAGIOS.index("aggregated")
+
+    def iniciar_tentativa(self, full_name):
+        """Registra o início de uma nova tentativa de processamento do repositório."""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO repositorios (full_name, estagio, tentativas, atualizado_em) VALUES (?, 'pendente', 1, ?)
+                ON CONFLICT(full_name) DO UPDATE SET tentativas = tentativas + 1, falhou = 0, erro = NULL,
+                    atualizado_em = excluded.atualizado_em
+            """, (full_name, time.time()))
+
+    def registrar_metadata(self, full_names):
+        """Registra o estágio "metadata" para repositórios que ainda não tinham avançado além dele."""
+        agora = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO repositorios (full_name, estagio, atualizado_em) VALUES (?, 'metadata', ?)
+                ON CONFLICT(full_name) DO UPDATE SET estagio = 'metadata', atualizado_em = excluded.atualizado_em
+                WHERE repositorios.estagio = 'pendente'
+            """, [(full_name, agora) for full_name in full_names])
+
+    def avancar(self, full_name, estagio):
+        """Registra que o repositório concluiu o estágio informado."""
+        if estagio not in ESTAGIOS:
+            raise ValueError(f"Estágio desconhecido: {estagio}")
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO repositorios (full_name, estagio, atualizado_em) VALUES (?, ?, ?)
+                ON CONFLICT(full_name) DO UPDATE SET estagio = excluded.estagio, falhou = 0, erro = NULL,
+                    atualizado_em = excluded.atualizado_em
+            """, (full_name, estagio, time.time()))
+
+    def registrar_falha(self, full_name, erro=None):
+        """Marca a tentativa atual do repositório como falha, mantendo o último estágio concluído."""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO repositorios (full_name, estagio, falhou, erro, atualizado_em) VALUES (?, 'pendente', 1, ?, ?)
+                ON CONFLICT(full_name) DO UPDATE SET falhou = 1, erro = excluded.erro,
+                    atualizado_em = excluded.atualizado_em
+            """, (full_name, erro, time.time()))
+
+    def pendentes(self, repos, max_tentativas=3):
+        """Filtra os repositórios que ainda precisam ser processados.
+
+        Parâmetros:
+        - repos (list): dicionários de repositórios com a chave "full_name".
+        - max_tentativas (int): repositórios não concluídos com esse número de tentativas são ignorados.
+
+        Retorna:
+        - list: repositórios não concluídos e ainda dentro do limite de tentativas, na ordem original.
+        """
+        with self._lock:
+            registros = {
+                full_name: (estagio, tentativas)
+                for full_name, estagio, tentativas in self._conn.execute(
+                    "SELECT full_name, estagio, tentativas FROM repositorios"
+                )
+            }
+        resultado = []
+        for repo in repos:
+            estagio, tentativas = registros.get(repo["full_name"], ("pendente", 0))
+            if ESTAGIOS.index(estagio) >= ESTAGIOS.index("aggregated"):
+                continue
+            if tentativas >= max_tentativas:
+                logger.warning(f"{repo['full_name']} atingiu o limite de {max_tentativas} tentativas, ignorando")
+                continue
+            resultado.append(repo)
+        return resultado
+
+    def resumo(self):
+        """Retorna a contagem de repositórios por estágio e o total de falhas pendentes."""
+        with self._lock:
+            por_estagio = dict(self._conn.execute(
+                "SELECT estagio, COUNT(*) FROM repositorios GROUP BY estagio"
+            ).fetchall())
+            falhas = self._conn.execute("SELECT COUNT(*) FROM repositorios WHERE falhou = 1").fetchone()[0]
+        return {"estagios": por_estagio, "falhas": falhas}
@@ -0,0 +1,136 @@
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ESTAGIOS = ["api", "clone", "ck", "comentarios", "agregacao", "metodos", "limpeza", "relatorio"]
+# Campos resumidos pelo máximo em vez da soma
+CAMPOS_MAXIMO = {"pico_memoria_mb", "heap_mb"}
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) de uma lista de números pelo método do posto mais próximo."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posto = max(1, math.ceil(p / 100 * len(ordenados)))
+    return ordenados[posto - 1]
+
+
+class RunReport:
+    """Relatório da execução: tempo, recursos e erros de cada estágio por repositório.
+
+    Parâmetros:
+    - caminho (Path | str | None): arquivo JSONL onde cada medição é acrescentada como uma linha;
+      None mantém as medições apenas em memória.
+    - continuar (bool): mantém as linhas de um relatório anterior (execução retomada); senão o
+      arquivo é recriado.
+
+    Observações:
+    - Cada linha tem ts, repositorio, estagio, tempo_s, ok, erro e os campos específicos do estágio
+      (ex.: bytes_baixados no clone, pico_memoria_mb no CK, arquivos_lidos na contagem de comentários).
+    - resumo() agrega as medições desta execução por estágio, com percentis do tempo.
+    - É seguro compartilhar uma instância entre threads.
+    """
+
+    def __init__(self, caminho=None, continuar=False):
+        self.caminho = Path(caminho) if caminho else None
+        self._lock = threading.Lock()
+        self._medicoes = []
+        self._arquivo = None
+        if self.caminho is not None:
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            self._arquivo = open(self.caminho, "a" if continuar else "w", encoding="utf-8")
+
+    def registrar(self, repositorio, estagio, tempo_s, ok=True, erro=None, **campos):
+        """Registra uma medição já realizada."""
+        medicao = {"ts": round(time.time(), 3), "repositorio": repositorio, "estagio": estagio,
+                   "tempo_s": round(tempo_s, 3), "ok": ok, "erro": erro, **campos}
+        with self._lock:
+            self._medicoes.append(medicao)
+            if self._arquivo is not None:
+                self._arquivo.write(json.dumps(medicao, ensure_ascii=False, default=str) + "\n")
+                self._arquivo.flush()
+        return medicao
+
+    @contextmanager
+    def medir(self, repositorio, estagio):
+        """Mede o tempo de um bloco e registra a medição ao final.
+
+        O bloco recebe um dict para preencher com campos do estágio; ok=False marca uma falha sem
+        exceção. Exceções são registradas em erro e propagadas.
+        """
+        campos = {"ok": True}
+        inicio = time.perf_counter()
+        try:
+            yield campos
+        except Exception as e:
+            campos["ok"] = False
+            campos["erro"] = str(e)
+            raise
+        finally:
+            ok = campos.pop("ok")
+            erro = campos.pop("erro", None)
+            self.registrar(repositorio, estagio, time.perf_counter() - inicio, ok=ok, erro=erro, **campos)
+
+    def resumo(self):
+        """Agrega as medições por estágio.
+
+        Retorna:
+        - dict: por estágio, execucoes, falhas, tempo_total_s, p50_s, p90_s, p99_s e max_s, além da
+          soma dos campos numéricos (ex.: bytes_baixados) e do máximo dos CAMPOS_MAXIMO.
+        """
+        with self._lock:
+            medicoes = list(self._medicoes)
+        por_estagio = {}
+        for medicao in medicoes:
+            por_estagio.setdefault(medicao["estagio"], []).append(medicao)
+
+        resumo = {}
+        ordem = ESTAGIOS + sorted(set(por_estagio) - set(ESTAGIOS))
+        for estagio in ordem:
+            if estagio not in por_estagio:
+                continue
+            lista = por_estagio[estagio]
+            tempos = [medicao["tempo_s"] for medicao in lista]
+            item = {
+                "execucoes": len(lista),
+                "falhas": sum(1 for medicao in lista if not medicao["ok"]),
+                "tempo_total_s": round(sum(tempos), 3),
+                "p50_s": percentil(tempos, 50),
+                "p90_s": percentil(tempos, 90),
+                "p99_s": percentil(tempos, 99),
+                "max_s": max(tempos),
+            }
+            campos = {chave for medicao in lista for chave, valor in medicao.items()
+                      if isinstance(valor, (int, float)) and not isinstance(valor, bool)
+                      and chave not in ("ts", "tempo_s")}
+            for campo in sorted(campos):
+                valores = [medicao[campo] for medicao in lista if isinstance(medicao.get(campo), (int, float))]
+                if campo in CAMPOS_MAXIMO:
+                    item[f"{campo}_max"] = max(valores)
+                else:
+                    item[f"{campo}_total"] = sum(valores)
+            resumo[estagio] = item
+        return resumo
+
+    def salvar_resumo(self, caminho):
+        """Grava resumo() em JSON e o exibe no log, estágio por estágio."""
+        resumo = self.resumo()
+        Path(caminho).write_text(json.dumps(resumo, indent=1, ensure_ascii=False), encoding="utf-8")
+        for estagio, item in resumo.items():
+            logger.info(f"{estagio:<12} n={item['execucoes']:<5} falhas={item['falhas']:<4} "
+                        f"total={item['tempo_total_s']:.1f}s p50={item['p50_s']:.2f}s "
+                        f"p90={item['p90_s']:.2f}s p99={item['p99_s']:.2f}s max={item['max_s']:.2f}s")
+        return resumo
+
+    def fechar(self):
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
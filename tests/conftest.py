@@ -0,0 +1,17 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório, sem pacote
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def consult_repos(monkeypatch):
+    """consult_repos recarregado sem cache HTTP nem fixtures (o módulo lê o ambiente ao ser importado)."""
+    monkeypatch.setenv("HTTP_CACHE_PATH", "")
+    monkeypatch.setenv("GITHUB_FIXTURES_DIR", "")
+    import consult_repos
+    return importlib.reload(consult_repos)
@@ -0,0 +1,133 @@
+"""run_ck_incremental com benchmarks/stub_ck.py no lugar do java: os quatro CSVs do CK são
+remontados a partir do cache por blob, e apenas os arquivos alterados passam pelo CK."""
+import csv
+import json
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from analysis_cache import AnaliseCache, blobs_java
+from ck_runner import run_ck_incremental
+from disk_scheduler import Lixeira
+from extract_metrics import estatisticas_metodos_repo
+
+STUB_CK = Path(__file__).resolve().parent.parent / "benchmarks" / "stub_ck.py"
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="stub_ck.py é executado pelo shebang")
+
+
+def _git(*args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def _fonte(classe, metodos):
+    corpo = "\n".join(f"    public int metodo{m}(int a, int b) {{ return a + b; }}" for m in range(metodos))
+    return f"package app;\n\npublic class {classe} {{\n{corpo}\n}}\n"
+
+
+@pytest.fixture
+def repositorio(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    for classe, metodos in (("A", 1), ("B", 2), ("C", 3)):
+        (repo / "src" / f"{classe}.java").write_text(_fonte(classe, metodos))
+    _git("init", "-q", cwd=repo)
+    _git("add", ".", cwd=repo)
+    return repo
+
+
+def _linhas(out_dir, tipo):
+    with open(out_dir / f"{tipo}.csv", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def _executar(repo, out_dir, cache):
+    metricas = {}
+    ok = run_ck_incremental(STUB_CK, repo, out_dir, blobs_java(repo), cache, java_path=str(STUB_CK),
+                            metricas=metricas)
+    return ok, metricas
+
+
+def test_remonta_todos_os_csvs(repositorio, tmp_path):
+    cache = AnaliseCache(tmp_path / "analise_cache.sqlite")
+    out_dir = tmp_path / "ck"
+
+    ok, metricas = _executar(repositorio, out_dir, cache)
+    assert ok and metricas["arquivos_reaproveitados"] == 0
+    assert len(_linhas(out_dir, "method")) == 6
+
+    # Altera B: apenas ele passa pelo CK; as linhas de A e C vêm do cache
+    (repositorio / "src" / "B.java").write_text(_fonte("B", 4))
+    _git("add", ".", cwd=repositorio)
+    ok, metricas = _executar(repositorio, out_dir, cache)
+
+    assert ok and metricas["arquivos_reaproveitados"] == 2 and metricas["arquivos_java"] == 1
+    assert len(_linhas(out_dir, "class")) == 3
+    metodos_por_classe = {}
+    for linha in _linhas(out_dir, "method"):
+        metodos_por_classe[linha["class"]] = metodos_por_classe.get(linha["class"], 0) + 1
+    assert metodos_por_classe == {"app.A": 1, "app.B": 4, "app.C": 3}
+    assert len(_linhas(out_dir, "variable")) == 8
+    assert _linhas(out_dir, "field") == []
+    assert all("ck_shard" not in linha for linha in _linhas(out_dir, "method"))
+    # Os caminhos apontam para o checkout, não para o diretório montado para o CK
+    assert {Path(linha["file"]).parent for linha in _linhas(out_dir, "variable")} == \
+        {(repositorio / "src").resolve()}
+
+    estatisticas = estatisticas_metodos_repo(out_dir, 1024 * 1024)
+    assert estatisticas["metodos"] == 8 and estatisticas["variaveis"] == 8
+
+
+def test_sem_alteracoes_nao_roda_o_ck_e_mantem_shards(repositorio, tmp_path):
+    cache = AnaliseCache(tmp_path / "analise_cache.sqlite")
+    out_dir = tmp_path / "ck"
+    _executar(repositorio, out_dir, cache)
+    (out_dir / "shards.json").write_text(json.dumps({"shards": 3}))
+    (out_dir / "method.csv").unlink()
+
+    ok, metricas = _executar(repositorio, out_dir, cache)
+
+    assert ok and metricas["arquivos_reaproveitados"] == 3 and "arquivos_java" not in metricas
+    assert json.loads((out_dir / "shards.json").read_text())["shards"] == 3
+    assert len(_linhas(out_dir, "method")) == 6
+
+
+def test_cache_antigo_apenas_com_classes_reanalisa(repositorio, tmp_path):
+    caminho_cache = tmp_path / "analise_cache.sqlite"
+    # Cache de uma versão anterior: só a tabela classes_ck, com as linhas de classes de cada blob
+    with sqlite3.connect(caminho_cache) as conn:
+        conn.execute("CREATE TABLE classes_ck (blob TEXT PRIMARY KEY, linhas TEXT NOT NULL)")
+        conn.executemany("INSERT INTO classes_ck VALUES (?, ?)",
+                         [(blob, json.dumps([{"class": "antiga", "cbo": "0"}]))
+                          for blob in blobs_java(repositorio).values()])
+    out_dir = tmp_path / "ck"
+
+    ok, metricas = _executar(repositorio, out_dir, AnaliseCache(caminho_cache))
+
+    assert ok and metricas["arquivos_reaproveitados"] == 0
+    assert "antiga" not in {linha["class"] for linha in _linhas(out_dir, "class")}
+    assert len(_linhas(out_dir, "method")) == 6
+    assert len(_linhas(out_dir, "variable")) == 6
+
+
+def test_saida_descartada_e_remontada_sem_alteracoes(consult_repos, repositorio, tmp_path):
+    cache = AnaliseCache(tmp_path / "analise_cache.sqlite")
+    out_dir = tmp_path / "ck"
+    _executar(repositorio, out_dir, cache)
+    (out_dir / "shards.json").write_text(json.dumps({"shards": 3}))
+    estatisticas_metodos_repo(out_dir, 1024 * 1024)
+    lixeira = Lixeira(tmp_path / ".lixeira")
+
+    assert consult_repos.descartar_saida_ck(out_dir, lixeira)
+    lixeira.aguardar()
+
+    assert sorted(caminho.name for caminho in out_dir.iterdir()) == ["estatisticas_metodos.csv", "shards.json"]
+    assert list((tmp_path / ".lixeira").iterdir()) == []
+    # A próxima análise do mesmo commit remonta os CSVs a partir do cache e mantém os shards
+    ok, metricas = _executar(repositorio, out_dir, cache)
+    assert ok and metricas["arquivos_reaproveitados"] == 3
+    assert len(_linhas(out_dir, "method")) == 6
+    assert json.loads((out_dir / "shards.json").read_text())["shards"] == 3
@@ -0,0 +1,82 @@
+"""clone_repository contra um repositório bare local servido por file://."""
+import subprocess
+
+import pytest
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repositorio_bare(tmp_path):
+    """Repositório bare com dois commits, arquivos .java e outros arquivos."""
+    trabalho = tmp_path / "trabalho"
+    trabalho.mkdir()
+    _git("init", "-q", "-b", "main", cwd=trabalho)
+    (trabalho / "README.md").write_text("# exemplo\n")
+    (trabalho / "src" / "main" / "java").mkdir(parents=True)
+    (trabalho / "src" / "main" / "java" / "App.java").write_text("class App {}\n")
+    (trabalho / "docs").mkdir()
+    (trabalho / "docs" / "manual.pdf").write_bytes(b"%PDF" + bytes(4096))
+    _git("add", ".", cwd=trabalho)
+    _git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "primeiro", cwd=trabalho)
+    (trabalho / "src" / "main" / "java" / "Util.java").write_text("class Util {}\n")
+    _git("add", ".", cwd=trabalho)
+    _git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "segundo", cwd=trabalho)
+
+    bare = tmp_path / "exemplo.git"
+    _git("clone", "-q", "--bare", str(trabalho), str(bare))
+    # Servidores locais só aceitam --filter com esta opção, como o GitHub
+    _git("config", "uploadpack.allowFilter", "true", cwd=bare)
+    return bare
+
+
+def _arquivos(diretorio):
+    return sorted(str(caminho.relative_to(diretorio)) for caminho in diretorio.rglob("*")
+                  if caminho.is_file() and ".git" not in caminho.relative_to(diretorio).parts)
+
+
+def test_sparse_clone_baixa_apenas_java(consult_repos, repositorio_bare, tmp_path, monkeypatch):
+    monkeypatch.setattr(consult_repos, "clone_mode", "sparse")
+    destino = tmp_path / "repositorios"
+
+    consult_repos.clone_repository(repositorio_bare.as_uri(), destino)
+
+    clone = destino / "exemplo"
+    assert _arquivos(clone) == ["src/main/java/App.java", "src/main/java/Util.java"]
+    assert _git("rev-parse", "--is-shallow-repository", cwd=clone) == "true"
+    assert _git("rev-list", "--count", "HEAD", cwd=clone) == "1"
+    assert _git("config", "remote.origin.partialclonefilter", cwd=clone) == "blob:none"
+    # O blob do PDF não foi baixado
+    faltando = _git("rev-list", "--objects", "--missing=print", "HEAD", cwd=clone)
+    assert any(linha.startswith("?") for linha in faltando.splitlines())
+
+
+def test_shallow_clone_traz_todos_os_arquivos(consult_repos, repositorio_bare, tmp_path, monkeypatch):
+    monkeypatch.setattr(consult_repos, "clone_mode", "shallow")
+    destino = tmp_path / "repositorios"
+
+    consult_repos.clone_repository(repositorio_bare.as_uri(), destino)
+
+    clone = destino / "exemplo"
+    assert _arquivos(clone) == ["README.md", "docs/manual.pdf", "src/main/java/App.java", "src/main/java/Util.java"]
+    assert _git("rev-list", "--count", "HEAD", cwd=clone) == "1"
+
+
+def test_clone_existente_nao_e_refeito(consult_repos, repositorio_bare, tmp_path):
+    destino = tmp_path / "repositorios"
+    (destino / "exemplo").mkdir(parents=True)
+
+    consult_repos.clone_repository(repositorio_bare.as_uri(), destino)
+
+    assert list((destino / "exemplo").iterdir()) == []
+
+
+def test_falha_no_clone_nao_deixa_sobras(consult_repos, tmp_path):
+    destino = tmp_path / "repositorios"
+
+    with pytest.raises(subprocess.CalledProcessError):
+        consult_repos.clone_repository((tmp_path / "inexistente.git").as_uri(), destino)
+
+    assert not (destino / "inexistente").exists()
@@ -0,0 +1,159 @@
+"""GitHubClient contra um servidor HTTP local: contagem de releases pelo Link rel="last",
+revalidação com ETag/304, novas tentativas em 403/429 e modo offline."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from github_client import GitHubClient
+from http_cache import HttpCache
+
+
+class ServidorFalso:
+    """Responde cada caminho com a próxima resposta roteirizada (status, cabeçalhos, corpo)."""
+
+    def __init__(self):
+        self.roteiro = {}
+        self.recebidas = []
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.headers.get("Content-Length"):
+                    self.rfile.read(int(self.headers["Content-Length"]))
+                servidor.recebidas.append((self.path, dict(self.headers)))
+                respostas = servidor.roteiro[self.path.split("?")[0]]
+                status, cabecalhos, corpo = respostas.pop(0) if len(respostas) > 1 else respostas[0]
+                dados = json.dumps(corpo).encode() if corpo is not None else b""
+                self.send_response(status)
+                for nome, valor in cabecalhos.items():
+                    self.send_header(nome, valor.format(base=servidor.base))
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            do_POST = do_GET
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self._http.server_port}"
+        threading.Thread(target=self._http.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def fechar(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorFalso()
+    yield servidor
+    servidor.fechar()
+
+
+def test_releases_pelo_link_rel_last(servidor, consult_repos, monkeypatch):
+    servidor.roteiro["/repos/o/r/releases"] = [(200, {
+        "Link": '<{base}/repositories/1/releases?per_page=1&page=2>; rel="next", '
+                '<{base}/repositories/1/releases?per_page=1&page=37>; rel="last"',
+    }, [{"id": 1}])]
+    monkeypatch.setattr(consult_repos, "github", GitHubClient(base_url=servidor.base))
+    monkeypatch.setattr(consult_repos, "releases_count_mode", "link")
+
+    assert consult_repos.get_repository_releases_count("o", "r") == 37
+    assert len(servidor.recebidas) == 1
+    assert "per_page=1" in servidor.recebidas[0][0]
+
+
+def test_releases_sem_link_usa_a_propria_pagina(servidor, consult_repos, monkeypatch):
+    servidor.roteiro["/repos/o/r/releases"] = [(200, {}, [{"id": 1}])]
+    servidor.roteiro["/repos/o/vazio/releases"] = [(200, {}, [])]
+    monkeypatch.setattr(consult_repos, "github", GitHubClient(base_url=servidor.base))
+    monkeypatch.setattr(consult_repos, "releases_count_mode", "link")
+
+    assert consult_repos.get_repository_releases_count("o", "r") == 1
+    assert consult_repos.get_repository_releases_count("o", "vazio") == 0
+
+
+def test_revalidacao_304_serve_o_corpo_do_cache(servidor, tmp_path):
+    servidor.roteiro["/repos/o/r"] = [
+        (200, {"ETag": '"v1"'}, {"full_name": "o/r", "stargazers_count": 10}),
+        (304, {"ETag": '"v1"'}, None),
+    ]
+    client = GitHubClient(base_url=servidor.base, cache=HttpCache(tmp_path / "cache.sqlite"))
+
+    primeira = client.get("repos/o/r")
+    segunda = client.get("repos/o/r")
+
+    assert segunda.status_code == 200
+    assert segunda.json() == primeira.json() == {"full_name": "o/r", "stargazers_count": 10}
+    assert "If-None-Match" not in servidor.recebidas[0][1]
+    assert servidor.recebidas[1][1]["If-None-Match"] == '"v1"'
+    assert client.estatisticas["requisicoes"] == 2
+    assert client.estatisticas["respostas_cache"] == 1
+
+
+@pytest.mark.parametrize("status, cabecalhos, corpo", [
+    (403, {"Retry-After": "0"}, {"message": "You have exceeded a secondary rate limit"}),
+    (403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0"}, {"message": "API rate limit exceeded"}),
+    (429, {}, {"message": "Too Many Requests"}),
+])
+def test_nova_tentativa_em_rate_limit(servidor, status, cabecalhos, corpo, monkeypatch):
+    servidor.roteiro["/repos/o/r"] = [(status, cabecalhos, corpo), (200, {}, {"full_name": "o/r"})]
+    # A espera pelo reset soma 1s de folga; não há por que esperar no teste
+    monkeypatch.setattr("github_client.time.sleep", lambda segundos: None)
+    client = GitHubClient(base_url=servidor.base, backoff_base=0.01)
+
+    response = client.get("repos/o/r")
+
+    assert response.status_code == 200
+    assert response.json() == {"full_name": "o/r"}
+    assert client.estatisticas["requisicoes"] == 2
+
+
+def test_403_sem_rate_limit_nao_repete(servidor):
+    servidor.roteiro["/repos/o/r"] = [(403, {}, {"message": "Resource not accessible by integration"})]
+    client = GitHubClient(base_url=servidor.base, backoff_base=0.01)
+
+    assert client.get("repos/o/r").status_code == 403
+    assert client.estatisticas["requisicoes"] == 1
+
+
+def test_desiste_apos_max_retries(servidor, monkeypatch):
+    servidor.roteiro["/repos/o/r"] = [(429, {}, {"message": "Too Many Requests"})]
+    monkeypatch.setattr("github_client.time.sleep", lambda segundos: None)
+    client = GitHubClient(base_url=servidor.base, max_retries=2, backoff_base=0.01)
+
+    assert client.get("repos/o/r").status_code == 429
+    assert client.estatisticas["requisicoes"] == 3
+
+
+def test_offline_nao_envia_post(servidor, tmp_path):
+    client = GitHubClient(base_url=servidor.base, cache=HttpCache(tmp_path / "cache.sqlite"), offline=True)
+
+    with pytest.raises(Exception, match="Modo offline"):
+        client.graphql("query { viewer { login } }")
+    with pytest.raises(Exception, match="Modo offline"):
+        client.post("repos/o/r/issues", json={"title": "x"})
+
+    assert servidor.recebidas == []
+    assert client.estatisticas["requisicoes"] == 0
+
+
+def test_offline_graphql_com_fixtures_em_replay(servidor, tmp_path):
+    from graphql_collector import GraphQLFixtures
+
+    servidor.roteiro["/graphql"] = [(200, {}, {"data": {"viewer": {"login": "o"}}})]
+    online = GitHubClient(base_url=servidor.base)
+    GraphQLFixtures(online, tmp_path, modo="record").graphql("query { viewer { login } }")
+    recebidas = len(servidor.recebidas)
+
+    offline = GitHubClient(base_url=servidor.base, offline=True)
+    reproducao = GraphQLFixtures(offline, tmp_path, modo="replay")
+
+    assert reproducao.graphql("query { viewer { login } }") == {"viewer": {"login": "o"}}
+    assert len(servidor.recebidas) == recebidas
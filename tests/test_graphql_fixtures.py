@@ -0,0 +1,66 @@
+"""GraphQLFixtures: respostas gravadas no modo record são reproduzidas offline no modo replay."""
+import re
+
+import pytest
+
+from graphql_collector import GraphQLFixtures, collect_repo_metadata_graphql
+
+
+class ClienteFalso:
+    """Responde às consultas em lote de collect_repo_metadata_graphql (um alias rN por repositório)."""
+
+    def __init__(self, repositorios):
+        self.repositorios = repositorios
+        self.consultas = 0
+
+    def graphql(self, query, variables=None):
+        self.consultas += 1
+        dados = {}
+        for alias, owner, nome in re.findall(r'(r\d+): repository\(owner: "([^"]*)", name: "([^"]*)"\)', query):
+            full_name = f"{owner}/{nome}"
+            if full_name not in self.repositorios:
+                continue
+            estrelas, releases = self.repositorios[full_name]
+            dados[alias] = {
+                "nameWithOwner": full_name,
+                "name": nome,
+                "url": f"https://github.com/{full_name}",
+                "stargazerCount": estrelas,
+                "createdAt": "2015-03-01T00:00:00Z",
+                "releases": {"totalCount": releases},
+            }
+        return dados
+
+
+REPOSITORIOS = {"spring/boot": (70000, 300), "google/guava": (50000, 80), "square/okhttp": (45000, 120)}
+
+
+def test_replay_reproduz_o_que_foi_gravado(tmp_path):
+    cliente = ClienteFalso(REPOSITORIOS)
+    gravacao = GraphQLFixtures(cliente, tmp_path, modo="record")
+    gravado = collect_repo_metadata_graphql(gravacao, list(REPOSITORIOS), batch_size=2)
+
+    assert cliente.consultas == 2
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    # Sem cliente: qualquer acesso à rede falharia
+    reproducao = GraphQLFixtures(None, tmp_path, modo="replay")
+    reproduzido = collect_repo_metadata_graphql(reproducao, list(REPOSITORIOS), batch_size=2)
+
+    assert reproduzido == gravado
+    assert reproduzido["google/guava"]["stars_count"] == 50000
+    assert reproduzido["square/okhttp"]["releases_count"] == 120
+
+
+def test_replay_sem_fixture_falha(tmp_path):
+    GraphQLFixtures(ClienteFalso(REPOSITORIOS), tmp_path, modo="record").graphql("query { a }")
+    reproducao = GraphQLFixtures(None, tmp_path, modo="replay")
+
+    assert reproducao.graphql("query { a }") == {}
+    with pytest.raises(Exception, match="Fixture GraphQL não encontrada"):
+        reproducao.graphql("query { a }", {"depois": "cursor"})
+
+
+def test_modo_invalido(tmp_path):
+    with pytest.raises(ValueError):
+        GraphQLFixtures(None, tmp_path, modo="gravar")
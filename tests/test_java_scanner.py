@@ -0,0 +1,69 @@
+"""java_scanner: contagens do corpus de fixtures (benchmarks/fixtures/java/esperado.json) e decodificação."""
+import json
+from pathlib import Path
+
+import pytest
+
+import java_scanner
+from java_scanner import analisar_arquivo_java, decodificar_fonte, escanear_arquivos, min_arquivos_paralelo
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "java"
+ESPERADO = json.loads((FIXTURES / "esperado.json").read_text(encoding="utf-8"))
+
+FONTE = "class A {\n    // comentário\n    String s = \"/* não é comentário */\";\n}\n"
+CONTAGENS_FONTE = {"fisicas": 4, "codigo": 3, "comentario": 1, "branco": 0}
+
+
+def _contagens(resultado):
+    return {chave: resultado[chave] for chave in CONTAGENS_FONTE}
+
+
+@pytest.mark.parametrize("nome", sorted(ESPERADO))
+def test_fixture(nome):
+    assert _contagens(analisar_arquivo_java(FIXTURES / nome)) == ESPERADO[nome]
+
+
+def test_escanear_arquivos_no_processo_atual():
+    caminhos = [str(FIXTURES / nome) for nome in sorted(ESPERADO)]
+
+    resultados = escanear_arquivos(caminhos + caminhos[:2], workers=1)
+
+    assert list(resultados) == caminhos
+    assert {Path(caminho).name: _contagens(resultado) for caminho, resultado in resultados.items()} == ESPERADO
+
+
+def test_escanear_arquivos_com_pool(monkeypatch):
+    monkeypatch.setattr(java_scanner, "min_arquivos_paralelo", lambda workers: 0)
+    caminhos = [str(FIXTURES / nome) for nome in sorted(ESPERADO)]
+
+    resultados = escanear_arquivos(caminhos, workers=2)
+
+    assert {Path(caminho).name: _contagens(resultado) for caminho, resultado in resultados.items()} == ESPERADO
+
+
+def test_latin1_nunca_falha():
+    dados = "// coração, ação\nclass A {}\n".encode("latin-1")
+    with pytest.raises(UnicodeDecodeError):
+        dados.decode("utf-8")
+
+    assert decodificar_fonte(dados) == "// coração, ação\nclass A {}\n"
+
+
+def test_utf8_com_bom():
+    assert decodificar_fonte(b"\xef\xbb\xbf" + FONTE.encode("utf-8")).startswith("class A")
+
+
+@pytest.mark.parametrize("codificacao", ["utf-16-le", "utf-16-be"])
+def test_utf16_com_bom(tmp_path, codificacao):
+    dados = "﻿".encode(codificacao) + FONTE.encode(codificacao)
+    assert decodificar_fonte(dados) == FONTE
+
+    arquivo = tmp_path / "Utf16.java"
+    arquivo.write_bytes(dados)
+    assert _contagens(analisar_arquivo_java(arquivo)) == CONTAGENS_FONTE
+
+
+def test_limiar_do_pool():
+    assert min_arquivos_paralelo(1) == float("inf")
+    if java_scanner.CPUS > 1:
+        assert min_arquivos_paralelo(2) > min_arquivos_paralelo(java_scanner.CPUS) > 0
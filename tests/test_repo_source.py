@@ -0,0 +1,46 @@
+"""FonteRepositorios: tamanho dos repositórios (size_kb) na lista gravada em repository_data.csv."""
+import csv
+
+import repo_source
+from repo_source import FonteRepositorios
+
+
+def _item(full_name, size):
+    owner, name = full_name.split("/")
+    return {"full_name": full_name, "name": name, "owner": {"login": owner}, "size": size}
+
+
+def _linhas_csv(arquivo):
+    with open(arquivo, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_repositorio_renomeado_mantem_o_tamanho_da_busca(consult_repos, tmp_path, monkeypatch):
+    busca = [_item("antigo/projeto", 1200), _item("outro/lib", 300)]
+    monkeypatch.setattr(repo_source, "paginas_busca_java", lambda github, num_repos, workers: iter([busca]))
+    monkeypatch.setattr(consult_repos, "metadata_source", "graphql")
+    # O GraphQL segue o redirecionamento e responde com o nome atual do repositório
+    canonicos = {"antigo/projeto": "novo/projeto-renomeado", "outro/lib": "outro/lib"}
+    monkeypatch.setattr(consult_repos, "collect_repo_metadata_graphql", lambda client, nomes: {
+        nome: {"full_name": canonicos[nome], "repo_name": canonicos[nome].split("/")[1],
+               "url": f"https://github.com/{canonicos[nome]}", "stars_count": 10, "releases_count": 1,
+               "created_at": "2020-01-01T00:00:00Z"}
+        for nome in nomes
+    })
+    arquivo = tmp_path / "repository_data.csv"
+
+    lotes = list(FonteRepositorios(None, 2, arquivo, enriquecer=consult_repos.collect_repo_info))
+
+    assert [(linha["full_name"], linha["size_kb"]) for linha in lotes[0][1]] == \
+        [("novo/projeto-renomeado", 1200), ("outro/lib", 300)]
+    assert [linha["size_kb"] for linha in _linhas_csv(arquivo)] == ["1200", "300"]
+
+
+def test_enriquecer_sem_size_kb_usa_o_item_da_busca(tmp_path, monkeypatch):
+    busca = [_item("dono/app", 512)]
+    monkeypatch.setattr(repo_source, "paginas_busca_java", lambda github, num_repos, workers: iter([busca]))
+
+    lotes = list(FonteRepositorios(None, 1, tmp_path / "repository_data.csv",
+                                   enriquecer=lambda repos: [{"full_name": repo["full_name"]} for repo in repos]))
+
+    assert lotes[0][1] == [{"full_name": "dono/app", "size_kb": 512}]
@@ -0,0 +1,41 @@
+"""anexar_metricas_repo: uma linha por repositório em total_metrics_per_repo.csv, mesmo ao refazê-lo."""
+import pandas as pd
+
+from extract_metrics import anexar_metricas_repo
+
+
+def test_repositorio_refeito_substitui_a_linha(tmp_path):
+    arquivo = tmp_path / "total_metrics_per_repo.csv"
+    anexar_metricas_repo(arquivo, {"repositorio": "guava", "full_name": "google/guava", "loc_total": 10})
+    # Homônimo de outro owner não é confundido com o primeiro
+    anexar_metricas_repo(arquivo, {"repositorio": "guava", "full_name": "fork/guava", "loc_total": 20})
+    # Execução retomada refaz o repositório
+    anexar_metricas_repo(arquivo, {"repositorio": "guava", "full_name": "google/guava", "loc_total": 30})
+
+    df = pd.read_csv(arquivo)
+    assert sorted(df["full_name"]) == ["fork/guava", "google/guava"]
+    assert df.set_index("full_name").loc["google/guava", "loc_total"] == 30
+
+
+def test_linhas_de_outro_processo_sao_consideradas(tmp_path):
+    arquivo = tmp_path / "total_metrics_per_repo.csv"
+    anexar_metricas_repo(arquivo, {"repositorio": "a", "full_name": "o/a", "loc_total": 1})
+    with open(arquivo, "a", encoding="utf-8") as f:
+        f.write("b,o/b,2\n")
+
+    anexar_metricas_repo(arquivo, {"repositorio": "b", "full_name": "o/b", "loc_total": 3})
+
+    assert pd.read_csv(arquivo).to_dict(orient="records") == [
+        {"repositorio": "a", "full_name": "o/a", "loc_total": 1},
+        {"repositorio": "b", "full_name": "o/b", "loc_total": 3},
+    ]
+
+
+def test_arquivo_antigo_segue_o_cabecalho_e_usa_repositorio(tmp_path):
+    arquivo = tmp_path / "total_metrics_per_repo.csv"
+    arquivo.write_text("repositorio,loc_total\na,1\n", encoding="utf-8")
+
+    anexar_metricas_repo(arquivo, {"repositorio": "b", "full_name": "o/b", "loc_total": 2, "ck_shards": 1})
+    anexar_metricas_repo(arquivo, {"repositorio": "a", "full_name": "o/a", "loc_total": 5})
+
+    assert arquivo.read_text(encoding="utf-8") == "repositorio,loc_total\nb,2\na,5\n"